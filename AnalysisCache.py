@@ -0,0 +1,171 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      A persistent cache of analysis results of Janggi positions, stored in a memory-mapped file.
+
+import mmap
+import os
+import struct
+import zlib
+from TranspositionTable import encode_move, decode_move, NO_MOVE
+
+
+# File header: magic bytes, version and number of records.
+HEADER = struct.Struct("<4sHxxQ")
+MAGIC = b"JNGC"
+VERSION = 2
+
+# Fixed record: position hash, best move, score, depth searched and flags, followed by a CRC-32 checksum of
+# these fields, so that a record torn by a concurrent write is never read as valid.
+FIELDS = struct.Struct("<QHibB")
+RECORD = struct.Struct("<QHibBI")
+
+# Depth of a record that only holds the check and checkmate status of a position, without a search.
+STATUS_ONLY = -1
+
+# Flags of a record
+VALID = 1
+IN_CHECK = 2
+CHECKMATE = 4
+
+# Number of consecutive records that are searched for a position before giving up.
+MAX_PROBES = 8
+
+
+class AnalysisCache:
+	"""A class that represent an on-disk cache of analysis results keyed by position hash.
+	Each record holds the best move, score, depth searched and the check and checkmate status of
+	the player to move. The records live in a fixed-size hash table in a file opened with mmap,
+	so that many processes can read the cache at the same time and the cache survives restarts.
+	Several processes can write to the cache at once: a record that is read while it is being written, or that
+	two writers have written over each other, fails its checksum and is treated as missing. One of the writes to
+	the same record may be lost, as in any cache."""
+
+	def __init__(self, path, capacity=1 << 20, readonly=False):
+		"""Instantiate the cache. Takes the path of the cache file, the number of records for a new file,
+		and whether the cache is only read as parameters. An existing file keeps its own capacity."""
+
+		if capacity < 1:
+			raise ValueError("The capacity of an analysis cache must be at least 1.")
+
+		self._path = path
+		self._readonly = readonly
+
+		# Create a new empty file if it does not exist yet.
+		if not os.path.exists(path):
+			if readonly:
+				raise FileNotFoundError(path)
+			with open(path, "wb") as cacheFile:
+				cacheFile.write(HEADER.pack(MAGIC, VERSION, capacity))
+				cacheFile.truncate(HEADER.size + capacity * RECORD.size)
+
+		self._file = open(path, "rb" if readonly else "r+b")
+		access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+		self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+
+		magic, version, self._capacity = HEADER.unpack_from(self._map, 0)
+		if magic != MAGIC or version != VERSION or self._capacity < 1 or \
+				len(self._map) != HEADER.size + self._capacity * RECORD.size:
+			self.close()
+			raise ValueError("Not a valid analysis cache: " + str(path))
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def get_capacity(self):
+		"""Returns the number of records that the cache can hold."""
+		return self._capacity
+
+	def _offsets(self, positionHash):
+		"""Takes the hash of a position as parameter and returns the offsets of the records where it can be stored."""
+
+		start = positionHash % self._capacity
+		for i in range(min(MAX_PROBES, self._capacity)):
+			yield HEADER.size + ((start + i) % self._capacity) * RECORD.size
+
+	def lookup(self, positionHash):
+		"""Takes the hash of a position as parameter. Returns None if the position is not in the cache.
+		Otherwise returns a dictionary with the best move (a pair of from and to position, or None),
+		the score, the depth searched, and if the player to move is in check or checkmated. A record that only
+		holds the status of the position has the depth STATUS_ONLY, and None as its move and score."""
+
+		for offset in self._offsets(positionHash):
+			storedHash, move, score, depth, flags, checksum = RECORD.unpack_from(self._map, offset)
+			if not flags & VALID:
+				return None
+			if storedHash == positionHash and checksum == zlib.crc32(self._map[offset:offset + FIELDS.size]):
+				if depth == STATUS_ONLY:
+					move, score = NO_MOVE, None
+				return {"move": decode_move(move), "score": score, "depth": depth,
+				        "in_check": bool(flags & IN_CHECK), "checkmate": bool(flags & CHECKMATE)}
+		return None
+
+	def store(self, positionHash, move, score, depth, in_check, checkmate):
+		"""Takes the hash of a position, the best move (a pair of from and to position, or None), the score,
+		the depth searched (STATUS_ONLY if the position has not been searched), and if the player to move is in check
+		or checkmated as parameters.
+		An existing record of the position is only replaced by a search of at least the same depth.
+		If all the records where the position can be stored are taken, the one with the shallowest depth is replaced.
+		Returns True if the record has been written and False otherwise."""
+
+		if self._readonly:
+			raise PermissionError("The analysis cache is opened as read-only.")
+
+		target = None
+		shallowest = None
+		for offset in self._offsets(positionHash):
+			storedHash, _, _, storedDepth, flags, checksum = RECORD.unpack_from(self._map, offset)
+			if not flags & VALID or checksum != zlib.crc32(self._map[offset:offset + FIELDS.size]):
+				target = offset
+				break
+			if storedHash == positionHash:
+				if depth < storedDepth:
+					return False
+				target = offset
+				break
+			if shallowest is None or storedDepth < shallowest[0]:
+				shallowest = (storedDepth, offset)
+
+		if target is None:
+			target = shallowest[1]
+
+		flags = VALID | (IN_CHECK if in_check else 0) | (CHECKMATE if checkmate else 0)
+		packedMove = NO_MOVE if move is None else encode_move(*move)
+		fields = (positionHash, packedMove, score, max(-128, min(127, depth)), flags)
+		RECORD.pack_into(self._map, target, *fields, zlib.crc32(FIELDS.pack(*fields)))
+		return True
+
+	def get_status(self, game):
+		"""Takes a game as parameter and returns whether the player to move is in check and checkmated,
+		as a pair of booleans. The status is read from the cache if possible.
+		Otherwise it is computed and stored in the cache, unless the cache is read-only."""
+
+		positionHash = game.get_position_hash()
+		record = self.lookup(positionHash)
+		if record is not None:
+			return record["in_check"], record["checkmate"]
+
+		player = game.get_turn()
+		in_check = game.is_in_check(player)
+		checkmate = in_check and game.is_checkmate(player)
+		if not self._readonly:
+			self.store(positionHash, None, 0, STATUS_ONLY, in_check, checkmate)
+		return in_check, checkmate
+
+	def flush(self):
+		"""Writes all changes of the cache to the disk. Returns None."""
+		if not self._readonly:
+			self._map.flush()
+
+	def close(self):
+		"""Writes all changes to the disk and closes the cache file. Returns None."""
+
+		if self._map is not None:
+			self.flush()
+			self._map.close()
+			self._map = None
+		if self._file is not None:
+			self._file.close()
+			self._file = None
@@ -0,0 +1,218 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      A command-line tool that analyzes many positions in parallel. Positions are read one per line
+#                   in the text notation of JanggiGame.get_position_text, or as fixed-size binary records, from
+#                   a file or stdin. For each position it writes a line of the player to move, whether each player
+#                   is in check, whether the player to move is checkmated, the number of legal moves and,
+#                   optionally, the score of a search. Lines are written in the order the positions were read.
+#                   Example: "python AnalyzePositions.py positions.txt --depth 2 > analysis.tsv"
+
+import argparse
+import collections
+import multiprocessing
+import sys
+from JanggiGame import JanggiGame, InvalidPositionError, PIECE_NAMES
+
+
+# A binary record holds the code of the game piece on each of the 90 positions, row by row, in 4 bits each
+# (0 for empty, 1 to 7 for the Blue game pieces in the order of PIECE_NAMES, and 9 to 15 for the Red ones),
+# followed by a byte of the player whose turn it is (0 for Blue, 1 for Red).
+ROWS = 10
+COLUMNS = 9
+RECORD_SIZE = ROWS * COLUMNS // 2 + 1
+RED_CODE = 8
+
+# Number of positions that are sent to a worker process at a time.
+BATCH_SIZE = 256
+
+# Columns of the output.
+HEADER = ("line", "turn", "blue_in_check", "red_in_check", "checkmate", "legal_moves")
+
+# Game and engine of each worker process, created once by _init_worker.
+_game = None
+_engine = None
+_depth = None
+
+
+def pack_position(game):
+	"""Takes a game as parameter and returns its position as a binary record of RECORD_SIZE bytes."""
+
+	board = game.get_board()
+	codes = []
+	for i in range(ROWS):
+		for j in range(COLUMNS):
+			gamePiece = board[(i, j)]
+			if gamePiece is None:
+				codes.append(0)
+			else:
+				code = PIECE_NAMES.index(gamePiece.get_name()) + 1
+				codes.append(code if gamePiece.get_player() == "BLUE" else code + RED_CODE)
+	data = bytes(codes[k] << 4 | codes[k + 1] for k in range(0, len(codes), 2))
+	return data + bytes([game.get_turn() == "RED"])
+
+
+def unpack_position(data):
+	"""Takes a binary record as parameter and returns a pair of the layout of the position, as taken by
+	JanggiGame.set_position, and the player whose turn it is. Raises InvalidPositionError if the record is
+	not valid."""
+
+	if len(data) != RECORD_SIZE or data[-1] > 1:
+		raise InvalidPositionError
+
+	layout = {}
+	for k in range(ROWS * COLUMNS):
+		code = data[k // 2] >> 4 if k % 2 == 0 else data[k // 2] & 15
+		if code == 0:
+			continue
+		player = "BLUE" if code < RED_CODE else "RED"
+		index = code % RED_CODE - 1
+		if index < 0 or index >= len(PIECE_NAMES):
+			raise InvalidPositionError
+		layout[divmod(k, COLUMNS)] = (player, PIECE_NAMES[index])
+	return layout, "RED" if data[-1] else "BLUE"
+
+
+def read_text_records(stream):
+	"""Takes a text stream as parameter and yields pairs of the line number and the position text of each
+	line that is not blank."""
+
+	for number, line in enumerate(stream, 1):
+		line = line.strip()
+		if line:
+			yield number, line
+
+
+def read_binary_records(stream):
+	"""Takes a binary stream as parameter and yields pairs of the record number and each record.
+	A record cut short at the end of the stream is yielded as it is, and reported as invalid."""
+
+	number = 0
+	while True:
+		data = stream.read(RECORD_SIZE)
+		if not data:
+			return
+		number += 1
+		yield number, data
+
+
+def _init_worker(depth, table_size_mb):
+	"""Takes the depth of the search (None for no search) and the size of the transposition table in MB as
+	parameters. Creates the game, and the engine if there is a search, that the worker process reuses for
+	every position. Returns None."""
+
+	global _game, _engine, _depth
+	_game = JanggiGame(lazy_game_state=True)
+	_depth = depth
+	_engine = None
+	if depth:
+		from JanggiEngine import JanggiEngine
+		_engine = JanggiEngine(_game, table_size_mb)
+
+
+def analyze_position(game, record, engine=None, depth=None):
+	"""Takes a game, a position (text or a binary record), and an engine and the depth of its search as
+	parameters. Sets the game to the position and returns a list of the fields of the analysis: the player
+	to move, whether Blue and Red are in check, whether the player to move is checkmated, the number of
+	legal moves other than passing the turn and, if there is an engine, the score for the player to move.
+	Raises InvalidPositionError if the position is not valid."""
+
+	if isinstance(record, str):
+		game.set_position_text(record)
+	else:
+		game.set_position(*unpack_position(record))
+
+	turn = game.get_turn()
+	legalMoves = sum(1 for move in game.generate_moves(turn) if game.is_legal_move(*move))
+	fields = [turn, game.is_in_check("BLUE"), game.is_in_check("RED"), game.is_checkmate(turn), legalMoves]
+	if engine is not None:
+		fields.append(engine.search(depth)[1])
+	return fields
+
+
+def _analyze_batch(batch):
+	"""Takes a list of pairs of the line number and the position as parameter. Analyzes the positions with the
+	game of the worker process and returns the output line of each position."""
+
+	lines = []
+	for number, record in batch:
+		try:
+			fields = analyze_position(_game, record, _engine, _depth)
+		except InvalidPositionError:
+			fields = ["INVALID"]
+		lines.append("\t".join(str(int(field)) if isinstance(field, bool) else str(field)
+		                       for field in [number] + fields) + "\n")
+	return lines
+
+
+def _batches(records, batchSize):
+	"""Takes an iterable of records and the number of records in a batch as parameters and yields lists
+	of up to that many records."""
+
+	batch = []
+	for record in records:
+		batch.append(record)
+		if len(batch) == batchSize:
+			yield batch
+			batch = []
+	if batch:
+		yield batch
+
+
+def analyze_records(records, depth=None, processes=None, batch_size=BATCH_SIZE, in_flight=None,
+                    table_size_mb=16):
+	"""Takes an iterable of pairs of the line number and the position, the depth of the search (None for no
+	search), the number of worker processes (0 to analyze in this process, None for one per CPU), the number of
+	positions in a batch, the number of batches handed to the workers at a time (twice the number of workers by
+	default) and the size of the transposition table of each worker in MB as parameters.
+	Yields the output line of each position, in the order of the records. The records are read only as fast
+	as they are analyzed, so memory stays bounded however many positions there are."""
+
+	batches = _batches(records, batch_size)
+	if processes == 0:
+		_init_worker(depth, table_size_mb)
+		for batch in batches:
+			yield from _analyze_batch(batch)
+		return
+
+	processes = processes or multiprocessing.cpu_count()
+	in_flight = in_flight or 2 * processes
+	with multiprocessing.Pool(processes, _init_worker, (depth, table_size_mb)) as pool:
+		pending = collections.deque()
+		for batch in batches:
+			pending.append(pool.apply_async(_analyze_batch, (batch,)))
+			if len(pending) >= in_flight:
+				yield from pending.popleft().get()
+		while pending:
+			yield from pending.popleft().get()
+
+
+def main(argv=None):
+	"""Analyzes the positions in a file, or stdin, and writes a tab-separated line for each to stdout."""
+
+	parser = argparse.ArgumentParser(description="Analyze Janggi positions in parallel.")
+	parser.add_argument("input", nargs="?", default="-", help="file of positions, or - for stdin")
+	parser.add_argument("--binary", action="store_true", help="read binary records instead of text lines")
+	parser.add_argument("--depth", type=int, help="depth of a search for the score of each position")
+	parser.add_argument("--processes", type=int, help="number of worker processes, 0 for none")
+	parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="number of positions per batch")
+	parser.add_argument("--header", action="store_true", help="write a line of column names first")
+	args = parser.parse_args(argv)
+
+	if args.input == "-":
+		stream = sys.stdin.buffer if args.binary else sys.stdin
+	else:
+		stream = open(args.input, "rb" if args.binary else "r")
+	records = read_binary_records(stream) if args.binary else read_text_records(stream)
+
+	try:
+		if args.header:
+			sys.stdout.write("\t".join(HEADER + (("score",) if args.depth else ())) + "\n")
+		for line in analyze_records(records, args.depth, args.processes, args.batch_size):
+			sys.stdout.write(line)
+	finally:
+		if stream not in (sys.stdin, sys.stdin.buffer):
+			stream.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,157 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Static evaluation of many positions at once with NumPy array operations.
+#                   A batch of N positions is an (N, 10, 9) int8 array of piece codes: 0 for an empty position,
+#                   1 to 7 for Blue's game pieces in the order of PIECE_NAMES, and -1 to -7 for Red's.
+
+import numpy
+from JanggiGame import PIECE_NAMES, PIECE_VALUES, PIECE_SQUARE_VALUES
+
+
+ROWS = 10
+COLUMNS = 9
+
+# Code of each game piece, for Blue. Red's game pieces have the negative codes.
+PIECE_CODES = {name: index + 1 for index, name in enumerate(PIECE_NAMES)}
+MAX_CODE = len(PIECE_NAMES)
+
+# Player and name of the game piece of each code other than 0.
+CODE_PIECES = {sign * code: (player, name) for name, code in PIECE_CODES.items()
+               for player, sign in (("BLUE", 1), ("RED", -1))}
+
+# Material value, and material and piece-square value, of each code on each position from the point of view of
+# Blue, indexed by the code plus MAX_CODE.
+MATERIAL_VALUES = numpy.array([(1 if CODE_PIECES[code][0] == "BLUE" else -1) * PIECE_VALUES[CODE_PIECES[code][1]]
+                               if code else 0 for code in range(-MAX_CODE, MAX_CODE + 1)], dtype=numpy.int32)
+SQUARE_VALUES = numpy.array([[[PIECE_SQUARE_VALUES[CODE_PIECES[code]][(i, j)] if code else 0 for j in range(COLUMNS)]
+                              for i in range(ROWS)] for code in range(-MAX_CODE, MAX_CODE + 1)], dtype=numpy.int32)
+
+# Rows of the palace of each player, and its columns.
+PALACE_ROWS = {"BLUE": slice(7, 10), "RED": slice(0, 3)}
+PALACE_COLUMNS = slice(3, 6)
+
+# Bonus of each Guard inside its own palace, and penalty of each opposing game piece other than a General or
+# a Guard inside the palace.
+GUARD_BONUS = 20
+INTRUDER_PENALTY = 30
+
+# Bonus of each position that a Chariot or a Horse can move to.
+MOBILITY_WEIGHT = 5
+
+# Moves of the Horse: the leg that must be empty, and the position the Horse moves to.
+HORSE_MOVES = [((-1, 0), (-2, -1)), ((-1, 0), (-2, 1)), ((1, 0), (2, -1)), ((1, 0), (2, 1)),
+               ((0, -1), (-1, -2)), ((0, -1), (1, -2)), ((0, 1), (-1, 2)), ((0, 1), (1, 2))]
+
+# Code that marks the border around the board when a batch is padded.
+OFF_BOARD = 127
+
+
+def pack_boards(games):
+	"""Takes an iterable of games as parameter and returns their positions as an (N, 10, 9) int8 array."""
+
+	games = list(games)
+	boards = numpy.zeros((len(games), ROWS, COLUMNS), dtype=numpy.int8)
+	for k, game in enumerate(games):
+		for (i, j), gamePiece in game.get_board().items():
+			if gamePiece is not None:
+				code = PIECE_CODES[gamePiece.get_name()]
+				boards[k, i, j] = code if gamePiece.get_player() == "BLUE" else -code
+	return boards
+
+
+def check_boards(boards):
+	"""Takes a batch of positions as parameter and returns it as an int8 array.
+	Raises ValueError if its shape or any of its codes is not valid."""
+
+	boards = numpy.asarray(boards, dtype=numpy.int8)
+	if boards.ndim != 3 or boards.shape[1:] != (ROWS, COLUMNS):
+		raise ValueError("expected an array of shape (N, %d, %d), got %s" % (ROWS, COLUMNS, boards.shape))
+	if boards.size and numpy.abs(boards.astype(numpy.int16)).max() > MAX_CODE:
+		raise ValueError("piece codes must be between %d and %d" % (-MAX_CODE, MAX_CODE))
+	return boards
+
+
+def material(boards):
+	"""Takes a batch of positions as parameter and returns the material of Blue less that of Red for each."""
+	return MATERIAL_VALUES[boards.astype(numpy.intp) + MAX_CODE].sum(axis=(1, 2))
+
+
+def square_values(boards):
+	"""Takes a batch of positions as parameter and returns the material and piece-square value of Blue less that
+	of Red for each, which is the same as JanggiGame.compute_evaluation."""
+
+	codes = boards.astype(numpy.intp) + MAX_CODE
+	return SQUARE_VALUES[codes, numpy.arange(ROWS)[:, None], numpy.arange(COLUMNS)].sum(axis=(1, 2))
+
+
+def palace_safety(boards):
+	"""Takes a batch of positions as parameter and returns the palace safety of Blue less that of Red for each:
+	a bonus for each Guard inside its own palace and a penalty for each opposing game piece, other than a General
+	or a Guard, that has entered the palace."""
+
+	safety = numpy.zeros(len(boards), dtype=numpy.int32)
+	for player, sign in (("BLUE", 1), ("RED", -1)):
+		palace = boards[:, PALACE_ROWS[player], PALACE_COLUMNS] * sign
+		guards = (palace == PIECE_CODES["Guard"]).sum(axis=(1, 2))
+		intruders = (palace <= -PIECE_CODES["Horse"]).sum(axis=(1, 2))
+		safety += sign * (GUARD_BONUS * guards - INTRUDER_PENALTY * intruders)
+	return safety
+
+
+def _empty_runs(empty):
+	"""Takes an (N, 10, 9) array of whether each position is empty as parameter. Returns the total number of
+	empty positions in a straight line from each position, up to the first game piece, in all four directions."""
+
+	runs = numpy.zeros(empty.shape, dtype=numpy.int32)
+	step = numpy.zeros(empty.shape, dtype=numpy.int32)
+	for axis, size in ((1, ROWS), (2, COLUMNS)):
+		for indices in (range(size - 2, -1, -1), range(1, size)):
+			step[:] = 0
+			for index in indices:
+				neighbor = index + 1 if indices.step < 0 else index - 1
+				current = [slice(None)] * 3
+				previous = [slice(None)] * 3
+				current[axis] = index
+				previous[axis] = neighbor
+				step[tuple(current)] = empty[tuple(previous)] * (1 + step[tuple(previous)])
+			runs += step
+	return runs
+
+
+def mobility(boards):
+	"""Takes a batch of positions as parameter and returns an approximation of the mobility of Blue less that of
+	Red for each: the number of empty positions that the Chariots can move to along ranks and files, and the number
+	of positions that the Horses can move to without being blocked or landing on a game piece of their own.
+	Palace diagonals and captures by the Chariot are not counted."""
+
+	runs = _empty_runs(boards == 0)
+	padded = numpy.pad(boards, ((0, 0), (2, 2), (2, 2)), constant_values=OFF_BOARD)
+
+	def shifted(offset):
+		return padded[:, 2 + offset[0]:2 + offset[0] + ROWS, 2 + offset[1]:2 + offset[1] + COLUMNS]
+
+	scores = numpy.zeros(len(boards), dtype=numpy.int32)
+	for sign in (1, -1):
+		chariots = boards == sign * PIECE_CODES["Chariot"]
+		horses = boards == sign * PIECE_CODES["Horse"]
+		horseMoves = numpy.zeros(boards.shape, dtype=numpy.int32)
+		for leg, target in HORSE_MOVES:
+			landing = shifted(target)
+			horseMoves += (shifted(leg) == 0) & (landing != OFF_BOARD) & (landing * sign <= 0)
+		count = (runs * chariots).sum(axis=(1, 2)) + (horseMoves * horses).sum(axis=(1, 2))
+		scores += sign * MOBILITY_WEIGHT * count
+	return scores
+
+
+def evaluate_batch(boards):
+	"""Takes a batch of positions as an (N, 10, 9) int8 array as parameter. Returns a dictionary of arrays of
+	the material, the piece-square values, the palace safety, the mobility and their total for each position,
+	from the point of view of Blue. The piece-square values do not include the material.
+	Raises ValueError if the batch is not valid."""
+
+	boards = check_boards(boards)
+	materials = material(boards)
+	evaluation = {"material": materials, "piece_square": square_values(boards) - materials,
+	              "palace_safety": palace_safety(boards), "mobility": mobility(boards)}
+	evaluation["total"] = sum(evaluation.values())
+	return evaluation
@@ -0,0 +1,165 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Benchmarks of the Janggi rules, compared against a stored baseline to catch regressions.
+#                   Run "python Benchmark_JanggiGame.py --save" to store a baseline, and
+#                   "python Benchmark_JanggiGame.py" to compare a run against it.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import timeit
+from JanggiGame import JanggiGame, PIECE_NAMES
+from OpeningBook import parse_game_record
+
+
+# Default baseline file, stored next to this file.
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Benchmark_JanggiGame.json")
+
+# A run regresses if a benchmark takes this much longer than its baseline.
+THRESHOLD = 0.25
+
+# Recorded games that are replayed with make_move.
+GAME_RECORDS = [
+	"I7-I6 I4-H4 D10-D9 I1-I6 I10-I6 B1-D4 D9-D8 H1-I3 I6-G6 E2-F3 H10-I8 D4-B1 E7-F7 A1-A2 G6-G4 H3-H5 G4-E4 H5-H2 "
+	"B8-F8 BLUE_WON",
+	"G7-F7 I4-I5 C7-C6 E4-D4 C10-D8 A1-A3 A7-A6 G4-G5 F10-E10 F1-E1 E9-F8 A4-A5 A6-A5 A3-A5 A10-A5 E1-F1 A5-D5 "
+	"F1-E1 I10-I8 D4-D5 H8-E8 E2-F1 E8-E1 D1-E1 B8-E8 C4-D4 E8-E1 G5-H5 I7-H7 F1-E1 I8-I5 D5-E5 I5-H5 I1-I10 "
+	"E10-F10 H3-H7 F7-G7 I10-H10 D8-B7 H1-I3 H5-G5 H7-E7 G5-G1 E1-E2 B10-E8 H10-G10 G7-H7 G10-F10 RED_WON",
+]
+
+
+def get_positions():
+	"""Returns a dictionary from the name of each fixed position to a game in that position:
+	the starting position, a quiet middle game, a position where Red is in check and one where Red is checkmated."""
+
+	quiet = JanggiGame()
+	quiet.apply_moves(parse_game_record(GAME_RECORDS[1])[0][:20])
+
+	check = JanggiGame()
+	check.set_position({(9, 4): ("BLUE", "General"), (5, 4): ("BLUE", "Chariot"), (6, 8): ("BLUE", "Chariot"),
+	                    (0, 4): ("RED", "General")}, "RED")
+
+	mate = JanggiGame()
+	mate.apply_moves(parse_game_record(GAME_RECORDS[0])[0])
+
+	return {"start": JanggiGame(), "quiet": quiet, "check": check, "mate": mate}
+
+
+def get_benchmarks():
+	"""Returns a dictionary from the name of each benchmark to a function that runs it once."""
+
+	positions = get_positions()
+	benchmarks = {}
+
+	# legal_moves of every game piece of one type, over all fixed positions
+	for name in PIECE_NAMES:
+		pieces = [(game.get_board(), position, gamePiece) for game in positions.values()
+		          for position, gamePiece in game.get_board().items()
+		          if gamePiece is not None and gamePiece.get_name() == name]
+		benchmarks[name + ".legal_moves"] = lambda pieces=pieces: [gamePiece.legal_moves(board, position)
+		                                                          for board, position, gamePiece in pieces]
+
+	for label in ("quiet", "check", "mate"):
+		game = positions[label]
+		benchmarks["is_in_check." + label] = lambda game=game: game.is_in_check("RED")
+		benchmarks["is_checkmate." + label] = lambda game=game: game.is_checkmate("RED")
+
+	def replay(moves):
+		game = JanggiGame()
+		for fromSquare, toSquare in moves:
+			game.make_move(fromSquare, toSquare)
+
+	for i, record in enumerate(GAME_RECORDS):
+		benchmarks["make_move.game" + str(i + 1)] = lambda moves=parse_game_record(record)[0]: replay(moves)
+
+	def print_board(game):
+		with contextlib.redirect_stdout(io.StringIO()):
+			game.print_board()
+
+	benchmarks["print_board"] = lambda game=positions["quiet"]: print_board(game)
+	benchmarks["JanggiGame"] = JanggiGame
+	return benchmarks
+
+
+def run_benchmarks(names=None, repeat=5, duration=0.2):
+	"""Takes the names of the benchmarks to be run (all by default), the number of times each is timed and
+	the minimum duration of each timing in seconds as parameters. Returns a dictionary from the name of each
+	benchmark to the shortest time of one run in seconds."""
+
+	results = {}
+	for name, function in get_benchmarks().items():
+		if names is not None and name not in names:
+			continue
+		timer = timeit.Timer(function)
+		number, elapsed = timer.autorange()
+		number = max(1, int(number * duration / max(elapsed, 1e-9)))
+		results[name] = min(timer.repeat(repeat, number)) / number
+	return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+	"""Takes the results of a run, the results of the baseline and the threshold as parameters.
+	Returns a list of tuples (name, baseline time, time, ratio) of every benchmark that has become slower
+	than its baseline by more than the threshold. Benchmarks missing from the baseline are not compared."""
+
+	regressions = []
+	for name, time in sorted(results.items()):
+		if name in baseline and time > baseline[name] * (1 + threshold):
+			regressions.append((name, baseline[name], time, time / baseline[name]))
+	return regressions
+
+
+def load_baseline(path):
+	"""Takes the path of a baseline file as parameter and returns the results stored in it."""
+
+	with open(path) as baselineFile:
+		return json.load(baselineFile)["results"]
+
+
+def save_baseline(results, path):
+	"""Takes the results of a run and the path of a baseline file as parameters. Stores the results. Returns None."""
+
+	with open(path, "w") as baselineFile:
+		json.dump({"python": sys.version.split()[0], "results": results}, baselineFile, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+	"""Runs the benchmarks and compares them against the baseline, or stores them as the baseline.
+	Returns 1 if any benchmark has regressed past the threshold, and 0 otherwise."""
+
+	parser = argparse.ArgumentParser(description="Benchmarks of the Janggi rules.")
+	parser.add_argument("--baseline", default=BASELINE_PATH, help="path of the baseline file")
+	parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+	parser.add_argument("--threshold", type=float, default=THRESHOLD,
+	                    help="fraction by which a benchmark may be slower than its baseline")
+	parser.add_argument("--repeat", type=int, default=5, help="number of times each benchmark is timed")
+	parser.add_argument("names", nargs="*", help="names of the benchmarks to run (all by default)")
+	args = parser.parse_args(argv)
+
+	results = run_benchmarks(args.names or None, args.repeat)
+	baseline = {}
+	if not args.save and os.path.exists(args.baseline):
+		baseline = load_baseline(args.baseline)
+
+	for name, time in results.items():
+		line = "%-26s %12.2f us" % (name, time * 1e6)
+		if name in baseline:
+			line += "  %+7.1f%%" % ((time / baseline[name] - 1) * 100)
+		print(line)
+
+	if args.save:
+		save_baseline(results, args.baseline)
+		print("Baseline stored in " + args.baseline)
+		return 0
+
+	regressions = compare(results, baseline, args.threshold)
+	for name, baselineTime, time, ratio in regressions:
+		print("REGRESSION %s: %.2f us -> %.2f us (%.2fx)" % (name, baselineTime * 1e6, time * 1e6, ratio))
+	return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,109 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      A background thread that searches, lists legal moves and checks for checkmate away from the
+#                   thread of a user interface.
+
+import copy
+import functools
+import queue
+import threading
+from JanggiGame import POSITION_SQUARES
+from JanggiEngine import JanggiEngine
+
+
+class EngineWorker:
+	"""A class that represent a worker thread for a user interface. Each job works on its own copy of the game,
+	taken when the job is submitted, so that the user interface can keep using the game while the job runs.
+	Results are handed to the post function, such as lambda callback: root.after(0, callback), so that the
+	callbacks run on the thread of the user interface. Cancelled jobs never call back."""
+
+	def __init__(self, post, depth=4, table_size_mb=16, **options):
+		"""Instantiate the worker and start its thread. Takes the function that runs a callback on the thread of
+		the user interface, the depth of the search, the size of the transposition table in MB and any other
+		options of JanggiEngine as parameters."""
+
+		self._post = post
+		self._depth = depth
+		self._engine = JanggiEngine(None, table_size_mb, **options)
+		self._jobs = queue.Queue()
+		self._generation = 0
+		self._stop_event = threading.Event()
+		self._thread = threading.Thread(target=self._run, name="EngineWorker", daemon=True)
+		self._thread.start()
+
+	def _submit(self, function, game, callback):
+		"""Takes a function of a copy of the game, the game and the callback of the result as parameters.
+		Queues the job. Returns None."""
+		self._jobs.put((self._generation, self._stop_event, function, copy.deepcopy(game), callback))
+
+	def submit_search(self, game, callback, depth=None):
+		"""Takes a game, a callback and the depth of the search (the depth of the worker by default) as parameters.
+		Searches the best move of the player whose turn it is, and calls back with a pair of the move as a pair of
+		squares (None if there is no move) and its score. Returns None."""
+
+		def search(gameCopy, stopEvent):
+			self._engine.set_game(gameCopy)
+			move, score = self._engine.search(depth or self._depth, stop_event=stopEvent)
+			if move is None:
+				return None, score
+			return (POSITION_SQUARES[move[0]], POSITION_SQUARES[move[1]]), score
+
+		self._submit(search, game, callback)
+
+	def submit_legal_moves(self, game, position, callback):
+		"""Takes a game, a position and a callback as parameters. Calls back with the list of positions that
+		the game piece on the position can legally move to, without passing the turn. Returns None."""
+
+		def legal_moves(gameCopy, stopEvent):
+			gamePiece = gameCopy.get_board()[position]
+			if gamePiece is None:
+				return []
+			return [toPosition for toPosition in gamePiece.legal_moves(gameCopy.get_board(), position)
+			        if toPosition != position and gameCopy.is_legal_move(position, toPosition)]
+
+		self._submit(legal_moves, game, callback)
+
+	def submit_status(self, game, callback):
+		"""Takes a game and a callback as parameters. Calls back with a pair of the game state and whether
+		the player whose turn it is is in check. Returns None."""
+
+		def status(gameCopy, stopEvent):
+			return gameCopy.get_game_state(), gameCopy.is_in_check(gameCopy.get_turn())
+
+		self._submit(status, game, callback)
+
+	def cancel(self):
+		"""Cancels every job that has been submitted so far, stopping a search that is running. Must be called
+		from the thread of the user interface, such as when the user makes or takes back a move. Returns None."""
+
+		self._generation += 1
+		self._stop_event.set()
+		self._stop_event = threading.Event()
+
+	def close(self):
+		"""Cancels every job and stops the thread. Returns None."""
+
+		self.cancel()
+		self._jobs.put(None)
+		self._thread.join()
+
+	def _run(self):
+		"""Runs the jobs one at a time until the worker is closed. Returns None."""
+
+		while True:
+			job = self._jobs.get()
+			if job is None:
+				return
+			generation, stopEvent, function, game, callback = job
+			if stopEvent.is_set():
+				continue
+			result = function(game, stopEvent)
+			if not stopEvent.is_set():
+				self._post(functools.partial(self._deliver, generation, callback, result))
+
+	def _deliver(self, generation, callback, result):
+		"""Runs on the thread of the user interface. Calls back with the result unless the job has been cancelled
+		after it finished. Returns None."""
+
+		if generation == self._generation:
+			callback(result)
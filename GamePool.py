@@ -0,0 +1,72 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      A pool of reusable Janggi games, so that a server starting many games resets finished games
+#                   instead of building new ones.
+
+import contextlib
+import threading
+import weakref
+from JanggiGame import JanggiGame
+
+
+class GamePool:
+	"""A class that represent a pool of games that share the same options. Released games are kept, up to the
+	size of the pool, and reset to a new game when they are acquired again. The pool can be used from several
+	threads at once."""
+
+	def __init__(self, size=64, **options):
+		"""Instantiate the pool. Takes the maximum number of released games to keep and the options of
+		JanggiGame, such as lazy_game_state, as parameters."""
+
+		self._size = size
+		self._options = options
+		self._games = []
+		self._created = weakref.WeakSet()
+		self._lock = threading.Lock()
+		self._stats = {"created": 0, "reused": 0}
+
+	def get_stats(self):
+		"""Returns a dictionary of the number of games that have been created and reused."""
+		return dict(self._stats)
+
+	def __len__(self):
+		"""Returns the number of released games kept by the pool."""
+		return len(self._games)
+
+	def acquire(self, blue_arrangement="EHEH", red_arrangement="EHEH"):
+		"""Takes the arrangement of the Horses and Elephants of Blue and of Red as parameters.
+		Returns a game at its initial position, reusing a released game if there is one."""
+
+		with self._lock:
+			game = self._games.pop() if self._games else None
+			self._stats["reused" if game is not None else "created"] += 1
+
+		if game is None:
+			game = JanggiGame(blue_arrangement=blue_arrangement, red_arrangement=red_arrangement, **self._options)
+			with self._lock:
+				self._created.add(game)
+			return game
+		game.reset(blue_arrangement, red_arrangement)
+		return game
+
+	def release(self, game):
+		"""Takes a game acquired from the pool, which must no longer be used, as parameter and keeps it for reuse.
+		The game is dropped if the pool is full. Raises ValueError if the game was not created by this pool,
+		since it could have other options, or if it has already been released. Returns None."""
+
+		with self._lock:
+			if game not in self._created or any(pooled is game for pooled in self._games):
+				raise ValueError("the game was not acquired from this pool")
+			if len(self._games) < self._size:
+				self._games.append(game)
+
+	@contextlib.contextmanager
+	def game(self, blue_arrangement="EHEH", red_arrangement="EHEH"):
+		"""Takes the arrangement of the Horses and Elephants of Blue and of Red as parameters.
+		Acquires a game for a with block, and releases it when the block ends."""
+
+		game = self.acquire(blue_arrangement, red_arrangement)
+		try:
+			yield game
+		finally:
+			self.release(game)
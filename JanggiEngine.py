@@ -0,0 +1,509 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      An alpha-beta search engine that plays Janggi.
+
+import copy
+import threading
+from JanggiGame import PIECE_VALUES, POSITION_SQUARES
+from TranspositionTable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+# Score of checkmating the opponent. Scores of checkmates found later in the search are closer to zero.
+MATE_SCORE = 100000
+MATE_THRESHOLD = MATE_SCORE - 1000
+INFINITY = MATE_SCORE + 1
+
+
+# Selective search techniques that can be turned off to measure how many nodes they save.
+	# Key:      the option of the engine.
+	# Value:    the value of the option that turns the technique off.
+SELECTIVE_TECHNIQUES = {"null_move": False, "late_move_reductions": False,
+                        "principal_variation": False, "aspiration_window": None, "see_pruning": False}
+
+
+class JanggiEngine:
+	"""A class that represent an engine that searches a Janggi game for the best move.
+	The search is an iterative deepening alpha-beta search with a transposition table,
+	followed by a quiescence search over captures at depth zero.
+	The search can be made selective with null-move pruning, late move reductions,
+	principal variation search and aspiration windows."""
+
+	def __init__(self, game, table_size_mb=16, quiescence=True, check_evasions=True,
+	             delta_margin=200, max_quiescence_depth=8, null_move=True, null_move_reduction=2,
+	             late_move_reductions=True, reduction_depth=3, reduction_moves=4,
+	             principal_variation=True, aspiration_window=50, see_pruning=True):
+		"""Instantiate the engine. Takes the game to be searched, the size of the transposition table in MB,
+		and the options of the search as parameters:
+			quiescence:             whether captures are searched further at depth zero.
+			check_evasions:         whether all moves, and not only captures, are searched when in check.
+			delta_margin:           captures that cannot raise the score to alpha even with this margin are skipped.
+			max_quiescence_depth:   the maximum number of plies of the quiescence search.
+			null_move:              whether to prune positions where passing the turn still fails high.
+			null_move_reduction:    how much shallower passing the turn is searched.
+			late_move_reductions:   whether quiet moves late in the move order are first searched one ply shallower.
+			reduction_depth:        the minimum remaining depth for late move reductions.
+			reduction_moves:        the number of moves searched before late move reductions start.
+			principal_variation:    whether moves after the first are searched with a null window first.
+			aspiration_window:      the width of the window around the previous score at the root, or None.
+			see_pruning:            whether captures that lose material in a static exchange are skipped
+			                        by the quiescence search."""
+
+		self._game = game
+		self._table_size_mb = table_size_mb
+		self._table = TranspositionTable(table_size_mb)
+		self._quiescence = quiescence
+		self._check_evasions = check_evasions
+		self._delta_margin = delta_margin
+		self._max_quiescence_depth = max_quiescence_depth
+		self._null_move = null_move
+		self._null_move_reduction = null_move_reduction
+		self._late_move_reductions = late_move_reductions
+		self._reduction_depth = reduction_depth
+		self._reduction_moves = reduction_moves
+		self._principal_variation = principal_variation
+		self._aspiration_window = aspiration_window
+		self._see_pruning = see_pruning
+		self._root_move = None
+		self._stop_event = None
+		self._stats = {}
+		self.reset_stats()
+
+	def get_game(self):
+		"""Returns the game searched by the engine."""
+		return self._game
+
+	def set_game(self, game):
+		"""Takes a game as parameter and makes it the game searched by the engine, such as a copy of the game that
+		is played. The transposition table is kept, since its entries are keyed by position. Returns None."""
+		self._game = game
+
+	def get_table(self):
+		"""Returns the transposition table of the engine."""
+		return self._table
+
+	def get_options(self):
+		"""Returns a dictionary with all the options the engine has been instantiated with."""
+		return {"table_size_mb": self._table_size_mb, "quiescence": self._quiescence,
+		        "check_evasions": self._check_evasions, "delta_margin": self._delta_margin,
+		        "max_quiescence_depth": self._max_quiescence_depth, "null_move": self._null_move,
+		        "null_move_reduction": self._null_move_reduction, "late_move_reductions": self._late_move_reductions,
+		        "reduction_depth": self._reduction_depth, "reduction_moves": self._reduction_moves,
+		        "principal_variation": self._principal_variation, "aspiration_window": self._aspiration_window,
+		        "see_pruning": self._see_pruning}
+
+	def get_stats(self):
+		"""Returns a dictionary with the number of nodes searched by the alpha-beta and the quiescence search,
+		and the number of times each selective technique has cut off or re-searched a node."""
+		return dict(self._stats)
+
+	def reset_stats(self):
+		"""Resets all the counters of the engine. Returns None."""
+		self._stats = {"nodes": 0, "quiescence_nodes": 0, "null_move_cutoffs": 0, "see_prunes": 0,
+		               "late_move_reductions": 0, "late_move_researches": 0,
+		               "principal_variation_researches": 0, "aspiration_researches": 0}
+
+	def measure_savings(self, depth, player=None):
+		"""Takes the depth of the search and the player to move as parameters.
+		Searches the game once with the options of this engine and once more with each selective technique turned off,
+		each time with an empty transposition table. Returns a dictionary with the number of nodes
+		saved by each technique, which is negative if the technique searched more nodes."""
+
+		def count_nodes(options):
+			engine = JanggiEngine(self._game, **options)
+			engine.search(depth, player)
+			stats = engine.get_stats()
+			return stats["nodes"] + stats["quiescence_nodes"]
+
+		options = self.get_options()
+		nodes = count_nodes(options)
+		savings = {}
+		for technique, disabled in SELECTIVE_TECHNIQUES.items():
+			if options[technique] == disabled:
+				continue
+			savings[technique] = count_nodes(dict(options, **{technique: disabled})) - nodes
+		return savings
+
+	def search(self, depth, player=None, stop_event=None):
+		"""Takes the depth of the search, the player to move, which defaults to the player whose turn it is,
+		and an optional threading.Event that stops the search once it is set as parameters.
+		Returns the best move (a pair of from and to position) and its score.
+		A move from and to the same position passes the turn.
+		A stopped search returns the result of the deepest iteration it has completed."""
+
+		if player is None:
+			player = self._game.get_turn()
+
+		score = 0
+		bestMove, bestScore = None, 0
+		self._root_move = None
+		self._stop_event = stop_event
+		for currentDepth in range(1, depth + 1):
+
+			# Search a narrow window around the previous score first, and the full window if the score falls outside.
+			searched = False
+			if self._aspiration_window is not None and currentDepth > 1 and abs(score) < MATE_THRESHOLD:
+				alpha, beta = score - self._aspiration_window, score + self._aspiration_window
+				score = self._alpha_beta(player, currentDepth, alpha, beta, 0)
+				searched = alpha < score < beta
+				if not searched:
+					self._stats["aspiration_researches"] += 1
+
+			if not searched:
+				score = self._alpha_beta(player, currentDepth, -INFINITY, INFINITY, 0)
+			if self._is_stopped():
+				break
+			bestMove, bestScore = self._root_move, score
+
+		self._stop_event = None
+		if bestMove is None:
+			return self._root_move, bestScore
+		return bestMove, bestScore
+
+	def choose_move(self, depth, player=None, stop_event=None):
+		"""Takes the depth of the search, the player to move and an optional threading.Event that stops the search
+		as parameters. Returns the best move as a pair of squares that can be passed to make_move, or None if the
+		search finds no move, because the player has no legal move or the search is stopped before its first move."""
+
+		move, _ = self.search(depth, player, stop_event)
+		if move is None:
+			return None
+		return POSITION_SQUARES[move[0]], POSITION_SQUARES[move[1]]
+
+	def _is_stopped(self):
+		"""Returns True if the search has been asked to stop, and False otherwise."""
+		return self._stop_event is not None and self._stop_event.is_set()
+
+	def _pass_move(self, player):
+		"""Takes the player as parameter and returns the move that passes the turn."""
+		general = self._game.get_players()[player][0]
+		position = self._game.get_position(general)
+		return position, position
+
+	def _order_moves(self, moves, bestMove=None):
+		"""Takes a list of moves and the best move found before as parameters.
+		Returns the moves sorted with the best move first, followed by captures of the most valuable
+		game pieces by the least valuable game pieces, and then all other moves."""
+
+		board = self._game.get_board()
+
+		def move_order(move):
+			if move == bestMove:
+				return -INFINITY
+			captured = board[move[1]]
+			if captured is None:
+				return 0
+			return PIECE_VALUES[board[move[0]].get_name()] // 100 - PIECE_VALUES[captured.get_name()]
+
+		return sorted(moves, key=move_order)
+
+	def _alpha_beta(self, player, depth, alpha, beta, ply, allowNullMove=True):
+		"""Takes the player to move, the remaining depth, the alpha and beta bounds, the distance from the root and
+		whether passing the turn may be used for null-move pruning as parameters.
+		Returns the score of the position from the point of view of the player."""
+
+		game = self._game
+		if self._is_stopped():
+			return 0
+		if depth <= 0:
+			if self._quiescence:
+				return self._quiescence_search(player, alpha, beta, ply, 0)
+			return game.evaluate(player)
+
+		self._stats["nodes"] += 1
+		originalAlpha = alpha
+
+		# Look up the position in the transposition table.
+		positionHash = game.get_position_hash(player)
+		entry = self._table.probe(positionHash)
+		bestMove = None
+		if entry is not None:
+			entryDepth, entryScore, bound, bestMove = entry
+			entryScore = self._score_from_table(entryScore, ply)
+			if entryDepth >= depth and ply > 0:
+				if bound == EXACT:
+					return entryScore
+				if bound == LOWER_BOUND and entryScore >= beta:
+					return entryScore
+				if bound == UPPER_BOUND and entryScore <= alpha:
+					return entryScore
+
+		opponent = game.get_opponent(player)
+		inCheck = game.is_in_check(player)
+		board = game.get_board()
+
+		# Null-move pruning: passing the turn is a legal move in Janggi. If the opponent still cannot reach beta
+		# after a pass searched at a reduced depth, then a real move would fail high as well.
+		if self._null_move and allowNullMove and not inCheck and ply > 0 and \
+				depth > self._null_move_reduction and beta < MATE_THRESHOLD:
+			score = -self._alpha_beta(opponent, depth - 1 - self._null_move_reduction, -beta, -beta + 1, ply + 1, False)
+			if score >= beta:
+				self._stats["null_move_cutoffs"] += 1
+				return score
+
+		# Passing the turn is a legal move as long as the player is not in check.
+		moves = self._order_moves(game.generate_moves(player), bestMove)
+		if not inCheck:
+			moves.append(self._pass_move(player))
+
+		bestScore = -INFINITY
+		bestMove = None
+		searched = 0
+		for move in moves:
+			fromPosition, toPosition = move
+			isPass = fromPosition == toPosition
+			captured = None
+			if not isPass:
+
+				# The opponent has left his/her general in check, so the position cannot be reached in a game.
+				if board[toPosition] is not None and board[toPosition].get_name() == "General":
+					return MATE_SCORE - ply
+
+				captured = game.try_move(fromPosition, toPosition)
+				if game.is_in_check(player):
+					game.restore_move(fromPosition, toPosition, captured)
+					continue
+			searched += 1
+
+			# The first move is searched with the full window and to the full depth.
+			if searched == 1:
+				score = -self._alpha_beta(opponent, depth - 1, -beta, -alpha, ply + 1, not isPass)
+			else:
+				newDepth = depth - 1
+
+				# Late move reductions: quiet moves late in the move order are first searched one ply shallower.
+				if self._late_move_reductions and depth >= self._reduction_depth and \
+						searched > self._reduction_moves and not inCheck and captured is None and \
+						not isPass and not game.is_in_check(opponent):
+					self._stats["late_move_reductions"] += 1
+					newDepth -= 1
+
+				# Principal variation search: first prove that the move is no better than alpha with a null window.
+				if self._principal_variation:
+					windowAlpha, windowBeta = alpha, alpha + 1
+				else:
+					windowAlpha, windowBeta = alpha, beta
+
+				score = -self._alpha_beta(opponent, newDepth, -windowBeta, -windowAlpha, ply + 1, not isPass)
+				if score > alpha and newDepth < depth - 1:
+					self._stats["late_move_researches"] += 1
+					score = -self._alpha_beta(opponent, depth - 1, -windowBeta, -windowAlpha, ply + 1, not isPass)
+				if self._principal_variation and alpha < score < beta:
+					self._stats["principal_variation_researches"] += 1
+					score = -self._alpha_beta(opponent, depth - 1, -beta, -alpha, ply + 1, not isPass)
+
+			if not isPass:
+				game.restore_move(fromPosition, toPosition, captured)
+
+			# The score of a stopped search is not reliable, so nothing is stored.
+			if self._is_stopped():
+				return 0
+
+			if score > bestScore:
+				bestScore, bestMove = score, move
+				if ply == 0:
+					self._root_move = move
+			if score > alpha:
+				alpha = score
+			if alpha >= beta:
+				break
+
+		# The player is checkmated if there is no legal move.
+		if bestMove is None:
+			return -MATE_SCORE + ply
+
+		if bestScore <= originalAlpha:
+			bound = UPPER_BOUND
+		elif bestScore >= beta:
+			bound = LOWER_BOUND
+		else:
+			bound = EXACT
+		self._table.store(positionHash, depth, self._score_to_table(bestScore, ply), bound, bestMove)
+		return bestScore
+
+	def _quiescence_search(self, player, alpha, beta, ply, quiescenceDepth):
+		"""Takes the player to move, the alpha and beta bounds, the distance from the root and from the start
+		of the quiescence search as parameters. Searches captures only, or all moves if the player is in check,
+		until the position is quiet. Returns the score of the position from the point of view of the player."""
+
+		game = self._game
+		if self._is_stopped():
+			return 0
+		self._stats["quiescence_nodes"] += 1
+
+		inCheck = self._check_evasions and game.is_in_check(player)
+		standPat = game.evaluate(player)
+		if quiescenceDepth >= self._max_quiescence_depth:
+			return standPat
+
+		# The player can choose not to capture anything, unless he or she has to escape from check.
+		if not inCheck:
+			if standPat >= beta:
+				return standPat
+			if standPat > alpha:
+				alpha = standPat
+
+			# Delta pruning: stop if even capturing a Chariot cannot raise the score to alpha.
+			if standPat + PIECE_VALUES["Chariot"] + self._delta_margin < alpha:
+				return alpha
+			moves = self._order_moves(game.generate_captures(player))
+			bestScore = standPat
+		else:
+			moves = self._order_moves(game.generate_moves(player))
+			bestScore = -INFINITY
+
+		board = game.get_board()
+		opponent = game.get_opponent(player)
+		for fromPosition, toPosition in moves:
+
+			# The opponent has left his/her general in check, so the position cannot be reached in a game.
+			captured = board[toPosition]
+			if captured is not None and captured.get_name() == "General":
+				return MATE_SCORE - ply
+
+			# Delta pruning: skip captures that cannot raise the score to alpha.
+			if not inCheck and standPat + PIECE_VALUES[captured.get_name()] + self._delta_margin < alpha:
+				continue
+
+			# Skip captures that lose material once the exchange on the square is played out.
+			if not inCheck and self._see_pruning and game.see(fromPosition, toPosition) < 0:
+				self._stats["see_prunes"] += 1
+				continue
+
+			captured = game.try_move(fromPosition, toPosition)
+			if game.is_in_check(player):
+				game.restore_move(fromPosition, toPosition, captured)
+				continue
+			score = -self._quiescence_search(opponent, -beta, -alpha, ply + 1, quiescenceDepth + 1)
+			game.restore_move(fromPosition, toPosition, captured)
+
+			if score > bestScore:
+				bestScore = score
+			if score > alpha:
+				alpha = score
+			if alpha >= beta:
+				break
+
+		# The player is checkmated if there is no move to escape from check.
+		if bestScore == -INFINITY:
+			return -MATE_SCORE + ply
+		return bestScore
+
+	def _score_to_table(self, score, ply):
+		"""Takes a score and the distance from the root as parameters.
+		Returns the score to be stored in the transposition table, with checkmates counted from the position."""
+
+		if score >= MATE_THRESHOLD:
+			return score + ply
+		if score <= -MATE_THRESHOLD:
+			return score - ply
+		return score
+
+	def _score_from_table(self, score, ply):
+		"""Takes a score stored in the transposition table and the distance from the root as parameters.
+		Returns the score with checkmates counted from the root."""
+
+		if score >= MATE_THRESHOLD:
+			return score - ply
+		if score <= -MATE_THRESHOLD:
+			return score + ply
+		return score
+
+
+class Ponderer:
+	"""A class that represent pondering: searching on a background thread while the opponent is thinking.
+	The ponderer predicts the reply of the opponent from the transposition table and searches the position after it.
+	If the opponent plays the predicted move, the result is already there. Otherwise the search is stopped, and
+	the position that has been reached is searched with the transposition table that the pondering has filled.
+	The engine must not be used by anything else while it is pondering."""
+
+	def __init__(self, engine, depth, time_limit=30, move_time=5):
+		"""Instantiate the ponderer. Takes the engine, the depth of the search, the maximum number of seconds
+		that a pondering search may take (None for no limit), and the maximum number of seconds that a pondering
+		search is left to run once the opponent has played the predicted move as parameters."""
+
+		self._engine = engine
+		self._depth = depth
+		self._time_limit = time_limit
+		self._move_time = move_time
+		self._thread = None
+		self._stop_event = None
+		self._timer = None
+		self._prediction = None
+		self._ponder_hash = None
+		self._result = None
+		self._stats = {"hits": 0, "misses": 0}
+
+	def get_stats(self):
+		"""Returns a dictionary with the number of times the opponent played and did not play the predicted move."""
+		return dict(self._stats)
+
+	def get_prediction(self):
+		"""Returns the predicted move of the opponent as a pair of squares, or None if there is none."""
+		return self._prediction
+
+	def is_pondering(self):
+		"""Returns True if the pondering search is still running, and False otherwise."""
+		return self._thread is not None and self._thread.is_alive()
+
+	def start(self, game):
+		"""Takes the game, with the opponent to move, as parameter. Starts searching the position after
+		the predicted reply of the opponent on a background thread, or the current position if there is
+		no prediction. The game itself is not touched. Returns None."""
+
+		self.stop()
+		ponderGame = copy.deepcopy(game)
+		entry = self._engine.get_table().probe(game.get_position_hash())
+		self._prediction = None
+		if entry is not None and entry[3] is not None:
+			fromPosition, toPosition = entry[3]
+			if ponderGame.make_move(POSITION_SQUARES[fromPosition], POSITION_SQUARES[toPosition]):
+				self._prediction = POSITION_SQUARES[fromPosition], POSITION_SQUARES[toPosition]
+		self._ponder_hash = ponderGame.get_position_hash() if self._prediction is not None else None
+		self._result = None
+
+		stopEvent = threading.Event()
+		if self._time_limit is not None:
+			self._timer = threading.Timer(self._time_limit, stopEvent.set)
+			self._timer.daemon = True
+			self._timer.start()
+
+		# A stopped search still returns the result of the deepest iteration it has completed.
+		def ponder():
+			self._engine.set_game(ponderGame)
+			result = self._engine.search(self._depth, stop_event=stopEvent)
+			if result[0] is not None:
+				self._result = result
+
+		self._stop_event = stopEvent
+		self._thread = threading.Thread(target=ponder, name="Ponderer", daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		"""Stops the pondering search, if any, and waits for its thread to finish. Returns None."""
+
+		if self._thread is not None:
+			self._stop_event.set()
+			self._thread.join()
+			self._thread = None
+		if self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+
+	def get_move(self, game):
+		"""Takes the game, with the engine to move, as parameter. Returns the best move (a pair of from and
+		to position) and its score, from the pondering search if the opponent has played the predicted move,
+		or from a new search of the game otherwise. On a hit, the pondering search is left to run for at most
+		move_time more seconds, and the deepest iteration it has completed is used."""
+
+		hit = self._ponder_hash is not None and self._ponder_hash == game.get_position_hash()
+		if hit and self._thread is not None:
+			# The pondering search is already searching this position, so it is left to finish.
+			self._thread.join(self._move_time)
+		self.stop()
+
+		self._ponder_hash = None
+		self._stats["hits" if hit else "misses"] += 1
+		self._engine.set_game(game)
+		if hit and self._result is not None:
+			return self._result
+		return self._engine.search(self._depth)
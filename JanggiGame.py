@@ -2,51 +2,375 @@
 # Date:             03/09/2021
 # Description:      A complete Janggi game that can be played on the terminal.
 
+import random
+
+
+# Precomputed table of all 90 squares in algebraic notation and their positions in 2-tuple format.
+	# Key:      the square as a string [e.g. "A1"].
+	# Value:    the position of the square as a 2-tuple [e.g. (0, 0)].
+SQUARE_POSITIONS = {chr(j + 65) + str(i + 1): (i, j) for i in range(10) for j in range(9)}
+POSITION_SQUARES = {position: square for square, position in SQUARE_POSITIONS.items()}
+
+# An empty board, copied to start each board
+EMPTY_BOARD = {(i, j): None for i in range(10) for j in range(9)}
+
+# Names of all types of game pieces, in the order that each player holds them.
+PIECE_NAMES = ["General", "Guard", "Horse", "Elephant", "Chariot", "Cannon", "Soldier"]
+
+# Letters of the game pieces in the text notation of positions. Blue game pieces are written in upper case,
+# and Red game pieces in lower case.
+PIECE_LETTERS = {"General": "K", "Guard": "A", "Horse": "H", "Elephant": "E", "Chariot": "R", "Cannon": "C",
+                 "Soldier": "P"}
+LETTER_PIECES = {letter: name for name, letter in PIECE_LETTERS.items()}
+
+# Standard arrangements of the Horses and Elephants of a player: the letters of the game pieces on
+# columns B, C, G and H. Either side of the General can have the Horse inside or outside.
+ARRANGEMENTS = ("EHEH", "HEHE", "HEEH", "EHHE")
+ARRANGEMENT_COLUMNS = (1, 2, 6, 7)
+
+# Random 64-bit keys for hashing positions (Zobrist hashing). The hash of a position is the XOR of
+# the keys of every game piece on its square, and of ZOBRIST_RED_TURN if it is Red's turn.
+	# Key:      the player and the name of the game piece [e.g. ("BLUE", "Horse")].
+	# Value:    a dictionary from each position on the board to its key.
+_zobrist_random = random.Random(20210309)
+ZOBRIST_KEYS = {(player, name): {(i, j): _zobrist_random.getrandbits(64) for i in range(10) for j in range(9)}
+                for player in ["BLUE", "RED"]
+                for name in PIECE_NAMES}
+ZOBRIST_RED_TURN = _zobrist_random.getrandbits(64)
+
+# Standard material values of the game pieces. The General cannot be captured and has no material value.
+PIECE_VALUES = {"General": 0, "Guard": 300, "Horse": 500, "Elephant": 300,
+                "Chariot": 1300, "Cannon": 700, "Soldier": 200}
+
+# Values of the game pieces in a static exchange. Capturing the General ends any exchange.
+EXCHANGE_VALUES = dict(PIECE_VALUES, General=10000)
+
+# Bonus of each game piece on each square, from the point of view of Red (row 0 is Red's side of the board).
+# The tables are mirrored vertically for Blue.
+PIECE_SQUARE_TABLES = {
+	"General": [[0, 0, 0, -5, -5, -5, 0, 0, 0],
+	            [0, 0, 0, 0, 10, 0, 0, 0, 0],
+	            [0, 0, 0, -10, -5, -10, 0, 0, 0]] + [[0] * 9] * 7,
+	"Guard": [[0, 0, 0, 0, 0, 0, 0, 0, 0],
+	          [0, 0, 0, 5, 10, 5, 0, 0, 0],
+	          [0, 0, 0, 0, 5, 0, 0, 0, 0]] + [[0] * 9] * 7,
+	"Horse": [[-20, -10, -5, -5, -10, -5, -5, -10, -20],
+	          [-10, 0, 5, 0, -10, 0, 5, 0, -10],
+	          [-5, 5, 10, 10, 5, 10, 10, 5, -5],
+	          [-5, 5, 10, 15, 15, 15, 10, 5, -5],
+	          [0, 10, 15, 20, 20, 20, 15, 10, 0],
+	          [0, 10, 15, 20, 20, 20, 15, 10, 0],
+	          [0, 10, 20, 25, 25, 25, 20, 10, 0],
+	          [0, 10, 20, 30, 25, 30, 20, 10, 0],
+	          [-5, 5, 15, 20, 20, 20, 15, 5, -5],
+	          [-10, 0, 5, 10, 5, 10, 5, 0, -10]],
+	"Elephant": [[-5, 0, 0, -5, 0, -5, 0, 0, -5],
+	             [0, 0, 0, 0, 0, 0, 0, 0, 0],
+	             [0, 5, 5, 10, 10, 10, 5, 5, 0],
+	             [0, 5, 10, 10, 15, 10, 10, 5, 0],
+	             [0, 10, 15, 15, 15, 15, 15, 10, 0],
+	             [0, 10, 15, 15, 15, 15, 15, 10, 0],
+	             [0, 5, 10, 15, 15, 15, 10, 5, 0],
+	             [0, 5, 10, 15, 15, 15, 10, 5, 0],
+	             [0, 0, 5, 10, 10, 10, 5, 0, 0],
+	             [-5, 0, 0, 5, 5, 5, 0, 0, -5]],
+	"Chariot": [[-5, 0, 0, 5, 0, 5, 0, 0, -5],
+	            [0, 5, 5, 5, 5, 5, 5, 5, 0],
+	            [0, 5, 5, 5, 10, 5, 5, 5, 0],
+	            [5, 5, 5, 10, 10, 10, 5, 5, 5],
+	            [5, 10, 10, 10, 10, 10, 10, 10, 5],
+	            [5, 10, 10, 10, 10, 10, 10, 10, 5],
+	            [5, 10, 10, 15, 15, 15, 10, 10, 5],
+	            [10, 15, 15, 20, 20, 20, 15, 15, 10],
+	            [10, 15, 15, 20, 25, 20, 15, 15, 10],
+	            [5, 10, 10, 15, 15, 15, 10, 10, 5]],
+	"Cannon": [[0, 0, 5, 5, 5, 5, 5, 0, 0],
+	           [0, 5, 5, 5, 5, 5, 5, 5, 0],
+	           [0, 10, 5, 10, 15, 10, 5, 10, 0],
+	           [0, 5, 5, 5, 10, 5, 5, 5, 0],
+	           [0, 5, 5, 5, 10, 5, 5, 5, 0],
+	           [0, 5, 5, 5, 10, 5, 5, 5, 0],
+	           [0, 5, 5, 10, 10, 10, 5, 5, 0],
+	           [0, 5, 5, 15, 20, 15, 5, 5, 0],
+	           [0, 0, 5, 15, 10, 15, 5, 0, 0],
+	           [0, 0, 0, 10, 5, 10, 0, 0, 0]],
+	"Soldier": [[0, 0, 0, 0, 0, 0, 0, 0, 0],
+	            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+	            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+	            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+	            [5, 0, 5, 0, 10, 0, 5, 0, 5],
+	            [10, 10, 15, 20, 20, 20, 15, 10, 10],
+	            [15, 20, 25, 30, 30, 30, 25, 20, 15],
+	            [20, 25, 30, 45, 50, 45, 30, 25, 20],
+	            [20, 25, 30, 50, 60, 50, 30, 25, 20],
+	            [10, 15, 20, 35, 40, 35, 20, 15, 10]]}
+
+# Value of each game piece on each square, including its material value, from the point of view of Blue.
+	# Key:      the player and the name of the game piece [e.g. ("RED", "Horse")].
+	# Value:    a dictionary from each position on the board to its value (negative for Red's game pieces).
+PIECE_SQUARE_VALUES = {("RED", name): {(i, j): -(PIECE_VALUES[name] + PIECE_SQUARE_TABLES[name][i][j])
+                                      for i in range(10) for j in range(9)}
+                       for name in PIECE_VALUES}
+PIECE_SQUARE_VALUES.update({("BLUE", name): {(i, j): PIECE_VALUES[name] + PIECE_SQUARE_TABLES[name][9 - i][j]
+                                            for i in range(10) for j in range(9)}
+                            for name in PIECE_VALUES})
+
+
+def format_cell(max_spaces, center, left_filler=' ', right_filler=' ', num_cell=1):
+	"""Take the maxium number of spaces occupied, the string at the center,
+	filler characters on the left and on the right, and the number of repeated cells as parameters.
+	Returns a standardized cell (a string) to be printed on the terminal."""
+	left = (max_spaces - len(center)) // 2
+	right = max_spaces - len(center) - left
+	cell = left * left_filler + center + right * right_filler
+	return cell * num_cell
+
+
+# Each cell should have 13 characters in width and leaving 5 spaces to show the numbering of the rows.
+CELL_WIDTH = 13
+ROW_LABEL_WIDTH = 5
+
+# Cells of every game piece, with brackets and colored by player (Blue or Red)
+PIECE_CELLS = {(player, name): f'\033[{code}m[' + format_cell(CELL_WIDTH - 2, name) + ']\033[0m'
+               for player, code in (("BLUE", 34), ("RED", 31)) for name in PIECE_NAMES}
+
+
+def _empty_cell(i, j):
+	"""Takes the row and column of a position as parameters and returns the cell that represents the position
+	when there is no game piece on it. The fortresses are drawn with double lines."""
+	if j == 0:
+		return format_cell(CELL_WIDTH, "[ ]", ' ', '-')
+	if j == 8:
+		return format_cell(CELL_WIDTH, "[ ]", '-', ' ')
+	if (i < 3 or i > 6) and 3 <= j <= 5:
+		return format_cell(CELL_WIDTH, "[ ]", '=' if j > 3 else '-', '=' if j < 5 else '-')
+	return format_cell(CELL_WIDTH, "[ ]", '-', '-')
+
+
+# Cells that represent the space where the game piece can go but there is no game piece at the moment.
+EMPTY_CELLS = {(i, j): _empty_cell(i, j) for i in range(10) for j in range(9)}
+
+# Labels of the rows and columns
+BOARD_HEADER = "\nROW  " + format_cell(CELL_WIDTH, '', num_cell=4) + format_cell(CELL_WIDTH, "COLUMN") + "\n" + \
+               format_cell(ROW_LABEL_WIDTH, '') + "".join(format_cell(CELL_WIDTH, chr(j + 65)) for j in range(9)) + "\n"
+ROW_LABELS = [format_cell(ROW_LABEL_WIDTH, str(i + 1)) for i in range(10)]
+
+# Rows that space apart the rows where there game pieces can go, following each row but the last.
+_row_spacer = (format_cell(ROW_LABEL_WIDTH, '') + format_cell(CELL_WIDTH, "|", num_cell=9) + "\n") * 2
+_row_spacer_fortress = (format_cell(ROW_LABEL_WIDTH, '') + format_cell(CELL_WIDTH, "|", num_cell=3) +
+                        format_cell(CELL_WIDTH, "║", num_cell=3) + format_cell(CELL_WIDTH, "|", num_cell=3) + "\n") * 2
+ROW_SPACERS = [_row_spacer_fortress if i < 2 or i > 6 else _row_spacer for i in range(9)]
+
+
 
 class JanggiGame:
 	"""A class that represent the Janggi game board.
 	Includes methods to move a move on the Janggi board and print out the Janggi board on the terminal."""
 
-	def __init__(self):
-		"""Instantiated the Janggi Game Board. Takes no parameters and initiate all game pieces for each player."""
+	def __init__(self, lazy_game_state=False, repetition_limit=None, perpetual_check_limit=None,
+	             blue_arrangement="EHEH", red_arrangement="EHEH"):
+		"""Instantiated the Janggi Game Board and initiate all game pieces for each player.
+		If lazy_game_state is True, the check for checkmate after each move is deferred until the game state is read.
+		The Horses and Elephants of each player start in one of the ARRANGEMENTS.
+
+		If repetition_limit is given, the game ends once the same position occurs that many times.
+		It is a draw, unless perpetual_check_limit is also given and the player who repeated the position
+		has checked the opponent on at least that many consecutive moves, in which case that player loses.
+		Raises ValueError if perpetual_check_limit is given without repetition_limit."""
+
+		if perpetual_check_limit is not None and repetition_limit is None:
+			raise ValueError("perpetual_check_limit requires repetition_limit")
 
 		# Board size: 10 rows and 9 columns
 		self._rows = 10
 		self._columns = 9
 
+		# In lazy mode, whether the player whose turn it is has been checkmated is only determined
+		# when get_game_state is called. The flag is set while that evaluation is still pending.
+		self._lazy_game_state = lazy_game_state
+
+		# Rules of repetition and perpetual check.
+		self._repetition_limit = repetition_limit
+		self._perpetual_check_limit = perpetual_check_limit
+
+		# Game pieces created by the game, reused whenever the game is reset.
+			# Key:      the player, the name and the identifier of the game piece [e.g. ("RED", "Horse", 1)].
+			# Value:    the object of the game piece
+		self._game_pieces = {}
+
+		self.reset(blue_arrangement, red_arrangement)
+
+	def reset(self, blue_arrangement="EHEH", red_arrangement="EHEH"):
+		"""Takes the arrangement of the Horses and Elephants of Blue and of Red as parameters, and starts a new
+		game on the same object. The game pieces are placed from a shared template of the initial position,
+		and the game pieces of earlier games are reused. The options of the game are kept.
+		Raises ValueError if an arrangement is not one of ARRANGEMENTS. Returns None."""
+
+		pieces, positionHash, evaluation = get_initial_template(blue_arrangement, red_arrangement)
+		self._arrangements = (blue_arrangement, red_arrangement)
+
 		# Representing the Janggi board as a dictionary:
 			# Key:      the position of the game piece as a 2-tuple [e.g. (0, 0) for A1].
 			# Value:    the object of the game piece
-		self._board = {(i, j): None for i in range(self._rows) for j in range(self._columns)}
-
-		# Create a dictionary to represent the players and the game pieces thay currently hold.
-				# Key: the player, either "RED" or "BLUE".
-				# Value: a list that contains all the game pieces hold by each player.
+		self._board = EMPTY_BOARD.copy()
 
 		# Representing all games pieces that each player holds as a dictionary:
 			# Key:      the player (either BLUE or RED)
-			# Value:    the object of the game piece
-		# Create all game pieces for each player store in the dictionary.
-		self._players = {player: [General(player, 0),
-		                          Guard(player, 0), Guard(player, 1),
-		                          Horse(player, 0), Horse(player, 1),
-		                          Elephant(player, 0), Elephant(player, 1),
-		                          Chariot(player, 0), Chariot(player, 1),
-		                          Cannon(player, 0), Cannon(player, 1),
-		                          Soldier(player, 0), Soldier(player, 1),
-		                          Soldier(player, 2), Soldier(player, 3), Soldier(player, 4)]
-		                 for player in ["BLUE", "RED"]}
-
-		# Add each game piece of each player to the board at their corresponding starting positions.
-		for player in self._players:
-			for game_piece in self._players[player]:
-				self._board[game_piece.get_starting_position()] = game_piece
+			# Value:    a list that contains all the game pieces hold by each player, the General first.
+		# Add each game piece of each player to the board at its starting position.
+		self._players = {}
+		for player in pieces:
+			self._players[player] = []
+			for name, identifier, position in pieces[player]:
+				gamePiece = self.get_game_piece(player, name, identifier)
+				gamePiece.set_starting_position(position)
+				self._board[position] = gamePiece
+				self._players[player].append(gamePiece)
 
 		# Blue always plays first
 		self._turn = "BLUE"
 
 		# Game Status started as "UNFINISHED". Game Status can be 'UNFINISHED' or 'RED_WON' or 'BLUE_WON'.
 		self._status = "UNFINISHED"
+		self._game_state_pending = False
+
+		# Hash and evaluation of the game pieces on the board, updated incrementally by try_move and restore_move.
+		self._hash = positionHash
+		self._evaluation = evaluation
+
+		# Rules of repetition and perpetual check.
+			# Position counts:      number of times each position (by its hash) has occurred.
+			# Consecutive checks:   number of moves in a row that each player has checked the opponent.
+		self._position_counts = {self.get_position_hash(): 1}
+		self._consecutive_checks = {"BLUE": 0, "RED": 0}
+
+	def get_arrangements(self):
+		"""Returns the arrangements of the Horses and Elephants of Blue and of Red that the game started from,
+		or None if the game was started from a position given to set_position."""
+		return self._arrangements
+
+	def get_options(self):
+		"""Returns a dictionary of the options that the game was instantiated with, other than the arrangements."""
+		return {"lazy_game_state": self._lazy_game_state, "repetition_limit": self._repetition_limit,
+		        "perpetual_check_limit": self._perpetual_check_limit}
+
+	def get_game_piece(self, player, name, identifier):
+		"""Takes the player, the name and the identifier of a game piece as parameters. Returns the game piece
+		object of this game, which is created the first time it is needed and reused afterwards."""
+
+		key = (player, name, identifier)
+		gamePiece = self._game_pieces.get(key)
+		if gamePiece is None:
+			gamePiece = self._game_pieces[key] = PIECE_CLASSES[name](player, identifier)
+		return gamePiece
+
+	def has_game_piece(self, gamePiece):
+		"""Takes a game piece object as parameter. Returns True if the game piece belongs to this game,
+		and False otherwise, such as for a game piece of a copy of the game."""
+
+		key = (gamePiece.get_player(), gamePiece.get_name(), gamePiece.get_identifier())
+		return self._game_pieces.get(key) is gamePiece
+
+	def set_position(self, layout, turn="BLUE"):
+		"""Takes a dictionary from positions to the game pieces on them, given as pairs of the player and
+		the name of the game piece [e.g. {(8, 4): ("BLUE", "General"), (1, 4): ("RED", "General")}],
+		and the player whose turn it is as parameters. Replaces all game pieces on the board with new ones
+		and starts the game from that position. Each player must have exactly one General.
+		Raises InvalidPositionError otherwise. Returns None."""
+
+		if sorted(player for player, name in layout.values() if name == "General") != ["BLUE", "RED"]:
+			raise InvalidPositionError
+
+		board = EMPTY_BOARD.copy()
+		players = {"BLUE": [], "RED": []}
+
+		# Create the game pieces in the order that each player holds them, with the General first.
+		for position, (player, name) in sorted(layout.items(), key=lambda item: PIECE_NAMES.index(item[1][1])):
+			if position not in board or player not in players:
+				raise InvalidPositionError
+			identifier = sum(1 for gamePiece in players[player] if gamePiece.get_name() == name)
+			gamePiece = self.get_game_piece(player, name, identifier)
+			gamePiece.set_starting_position(position)
+			board[position] = gamePiece
+			players[player].append(gamePiece)
+
+		self._board = board
+		self._players = players
+		self._arrangements = None
+		self._turn = turn.upper()
+		self._status = "UNFINISHED"
+		self._game_state_pending = False
+		self._hash = self.compute_hash()
+		self._evaluation = self.compute_evaluation()
+		self._position_counts = {self.get_position_hash(): 1}
+		self._consecutive_checks = {"BLUE": 0, "RED": 0}
+
+	def get_snapshot(self):
+		"""Returns a dictionary of the state of the game that can be stored as JSON: the position in text
+		notation, the game status, whether a check for checkmate is pending, the number of times each position
+		has occurred and the number of consecutive checks of each player. No check for checkmate is made."""
+
+		return {"position": self.get_position_text(), "status": self._status, "pending": self._game_state_pending,
+		        "position_counts": [[positionHash, count] for positionHash, count in self._position_counts.items()],
+		        "consecutive_checks": dict(self._consecutive_checks)}
+
+	def restore_snapshot(self, snapshot):
+		"""Takes a dictionary returned by get_snapshot as parameter and restores the state of the game.
+		Raises InvalidPositionError if the position is not valid. Returns None."""
+
+		self.set_position_text(snapshot["position"])
+		self._status = snapshot["status"]
+		self._game_state_pending = snapshot["pending"]
+		self._position_counts = {positionHash: count for positionHash, count in snapshot["position_counts"]}
+		self._consecutive_checks = dict(snapshot["consecutive_checks"])
+
+	def get_position_text(self):
+		"""Returns the position in text notation: the rows from 1 to 10 separated by slashes, each listing its
+		game pieces from column A to I with the number of empty positions between them, followed by the player
+		whose turn it is [e.g. "rhea1aehr/4k4/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/4K4/RHEA1AEHR b"]."""
+
+		rows = []
+		for i in range(self._rows):
+			row = ""
+			empty = 0
+			for j in range(self._columns):
+				gamePiece = self._board[(i, j)]
+				if gamePiece is None:
+					empty += 1
+					continue
+				if empty:
+					row += str(empty)
+					empty = 0
+				letter = PIECE_LETTERS[gamePiece.get_name()]
+				row += letter if gamePiece.get_player() == "BLUE" else letter.lower()
+			if empty:
+				row += str(empty)
+			rows.append(row)
+		return "/".join(rows) + " " + self._turn[0].lower()
+
+	def set_position_text(self, text):
+		"""Takes a position in the text notation of get_position_text as parameter and starts the game from
+		that position. Raises InvalidPositionError if the text is not a valid position. Returns None."""
+
+		fields = text.split()
+		rows = fields[0].split("/") if fields else []
+		if len(fields) != 2 or fields[1] not in ("b", "r") or len(rows) != self._rows:
+			raise InvalidPositionError
+
+		layout = {}
+		for i, row in enumerate(rows):
+			j = 0
+			for letter in row:
+				if letter.isdigit():
+					j += int(letter)
+				elif letter.upper() in LETTER_PIECES:
+					layout[(i, j)] = ("BLUE" if letter.isupper() else "RED", LETTER_PIECES[letter.upper()])
+					j += 1
+				else:
+					raise InvalidPositionError
+			if j != self._columns:
+				raise InvalidPositionError
+		self.set_position(layout, "BLUE" if fields[1] == "b" else "RED")
 
 	def get_rows(self):
 		"""Returns the number of rows of the game board."""
@@ -69,9 +393,58 @@ class JanggiGame:
 		return self._turn
 
 	def get_game_state(self):
-		"""Returns the current state of the game, which can be either "UNFINISHED", "RED_WON" or "BLUE_WON"."""
+		"""Returns the current state of the game, which can be either "UNFINISHED", "RED_WON", "BLUE_WON" or "DRAW".
+		Evaluates any pending checkmate check first, and remembers the result."""
+
+		if self._game_state_pending:
+			self._game_state_pending = False
+			if self.is_checkmate(self._turn):
+				if self._turn == "BLUE":
+					self._status = "RED_WON"
+				else:
+					self._status = "BLUE_WON"
 		return self._status
 
+	def compute_hash(self):
+		"""Computes the hash of the game pieces on the board from scratch and returns it.
+		The hash does not include whose turn it is."""
+
+		positionHash = 0
+		for position, gamePiece in self._board.items():
+			if gamePiece is not None:
+				positionHash ^= ZOBRIST_KEYS[(gamePiece.get_player(), gamePiece.get_name())][position]
+		return positionHash
+
+	def compute_evaluation(self):
+		"""Computes the static evaluation of the board from scratch and returns it.
+		The evaluation is the material and piece-square value of Blue's game pieces less that of Red's."""
+
+		evaluation = 0
+		for position, gamePiece in self._board.items():
+			if gamePiece is not None:
+				evaluation += PIECE_SQUARE_VALUES[(gamePiece.get_player(), gamePiece.get_name())][position]
+		return evaluation
+
+	def evaluate(self, player=None):
+		"""Takes the player, which defaults to the player whose turn it is, as parameter.
+		Returns the static evaluation of the board from the point of view of that player."""
+
+		if player is None:
+			player = self._turn
+		if player.upper() == "RED":
+			return -self._evaluation
+		return self._evaluation
+
+	def get_position_hash(self, player=None):
+		"""Takes the player to move, which defaults to the player whose turn it is, as parameter.
+		Returns the hash of the position, including whose turn it is."""
+
+		if player is None:
+			player = self._turn
+		if player.upper() == "RED":
+			return self._hash ^ ZOBRIST_RED_TURN
+		return self._hash
+
 	def get_position(self, GamePieceObject):
 		"""Takes a game piece object as parameter and returns its position on the board.
 		Return None if the game piece has been captured and is no longer on the board."""
@@ -115,10 +488,20 @@ class JanggiGame:
 		"""Takes the from and to position as parameters and attempt to make the move. Returns the captured game piece.
 		"""
 
+		gamePiece = self._board[fromPosition]
 		captured = self._board[toPosition]
-		self._board[toPosition] = self._board[fromPosition]
+		self._board[toPosition] = gamePiece
 		self._board[fromPosition] = None
+
+		pieceKey = (gamePiece.get_player(), gamePiece.get_name())
+		keys = ZOBRIST_KEYS[pieceKey]
+		values = PIECE_SQUARE_VALUES[pieceKey]
+		self._hash ^= keys[fromPosition] ^ keys[toPosition]
+		self._evaluation += values[toPosition] - values[fromPosition]
 		if captured is not None:
+			capturedKey = (captured.get_player(), captured.get_name())
+			self._hash ^= ZOBRIST_KEYS[capturedKey][toPosition]
+			self._evaluation -= PIECE_SQUARE_VALUES[capturedKey][toPosition]
 			self._players[captured.get_player()].remove(captured)
 		return captured
 
@@ -126,11 +509,130 @@ class JanggiGame:
 		"""Takes the from and to position and the captured game piece as parameters and
 		restore the previously made move. Returns None."""
 
-		self._board[fromPosition] = self._board[toPosition]
+		gamePiece = self._board[toPosition]
+		self._board[fromPosition] = gamePiece
 		self._board[toPosition] = captured
+
+		if gamePiece is not None:
+			pieceKey = (gamePiece.get_player(), gamePiece.get_name())
+			keys = ZOBRIST_KEYS[pieceKey]
+			values = PIECE_SQUARE_VALUES[pieceKey]
+			self._hash ^= keys[fromPosition] ^ keys[toPosition]
+			self._evaluation += values[fromPosition] - values[toPosition]
 		if captured is not None:
+			capturedKey = (captured.get_player(), captured.get_name())
+			self._hash ^= ZOBRIST_KEYS[capturedKey][toPosition]
+			self._evaluation += PIECE_SQUARE_VALUES[capturedKey][toPosition]
 			self._players[captured.get_player()].append(captured)
 
+	def is_legal_move(self, fromPosition, toPosition):
+		"""Takes the from and to position as parameters and returns True if the game piece at fromPosition
+		can legally move to toPosition. Only the geometry between the two squares is checked, followed by
+		a targeted test of whether the move would leave the player's own general in check.
+		The turn and the game state are not checked."""
+
+		gamePiece = self._board.get(fromPosition)
+		if gamePiece is None or toPosition not in self._board:
+			return False
+
+		if not gamePiece.is_legal_move(self._board, fromPosition, toPosition):
+			return False
+
+		player = gamePiece.get_player()
+
+		# Passing the turn is only legal if the player is not in check.
+		if toPosition == fromPosition:
+			return not self.is_in_check(player)
+
+		captured = self.try_move(fromPosition, toPosition)
+		legal = not self.is_in_check(player)
+		self.restore_move(fromPosition, toPosition, captured)
+		return legal
+
+	def generate_moves(self, player):
+		"""Takes the player, either "RED" or "BLUE", as the parameter and returns a list of all moves
+		(pairs of from and to position) of the player's game pieces, except for passing the turn.
+		The moves are not checked for leaving the player's own general in check."""
+
+		moves = []
+		for position, gamePiece in self._board.items():
+			if gamePiece is not None and gamePiece.get_player() == player:
+				for move in gamePiece.legal_moves(self._board, position):
+					if move != position:
+						moves.append((position, move))
+		return moves
+
+	def generate_captures(self, player):
+		"""Takes the player, either "RED" or "BLUE", as the parameter and returns a list of all moves
+		(pairs of from and to position) of the player's game pieces that capture a game piece of the opponent.
+		The moves are not checked for leaving the player's own general in check."""
+
+		captures = []
+		for position, gamePiece in self._board.items():
+			if gamePiece is not None and gamePiece.get_player() == player:
+				for move in gamePiece.capture_moves(self._board, position):
+					captures.append((position, move))
+		return captures
+
+	def get_least_valuable_attacker(self, board, position, player):
+		"""Takes a board, a position and the player as parameters. Returns the position of the least valuable
+		game piece of the player that can move to the given position on that board, or None if there is none."""
+
+		attacker = None
+		attackerValue = None
+		for fromPosition, gamePiece in board.items():
+			if gamePiece is None or gamePiece.get_player() != player or fromPosition == position:
+				continue
+			value = EXCHANGE_VALUES[gamePiece.get_name()]
+			if (attackerValue is None or value < attackerValue) and \
+					gamePiece.is_legal_move(board, fromPosition, position):
+				attacker, attackerValue = fromPosition, value
+		return attacker
+
+	def see(self, fromPosition, toPosition):
+		"""Takes the from and to position of a move as parameters and returns the static exchange evaluation of the move:
+		the material won by the player making the move once both players have made all captures on the
+		to position that gain material, always capturing with their least valuable game piece.
+		Removing game pieces from the exchange can open and close Cannon screens and the legs of Horses and
+		Elephants, so the attackers are found again on a copy of the board after each capture.
+		Captures are not checked for leaving the player's own general in check."""
+
+		board = dict(self._board)
+		gamePiece = board[toPosition]
+		gains = [0 if gamePiece is None else EXCHANGE_VALUES[gamePiece.get_name()]]
+
+		# Play out the sequence of captures on the copy of the board.
+		attacker = fromPosition
+		player = board[fromPosition].get_player()
+		while attacker is not None:
+			board[toPosition] = board[attacker]
+			board[attacker] = None
+			player = self.get_opponent(player)
+			attacker = self.get_least_valuable_attacker(board, toPosition, player)
+			if attacker is not None:
+				gains.append(EXCHANGE_VALUES[board[toPosition].get_name()] - gains[-1])
+
+		# Each player can stop capturing if continuing loses material.
+		for i in range(len(gains) - 1, 0, -1):
+			gains[i - 1] = -max(-gains[i - 1], gains[i])
+		return gains[0]
+
+	def static_exchange(self, position, player=None):
+		"""Takes a position and the player, which defaults to the player whose turn it is, as parameters.
+		Returns the material won by the player by starting the exchange on the position with his/her
+		least valuable game piece, or 0 if the player cannot, or should not, capture on the position."""
+
+		if player is None:
+			player = self._turn
+		player = player.upper()
+
+		if self._board[position] is None or self._board[position].get_player() == player:
+			return 0
+		attacker = self.get_least_valuable_attacker(self._board, position, player)
+		if attacker is None:
+			return 0
+		return max(0, self.see(attacker, position))
+
 	def is_in_check(self, player):
 		"""Takes the player, either "RED" or "BLUE", as the parameter, and
 		returns True if that player is in check (could be captured on the opposing player's next move).
@@ -139,14 +641,17 @@ class JanggiGame:
 		# Converting all input player as upper case
 		player = player.upper()
 
-		# Iterate every legal moves of every game piece held by the opponent and
-		# check if there is a move that can capture the player's general.
-		checked = False
-		for gamePiece in self._players[self.get_opponent(player)]:
-			for move in gamePiece.legal_moves(self._board, self.get_position(gamePiece)):
-				if self._board[move] == self._players[player][0]:
-					checked = True
-		return checked
+		generalPosition = self.get_position(self._players[player][0])
+		if generalPosition is None:
+			return False
+
+		# Check if any game piece held by the opponent can move onto the square of the player's general.
+		opponent = self.get_opponent(player)
+		for position, gamePiece in self._board.items():
+			if gamePiece is not None and gamePiece.get_player() == opponent and \
+					gamePiece.is_legal_move(self._board, position, generalPosition):
+				return True
+		return False
 
 	def is_checkmate(self, player):
 		"""Takes the player, either "RED" or "BLUE", as the parameter,
@@ -203,6 +708,68 @@ class JanggiGame:
 		except InvalidPositionError:
 			return False
 
+		if not self.play_move(fromPosition, toPosition):
+			return False
+
+		# Switch player's turn
+		self._turn = self.get_opponent(self._turn)
+
+		# Determine if the opponent has been checkmated or if the position has repeated. If so, update the game status.
+		self.update_game_state()
+		self.update_repetition_state()
+		return True
+
+	def apply_moves(self, moves, trusted=False):
+		"""Takes a sequence of (fromSquare, toSquare) pairs and replays them in order.
+		Squares are looked up in the precomputed square table instead of going through convert_position.
+
+		When trusted is False, every move is validated as in make_move, but checkmate is only evaluated
+		after a move that gives check. When trusted is True, the moves are assumed to have been validated
+		already and are made without any legality check; checkmate is only evaluated after the final move.
+
+		Stops at the first illegal move or once the game has been won.
+		Returns the number of moves that have been made."""
+
+		applied = 0
+		for fromSquare, toSquare in moves:
+
+			# Check if the game has already been won
+			if self._status != "UNFINISHED":
+				break
+
+			fromPosition = SQUARE_POSITIONS.get(fromSquare.upper())
+			toPosition = SQUARE_POSITIONS.get(toSquare.upper())
+			if fromPosition is None or toPosition is None:
+				break
+
+			if trusted:
+				if toPosition != fromPosition:
+					self.try_move(fromPosition, toPosition)
+				self._game_state_pending = False
+				self._turn = self.get_opponent(self._turn)
+			else:
+				if not self.play_move(fromPosition, toPosition):
+					break
+				self._turn = self.get_opponent(self._turn)
+
+				# Only a move that gives check can checkmate the opponent.
+				if self.is_in_check(self._turn):
+					self.update_game_state()
+
+			self.update_repetition_state()
+			applied += 1
+
+		# Evaluate the final position of a trusted replay.
+		if trusted and applied:
+			self.update_game_state()
+
+		return applied
+
+	def play_move(self, fromPosition, toPosition):
+		"""Takes the from and to position as parameters and makes the move for the player whose turn it is.
+		Returns False without changing the board if the move is illegal. Otherwise makes the move and returns True.
+		Neither the game state nor the turn is updated."""
+
 		# Check if the position moving from contains a game piece
 		if self._board[fromPosition] is None:
 			return False
@@ -211,8 +778,8 @@ class JanggiGame:
 		if self._board[fromPosition].get_player() != self._turn:
 			return False
 
-		# Check if the position moving to is one of the legal moves that can be made by the game piece at fromPosition
-		if toPosition not in self._board[fromPosition].legal_moves(self._board, fromPosition):
+		# Check if the game piece at fromPosition can move to the position moving to
+		if not self._board[fromPosition].is_legal_move(self._board, fromPosition, toPosition):
 			return False
 
 		# If the position being moved from and moved to are the same, then it means the player is pass his/her turn.
@@ -234,111 +801,117 @@ class JanggiGame:
 				self.restore_move(fromPosition, toPosition, captured)
 				return False
 
-		# Determine if the opponent has been checkmated. If so, update the game status.
-		if self.is_checkmate(self.get_opponent(self._turn)):
-			if self._turn == "RED":
-				self._status = "RED_WON"
-			else:
-				self._status = "BLUE_WON"
-
-		# Switch player's turn
-		self._turn = self.get_opponent(self._turn)
+		# A legal move proves that the player has not been checkmated, so a pending check is no longer needed.
+		self._game_state_pending = False
 		return True
 
-	def print_board(self):
-		"""Print the game board, game status, player's turn, and if anyone is being in check on the terminal
-		with colored game pieces (Blue or Red)."""
+	def update_game_state(self):
+		"""Determines if the player whose turn it is has been checkmated. If so, update the game status.
+		In lazy mode, the check is only marked as pending and is made by the next call to get_game_state.
+		Returns None."""
 
-		def cellForPrint(max_spaces, center, left_filler=' ', right_filler=' ', num_cell=1):
-			"""Take the maxium number of spaces occupied, the string at the center,
-			filler characters on the left and on the right, and the number of repeated cells as parameters.
-			Returns a standardized cell (a string) to be printed on the terminal."""
-			left = (max_spaces - len(center)) // 2
-			right = max_spaces - len(center) - left
-			cell = left * left_filler + center + right * right_filler
-			return cell * num_cell
-
-		# Each cell should have 13 characters in width and leaving 5 spaces to show the numbering of the rows.
-		max_spaces = 13
-		row_spaces = 5
-
-		# Define the locations of the fortresses
-		fortress_red = [(i, j) for i in range(0, 3) for j in range(3, 6)]
-		fortress_blue = [(i, j) for i in range(7, 10) for j in range(3, 6)]
-		fortress = fortress_red + fortress_blue
-
-		# Spacer for numbering the rows
-		row_spacer = cellForPrint(row_spaces, '')
-
-		# Cells that represent the space where the game piece can go but there is no game piece at the moment.
-		empty_space = {"other": cellForPrint(max_spaces, "[ ]", '-', '-'),
-		               0: cellForPrint(max_spaces, "[ ]", ' ', '-'),
-		               self._columns - 1: cellForPrint(max_spaces, "[ ]", '-', ' ')}
-
-		# Cells that represent the fortress
-		empty_space_fortress = {3: cellForPrint(max_spaces, "[ ]", '-', '='),
-		                        4: cellForPrint(max_spaces, "[ ]", '=', '='),
-		                        5: cellForPrint(max_spaces, "[ ]", '=', '-')}
-
-		# Create rows to space apart the rows where there game pieces can go.
-		empty_row = (row_spacer + cellForPrint(max_spaces, "|", num_cell=self._columns) + "\n") * 2
-		empty_row_fortress = (row_spacer + cellForPrint(max_spaces, "|", num_cell=self._columns//2-1) +
-		                      cellForPrint(max_spaces, "║", num_cell=self._columns//2-1) +
-		                      cellForPrint(max_spaces, "|", num_cell=self._columns//2-1) + '\n') * 2
-
-		# Show label for the rows and columns
-		print()
-		print("ROW  " + cellForPrint(max_spaces, '', num_cell=4) + cellForPrint(max_spaces, "COLUMN", ' ', ' '))
-
-		# Show the column names from A to I
-		print(row_spacer, end="")
-		for i in range(self._columns):
-			print(cellForPrint(max_spaces, chr(i + 65), ' ', ' '), end="")
-		print()
-
-		# Print out the entire board
-		for i in range(self._rows):
+		self._game_state_pending = True
+		if not self._lazy_game_state:
+			self.get_game_state()
 
-			# Numbering the rows
-			print(cellForPrint(row_spaces, str(i + 1)), end="")
+	def update_repetition_state(self):
+		"""Records the current position after a move and ends the game if the position has repeated
+		as many times as the repetition limit. Does nothing if there is no repetition limit. Returns None."""
 
-			# Print out each game piece if they exist. Otherwise, print empty cells.
-			for j in range(self._columns):
-				gamePiece = self._board[(i, j)]
-				if gamePiece:
-					gamePiece.print_name(max_spaces)
-				else:
-					if j in empty_space:
-						print(empty_space[j], end="")
-					elif (i, j) in fortress:
-						print(empty_space_fortress[j], end="")
-					else:
-						print(empty_space["other"], end="")
+		if self._repetition_limit is None:
+			return
 
-			# Print spacer between rows
-			print()
-			if i == self._rows - 1:
-				continue
-			if i < 2 or i > 6:
-				print(empty_row_fortress, end="")
+		# Count the occurrences of the position by its hash.
+		positionHash = self.get_position_hash()
+		count = self._position_counts.get(positionHash, 0) + 1
+		self._position_counts[positionHash] = count
+
+		# Keep track of how many moves in a row the player who just moved has checked the opponent.
+		mover = self.get_opponent(self._turn)
+		if self._perpetual_check_limit is not None:
+			if self.is_in_check(self._turn):
+				self._consecutive_checks[mover] += 1
 			else:
-				print(empty_row, end="")
+				self._consecutive_checks[mover] = 0
+
+		# Checkmate takes precedence over repetition.
+		if count < self._repetition_limit or self.get_game_state() != "UNFINISHED":
+			return
 
-		# Show the status of the game.
-		print()
-		print("Game state:", self._status)
+		# The player who keeps checking the opponent to repeat the position loses. Otherwise, the game is a draw.
+		if self._perpetual_check_limit is not None and \
+				self._consecutive_checks[mover] >= self._perpetual_check_limit:
+			if mover == "RED":
+				self._status = "BLUE_WON"
+			else:
+				self._status = "RED_WON"
+		else:
+			self._status = "DRAW"
+
+	def render_cell(self, position):
+		"""Takes a position as parameter and returns the printed cell of the position, which shows
+		the game piece on it (colored Blue or Red) or the empty position."""
+
+		gamePiece = self._board[position]
+		if gamePiece is not None:
+			return PIECE_CELLS[(gamePiece.get_player(), gamePiece.get_name())]
+		return EMPTY_CELLS[position]
+
+	def render_status(self):
+		"""Returns the printed game status, player's turn, and if anyone is being in check as a string."""
+
+		status = "\nGame state: " + self.get_game_state() + "\n"
 		if self.is_in_check("BLUE"):
-			print("Blue is in check!!!")
+			status += "Blue is in check!!!\n"
 		elif self.is_in_check("RED"):
-			print("Red is in check!!!")
+			status += "Red is in check!!!\n"
 
 		if self._status == "UNFINISHED":
-			print(f"It is now {self._turn}'s turn!\n")
-		print()
+			status += f"It is now {self._turn}'s turn!\n\n"
+		return status + "\n"
+
+	def render_board(self):
+		"""Returns the printed game board, game status, player's turn, and if anyone is being in check
+		as one string, joined from the precomputed cells."""
+
+		frame = [BOARD_HEADER]
+		for i in range(self._rows):
+			frame.append(ROW_LABELS[i])
+			for j in range(self._columns):
+				frame.append(self.render_cell((i, j)))
+			frame.append("\n")
+			if i < self._rows - 1:
+				frame.append(ROW_SPACERS[i])
+		frame.append(self.render_status())
+		return "".join(frame)
+
+	def print_board(self):
+		"""Print the game board, game status, player's turn, and if anyone is being in check on the terminal
+		with colored game pieces (Blue or Red)."""
+
+		print(self.render_board(), end="")
 
 
 class GamePiece:
-	"""A class that represent individual game piece."""
+	"""A class that represent individual game piece.
+	The geometry of the game pieces (fortresses, diagonal moves and starting positions) is shared by all
+	game pieces at class level, and is never modified."""
+
+	# The fortress of each player
+	_fortresses = {"RED": {(i, j) for i in range(0, 3) for j in range(3, 6)},
+	               "BLUE": {(i, j) for i in range(7, 10) for j in range(3, 6)}}
+
+	# Define a set of standard diagonal moves for the game piece.
+	_diagonalMoves = {(1, 4): {(0, 3), (0, 5), (2, 3), (2, 5)},
+		              (0, 3): {(1, 4)},
+		              (0, 5): {(1, 4)},
+		              (2, 3): {(1, 4)},
+		              (2, 5): {(1, 4)},
+		              (8, 4): {(7, 3), (7, 5), (9, 3), (9, 5)},
+		              (7, 3): {(8, 4)},
+		              (7, 5): {(8, 4)},
+		              (9, 3): {(8, 4)},
+		              (9, 5): {(8, 4)}}
 
 	def __init__(self, player, identifier):
 		"""Instantiate the game piece."""
@@ -349,31 +922,12 @@ class GamePiece:
 		# The identifier for different game pieces of the same type
 		self._identifier = identifier
 
-		# Define the game piece's own fortress
-		if self._player == "RED":
-			fortress_row_start = 0
-			fortress_row_end = 3
-		else:
-			fortress_row_start = 7
-			fortress_row_end = 10
-
-		fortress_column_start = 3
-		fortress_column_end = 6
-
-		self._fortress = {(i, j) for i in range(fortress_row_start, fortress_row_end)
-		                  for j in range(fortress_column_start, fortress_column_end)}
-
-		# Define a set of standard diagonal moves for the game piece.
-		self._diagonalMoves = {(1, 4): {(0, 3), (0, 5), (2, 3), (2, 5)},
-			                   (0, 3): {(1, 4)},
-			                   (0, 5): {(1, 4)},
-			                   (2, 3): {(1, 4)},
-			                   (2, 5): {(1, 4)},
-			                   (8, 4): {(7, 3), (7, 5), (9, 3), (9, 5)},
-			                   (7, 3): {(8, 4)},
-			                   (7, 5): {(8, 4)},
-			                   (9, 3): {(8, 4)},
-			                   (9, 5): {(8, 4)}}
+		# The game piece's own fortress
+		self._fortress = self._fortresses[player]
+
+		# The position the game piece started the game on. It is the standard starting position until
+		# a game places the game piece, which can start elsewhere in other arrangements or positions.
+		self._start = self._starting_position.get((player, self._name, identifier))
 
 	def get_player(self):
 		"""Returns the player who own the game piece."""
@@ -393,39 +947,52 @@ class GamePiece:
 		return self._diagonalMoves[position]
 
 	def get_starting_position(self):
-		"""Returns the starting position of the game piece
-		based on what game piece it is, who owns the game piece, and the identifier of the game piece."""
-		return self._starting_position[(self._player, self._name, self._identifier)]
+		"""Returns the starting position of the game piece in its game, which by default is the standard
+		starting position based on what game piece it is, who owns the game piece, and its identifier."""
+		return self._start
+
+	def set_starting_position(self, position):
+		"""Takes the position that the game piece starts the game on as parameter. Returns None."""
+		self._start = position
 
 	def get_name(self):
 		"""Return the name of the game piece."""
 		return self._name
 
-	def print_name(self, max_space):
+	def is_capturable(self, board, position):
+		"""Takes the board and a position as parameters.
+		Returns True if the position is either empty or occupied by a game piece of the opponent."""
+		return board[position] is None or board[position].get_player() != self._player
+
+	def is_opponent(self, board, position):
+		"""Takes the board and a position as parameters.
+		Returns True if the position is occupied by a game piece of the opponent."""
+		return board[position] is not None and board[position].get_player() != self._player
+
+	def print_name(self, max_space=CELL_WIDTH):
 		"""Takes the maximum width as parameter and
-		print the name of the game piece with brackets on screen with appropriate spacing and color."""
+		print the name of the game piece with brackets on screen with appropriate spacing and color.
+		Returns the printed cell, which is the precomputed cell of PIECE_CELLS at the default width."""
 
-		if self._player == "RED":
-			ANSI_code = 31
+		if max_space == CELL_WIDTH:
+			gamePieceToPrint = PIECE_CELLS[(self._player, self._name)]
 		else:
-			ANSI_code = 34
-
-		max_space -= 2      # Preserve two spaces for the brackets
-		pre_space = (max_space - len(self._name)) // 2
-		post_space = max_space - len(self._name) - pre_space
-		gamePieceToPrint = '[' + pre_space * ' ' + self._name + post_space * ' ' + ']'
-		print(f'\033[{ANSI_code}m' + gamePieceToPrint + f'\033[0m', end="")
+			ANSI_code = 31 if self._player == "RED" else 34
+			gamePieceToPrint = f'\033[{ANSI_code}m[' + format_cell(max_space - 2, self._name) + ']\033[0m'
+		print(gamePieceToPrint, end="")
+		return gamePieceToPrint
 
 
 class General(GamePiece):
 	"""A class that represent the General. Inherited from GamePiece."""
 
+	_name = "General"
+	_starting_position = {("RED", "General", 0) : (1, 4),
+	                      ("BLUE", "General", 0) : (8, 4)}
+
 	def __init__(self, player, identifier):
 		"""Instantiate the General object."""
 		super().__init__(player, identifier)
-		self._name = "General"
-		self._starting_position = {("RED", "General", 0) : (1, 4),
-		                           ("BLUE", "General", 0) : (8, 4)}
 
 	def legal_moves(self, board, current_position):
 		"""Takes the board and the current position as parameters.
@@ -455,40 +1022,83 @@ class General(GamePiece):
 		legalMoves.add(current_position)
 		return legalMoves
 
+	def is_legal_move(self, board, current_position, target_position):
+		"""Takes the board, the current position and the target position as parameters.
+		Returns True if the General can move to the target position without building all of its legal moves."""
+
+		if target_position == current_position:
+			return True
+
+		# The move must stay inside the fortress and cannot land on the player's own game piece.
+		if target_position not in self._fortress or not self.is_capturable(board, target_position):
+			return False
+
+		# Vertical and horizontal moves by one square
+		if abs(target_position[0] - current_position[0]) + abs(target_position[1] - current_position[1]) == 1:
+			return True
+
+		# Diagonal moves along the lines of the fortress
+		return target_position in self._diagonalMoves.get(current_position, ())
+
+	def capture_moves(self, board, current_position):
+		"""Takes the board and the current position as parameters.
+		Return a list of the moves of the General that capture a game piece of the opponent."""
+
+		x, y = current_position
+		captures = []
+		for move in [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)] + list(self._diagonalMoves.get(current_position, ())):
+			if move in self._fortress and self.is_opponent(board, move):
+				captures.append(move)
+		return captures
+
 
 class Guard(GamePiece):
 	"""A class that represent the Guards. Inherited from GamePiece."""
 
+	_name = "Guard"
+	_starting_position = {("RED", "Guard", 0)  :   (0, 3),
+	                      ("RED", "Guard", 1)  :   (0, 5),
+	                      ("BLUE", "Guard", 0) :   (9, 3),
+	                      ("BLUE", "Guard", 1) :   (9, 5)}
+
 	def __init__(self, player, identifier):
 		"""Instantiate the Guard object."""
 		super().__init__(player, identifier)
-		self._name = "Guard"
-		self._starting_position = {("RED", "Guard", 0)  :   (0, 3),
-		                           ("RED", "Guard", 1)  :   (0, 5),
-		                           ("BLUE", "Guard", 0) :   (9, 3),
-		                           ("BLUE", "Guard", 1) :   (9, 5)}
 
 	def legal_moves(self, board, current_position):
 		"""Takes the board and the current position as parameters.
 		Return all legal moves that the Guard can play next."""
 
 		# Mimick the movements of the general
-		mimic_general = General(self._player, 0)
-		legalMoves = mimic_general.legal_moves(board, current_position)
-		return legalMoves
+		return General.legal_moves(self, board, current_position)
+
+	def is_legal_move(self, board, current_position, target_position):
+		"""Takes the board, the current position and the target position as parameters.
+		Returns True if the Guard can move to the target position without building all of its legal moves."""
+
+		# Mimick the movements of the general
+		return General.is_legal_move(self, board, current_position, target_position)
+
+	def capture_moves(self, board, current_position):
+		"""Takes the board and the current position as parameters.
+		Return a list of the moves of the Guard that capture a game piece of the opponent."""
+
+		# Mimick the movements of the general
+		return General.capture_moves(self, board, current_position)
 
 
 class Horse(GamePiece):
 	"""A class that represent Horses. Inherited from GamePiece."""
 
+	_name = "Horse"
+	_starting_position = {("RED", "Horse", 0)  :   (0, 2),
+	                      ("RED", "Horse", 1)  :   (0, 7),
+	                      ("BLUE", "Horse", 0) :   (9, 2),
+	                      ("BLUE", "Horse", 1) :   (9, 7)}
+
 	def __init__(self, player, identifier):
 		"""Instantiate the Horse object."""
 		super().__init__(player, identifier)
-		self._name = "Horse"
-		self._starting_position = {("RED", "Horse", 0)  :   (0, 2),
-		                           ("RED", "Horse", 1)  :   (0, 7),
-		                           ("BLUE", "Horse", 0) :   (9, 2),
-		                           ("BLUE", "Horse", 1) :   (9, 7)}
 
 	def legal_moves(self, board, current_position):
 		"""Takes the board and the current position as parameters.
@@ -522,18 +1132,58 @@ class Horse(GamePiece):
 
 		return legalMoves
 
+	def is_legal_move(self, board, current_position, target_position):
+		"""Takes the board, the current position and the target position as parameters.
+		Returns True if the Horse can move to the target position without building all of its legal moves."""
+
+		if target_position == current_position:
+			return True
+		if target_position not in board or not self.is_capturable(board, target_position):
+			return False
+
+		# The Horse moves one square orthogonally and then one square diagonally.
+		x, y = current_position
+		dx, dy = target_position[0] - x, target_position[1] - y
+		if abs(dx) == 2 and abs(dy) == 1:
+			leg = (x + dx // 2, y)
+		elif abs(dx) == 1 and abs(dy) == 2:
+			leg = (x, y + dy // 2)
+		else:
+			return False
+
+		# The Horse is blocked if the orthogonal square is occupied.
+		return board[leg] is None
+
+	def capture_moves(self, board, current_position):
+		"""Takes the board and the current position as parameters.
+		Return a list of the moves of the Horse that capture a game piece of the opponent."""
+
+		x, y = current_position
+		captures = []
+		for i, j in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+
+			# The Horse is blocked if the orthogonal square is occupied.
+			if board.get((x + i, y + j), False) is not None:
+				continue
+
+			for move in [(x + 2 * i + j, y + 2 * j + i), (x + 2 * i - j, y + 2 * j - i)]:
+				if move in board and self.is_opponent(board, move):
+					captures.append(move)
+		return captures
+
 
 class Elephant(GamePiece):
 	"""A class that represent the Elephants. Inherited from GamePiece."""
 
+	_name = "Elephant"
+	_starting_position = {("RED", "Elephant", 0)  :   (0, 1),
+	                      ("RED", "Elephant", 1)  :   (0, 6),
+	                      ("BLUE", "Elephant", 0) :   (9, 1),
+	                      ("BLUE", "Elephant", 1) :   (9, 6)}
+
 	def __init__(self, player, identifier):
 		"""Instantiate the Elephant object."""
 		super().__init__(player, identifier)
-		self._name = "Elephant"
-		self._starting_position = {("RED", "Elephant", 0)  :   (0, 1),
-		                           ("RED", "Elephant", 1)  :   (0, 6),
-		                           ("BLUE", "Elephant", 0) :   (9, 1),
-		                           ("BLUE", "Elephant", 1) :   (9, 6)}
 
 	def legal_moves(self, board, current_position):
 		"""Takes the board and the current position as parameters.
@@ -578,28 +1228,76 @@ class Elephant(GamePiece):
 
 		return legalMoves
 
+	def is_legal_move(self, board, current_position, target_position):
+		"""Takes the board, the current position and the target position as parameters.
+		Returns True if the Elephant can move to the target position without building all of its legal moves."""
+
+		if target_position == current_position:
+			return True
+		if target_position not in board or not self.is_capturable(board, target_position):
+			return False
+
+		# The Elephant moves one square orthogonally and then two squares diagonally.
+		x, y = current_position
+		dx, dy = target_position[0] - x, target_position[1] - y
+		if abs(dx) == 3 and abs(dy) == 2:
+			step_x, step_y = dx // 3, dy // 2
+			legs = ((x + step_x, y), (x + 2 * step_x, y + step_y))
+		elif abs(dx) == 2 and abs(dy) == 3:
+			step_x, step_y = dx // 2, dy // 3
+			legs = ((x, y + step_y), (x + step_x, y + 2 * step_y))
+		else:
+			return False
+
+		# The Elephant is blocked if any of the squares along the way is occupied.
+		return board[legs[0]] is None and board[legs[1]] is None
+
+	def capture_moves(self, board, current_position):
+		"""Takes the board and the current position as parameters.
+		Return a list of the moves of the Elephant that capture a game piece of the opponent."""
+
+		x, y = current_position
+		captures = []
+		for i, j in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+
+			# The Elephant is blocked if the orthogonal square is occupied.
+			if board.get((x + i, y + j), False) is not None:
+				continue
+
+			for k in [-1, 1]:
+
+				# The Elephant is also blocked if the first diagonal square is occupied.
+				if board.get((x + 2 * i + k * j, y + 2 * j + k * i), False) is not None:
+					continue
+
+				move = (x + 3 * i + 2 * k * j, y + 3 * j + 2 * k * i)
+				if move in board and self.is_opponent(board, move):
+					captures.append(move)
+		return captures
+
 
 class Chariot(GamePiece):
 	"""A class that represent Chariots. Inherited from GamePiece."""
 
+	_name = "Chariot"
+	_starting_position = {("RED", "Chariot", 0)  :   (0, 0),
+	                      ("RED", "Chariot", 1)  :   (0, 8),
+	                      ("BLUE", "Chariot", 0) :   (9, 0),
+	                      ("BLUE", "Chariot", 1) :   (9, 8)}
+
+	_diagonalMovesExtendedRed = {(0, 3): (2, 5),
+	                             (0, 5): (2, 3),
+	                             (2, 3): (0, 5),
+	                             (2, 5): (0, 3)}
+
+	_diagonalMovesExtendedBlue = {(7, 3): (9, 5),
+	                              (7, 5): (9, 3),
+	                              (9, 3): (7, 5),
+	                              (9, 5): (7, 3)}
+
 	def __init__(self, player, identifier):
 		"""Instantiate the Chariot object."""
 		super().__init__(player, identifier)
-		self._name = "Chariot"
-		self._starting_position = {("RED", "Chariot", 0)  :   (0, 0),
-		                           ("RED", "Chariot", 1)  :   (0, 8),
-		                           ("BLUE", "Chariot", 0) :   (9, 0),
-		                           ("BLUE", "Chariot", 1) :   (9, 8)}
-
-		self._diagonalMovesExtendedRed = {(0, 3): (2, 5),
-		                                  (0, 5): (2, 3),
-		                                  (2, 3): (0, 5),
-		                                  (2, 5): (0, 3)}
-
-		self._diagonalMovesExtendedBlue = {(7, 3): (9, 5),
-		                                   (7, 5): (9, 3),
-		                                   (9, 3): (7, 5),
-		                                   (9, 5): (7, 3)}
 
 	def legal_moves(self, board, current_position):
 		"""Takes the board and the current position as parameters.
@@ -670,28 +1368,86 @@ class Chariot(GamePiece):
 
 		return legalMoves
 
+	def is_legal_move(self, board, current_position, target_position):
+		"""Takes the board, the current position and the target position as parameters.
+		Returns True if the Chariot can move to the target position without building all of its legal moves."""
+
+		if target_position == current_position:
+			return True
+		if target_position not in board or not self.is_capturable(board, target_position):
+			return False
+
+		# Orthogonal moves require every square between the two positions to be empty.
+		x, y = current_position
+		dx, dy = target_position[0] - x, target_position[1] - y
+		if dx == 0 or dy == 0:
+			step_x = (dx > 0) - (dx < 0)
+			step_y = (dy > 0) - (dy < 0)
+			for k in range(1, max(abs(dx), abs(dy))):
+				if board[(x + k * step_x, y + k * step_y)] is not None:
+					return False
+			return True
+
+		# Standard diagonal moves inside the fortress
+		if target_position in self._diagonalMoves.get(current_position, ()):
+			return True
+
+		# Extended diagonal moves require the center of the fortress to be empty.
+		if self._diagonalMovesExtendedRed.get(current_position) == target_position:
+			return board[(1, 4)] is None
+		if self._diagonalMovesExtendedBlue.get(current_position) == target_position:
+			return board[(8, 4)] is None
+		return False
+
+	def capture_moves(self, board, current_position):
+		"""Takes the board and the current position as parameters.
+		Return a list of the moves of the Chariot that capture a game piece of the opponent."""
+
+		x, y = current_position
+		captures = []
+
+		# The first game piece in each orthogonal direction can be captured if it belongs to the opponent.
+		for i, j in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+			move = (x + i, y + j)
+			while move in board and board[move] is None:
+				move = (move[0] + i, move[1] + j)
+			if move in board and self.is_opponent(board, move):
+				captures.append(move)
+
+		# Standard and extended diagonal moves inside the fortress
+		for move in self._diagonalMoves.get(current_position, ()):
+			if self.is_opponent(board, move):
+				captures.append(move)
+		for diagonalMovesExtended, centerPosition in [(self._diagonalMovesExtendedRed, (1, 4)),
+		                                              (self._diagonalMovesExtendedBlue, (8, 4))]:
+			move = diagonalMovesExtended.get(current_position)
+			if move is not None and board[centerPosition] is None and self.is_opponent(board, move):
+				captures.append(move)
+		return captures
+
 
 class Cannon(GamePiece):
 	"""A class that represent Cannon. Inherited from GamePiece."""
 
+	_name = "Cannon"
+	_starting_position = {("RED", "Cannon", 0)  :   (2, 1),
+	                      ("RED", "Cannon", 1)  :   (2, 7),
+	                      ("BLUE", "Cannon", 0) :   (7, 1),
+	                      ("BLUE", "Cannon", 1) :   (7, 7)}
+
+	_diagonalMovesExtendedRed = {(0, 3): (2, 5),
+	                             (0, 5): (2, 3),
+	                             (2, 3): (0, 5),
+	                             (2, 5): (0, 3)}
+
+	_diagonalMovesExtendedBlue = {(7, 3): (9, 5),
+	                              (7, 5): (9, 3),
+	                              (9, 3): (7, 5),
+	                              (9, 5): (7, 3)}
+
 	def __init__(self, player, identifier):
 		"""Instantiate the Cannon object."""
 		super().__init__(player, identifier)
-		self._name = "Cannon"
-		self._starting_position = {("RED", "Cannon", 0)  :   (2, 1),
-		                           ("RED", "Cannon", 1)  :   (2, 7),
-		                           ("BLUE", "Cannon", 0) :   (7, 1),
-		                           ("BLUE", "Cannon", 1) :   (7, 7)}
-
-		self._diagonalMovesExtendedRed = {(0, 3): (2, 5),
-		                                  (0, 5): (2, 3),
-		                                  (2, 3): (0, 5),
-		                                  (2, 5): (0, 3)}
-
-		self._diagonalMovesExtendedBlue = {(7, 3): (9, 5),
-		                                   (7, 5): (9, 3),
-		                                   (9, 3): (7, 5),
-		                                   (9, 5): (7, 3)}
 
 	def legal_moves(self, board, current_position):
 		"""Takes the board and the current position as parameters.
@@ -768,31 +1524,103 @@ class Cannon(GamePiece):
 
 		return legalMoves
 
+	def is_legal_move(self, board, current_position, target_position):
+		"""Takes the board, the current position and the target position as parameters.
+		Returns True if the Cannon can move to the target position without building all of its legal moves."""
+
+		if target_position == current_position:
+			return True
+		if target_position not in board:
+			return False
+
+		# Cannon cannot capture another cannon
+		target = board[target_position]
+		if target is not None and (target.get_player() == self._player or target.get_name() == "Cannon"):
+			return False
+
+		# Orthogonal moves require exactly one game piece in between, which cannot be a cannon.
+		x, y = current_position
+		dx, dy = target_position[0] - x, target_position[1] - y
+		if dx == 0 or dy == 0:
+			step_x = (dx > 0) - (dx < 0)
+			step_y = (dy > 0) - (dy < 0)
+			screen = None
+			for k in range(1, max(abs(dx), abs(dy))):
+				gamePiece = board[(x + k * step_x, y + k * step_y)]
+				if gamePiece is None:
+					continue
+				if screen is not None or gamePiece.get_name() == "Cannon":
+					return False
+				screen = gamePiece
+			return screen is not None
+
+		# Diagonal moves jump over the center of the fortress, which cannot be empty or a cannon.
+		if self._diagonalMovesExtendedRed.get(current_position) == target_position:
+			center = board[(1, 4)]
+		elif self._diagonalMovesExtendedBlue.get(current_position) == target_position:
+			center = board[(8, 4)]
+		else:
+			return False
+		return center is not None and center.get_name() != "Cannon"
+
+	def capture_moves(self, board, current_position):
+		"""Takes the board and the current position as parameters.
+		Return a list of the moves of the Cannon that capture a game piece of the opponent."""
+
+		x, y = current_position
+		captures = []
+
+		# In each orthogonal direction, jump over the first game piece and capture the next one.
+		# Cannon cannot jump over or capture another cannon.
+		for i, j in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+			move = (x + i, y + j)
+			while move in board and board[move] is None:
+				move = (move[0] + i, move[1] + j)
+			if move not in board or board[move].get_name() == "Cannon":
+				continue
+
+			move = (move[0] + i, move[1] + j)
+			while move in board and board[move] is None:
+				move = (move[0] + i, move[1] + j)
+			if move in board and self.is_opponent(board, move) and board[move].get_name() != "Cannon":
+				captures.append(move)
+
+		# Diagonal moves jump over the center of the fortress.
+		for diagonalMovesExtended, centerPosition in [(self._diagonalMovesExtendedRed, (1, 4)),
+		                                              (self._diagonalMovesExtendedBlue, (8, 4))]:
+			move = diagonalMovesExtended.get(current_position)
+			if move is None or board[centerPosition] is None or board[centerPosition].get_name() == "Cannon":
+				continue
+			if self.is_opponent(board, move) and board[move].get_name() != "Cannon":
+				captures.append(move)
+		return captures
+
 
 class Soldier(GamePiece):
 	"""A class that represent Soldier. Inherited from GamePiece"""
 
+	_name = "Soldier"
+	_starting_position = {("RED", "Soldier", 0)    :   (3, 0),
+	                      ("RED", "Soldier", 1)    :   (3, 2),
+	                      ("RED", "Soldier", 2)    :   (3, 4),
+	                      ("RED", "Soldier", 3)    :   (3, 6),
+	                      ("RED", "Soldier", 4)    :   (3, 8),
+	                      ("BLUE", "Soldier", 0)   :   (6, 0),
+	                      ("BLUE", "Soldier", 1)   :   (6, 2),
+	                      ("BLUE", "Soldier", 2)   :   (6, 4),
+	                      ("BLUE", "Soldier", 3)   :   (6, 6),
+	                      ("BLUE", "Soldier", 4)   :   (6, 8)}
+
+	_diagonalMovesExtended = {(2, 3): {(1, 4)},
+	                          (2, 5): {(1, 4)},
+	                          (1, 4): {(0, 3), (0, 5)},
+	                          (7, 3): {(8, 4)},
+	                          (7, 5): {(8, 4)},
+	                          (8, 4): {(9, 3), (9, 5)}}
+
 	def __init__(self, player, identifier):
 		"""Instantiate the Soldier object."""
 		super().__init__(player, identifier)
-		self._name = "Soldier"
-		self._starting_position = {("RED", "Soldier", 0)    :   (3, 0),
-		                           ("RED", "Soldier", 1)    :   (3, 2),
-		                           ("RED", "Soldier", 2)    :   (3, 4),
-		                           ("RED", "Soldier", 3)    :   (3, 6),
-		                           ("RED", "Soldier", 4)    :   (3, 8),
-		                           ("BLUE", "Soldier", 0)   :   (6, 0),
-		                           ("BLUE", "Soldier", 1)   :   (6, 2),
-		                           ("BLUE", "Soldier", 2)   :   (6, 4),
-		                           ("BLUE", "Soldier", 3)   :   (6, 6),
-		                           ("BLUE", "Soldier", 4)   :   (6, 8)}
-
-		self._diagonalMovesExtended = {(2, 3): {(1, 4)},
-		                               (2, 5): {(1, 4)},
-			                           (1, 4): {(0, 3), (0, 5)},
-			                           (7, 3): {(8, 4)},
-			                           (7, 5): {(8, 4)},
-			                           (8, 4): {(9, 3), (9, 5)}}
 
 	def legal_moves(self, board, current_position):
 		"""Takes the board and the current position as parameters.
@@ -835,6 +1663,82 @@ class Soldier(GamePiece):
 
 		return legalMoves
 
+	def is_legal_move(self, board, current_position, target_position):
+		"""Takes the board, the current position and the target position as parameters.
+		Returns True if the Soldier can move to the target position without building all of its legal moves."""
+
+		if target_position == current_position:
+			return True
+		if target_position not in board or not self.is_capturable(board, target_position):
+			return False
+
+		# Red soldiers can only move downward and Blue soldiers can only move upward.
+		direction = 1 if self._player == "RED" else -1
+
+		dx, dy = target_position[0] - current_position[0], target_position[1] - current_position[1]
+		if (dx, dy) in ((direction, 0), (0, -1), (0, 1)):
+			return True
+
+		# Extended diagonal moves inside the fortress
+		return target_position in self._diagonalMovesExtended.get(current_position, ())
+
+	def capture_moves(self, board, current_position):
+		"""Takes the board and the current position as parameters.
+		Return a list of the moves of the Soldier that capture a game piece of the opponent."""
+
+		x, y = current_position
+		direction = 1 if self._player == "RED" else -1
+
+		captures = []
+		for move in [(x + direction, y), (x, y - 1), (x, y + 1)] + list(self._diagonalMovesExtended.get(current_position, ())):
+			if move in board and self.is_opponent(board, move):
+				captures.append(move)
+		return captures
+
+
+# Classes of all types of game pieces
+PIECE_CLASSES = {"General": General, "Guard": Guard, "Horse": Horse, "Elephant": Elephant,
+                 "Chariot": Chariot, "Cannon": Cannon, "Soldier": Soldier}
+
+
+# Initial positions already built, by the arrangement of each player.
+	# Key:      the arrangements of Blue and Red [e.g. ("EHEH", "HEEH")].
+	# Value:    the name, identifier and position of each game piece of each player, in the order the player
+	#           holds them, and the hash and evaluation of the position.
+_initial_templates = {}
+
+
+def get_initial_template(blue_arrangement="EHEH", red_arrangement="EHEH"):
+	"""Takes the arrangement of the Horses and Elephants of Blue and of Red as parameters. Returns a tuple of
+	a dictionary from each player to a list of the name, identifier and starting position of each game piece,
+	and the hash and the evaluation of the initial position. Raises ValueError if an arrangement is not one of
+	ARRANGEMENTS. Each template is built once and shared by every game."""
+
+	key = (blue_arrangement, red_arrangement)
+	if key not in _initial_templates:
+		pieces = {}
+		for player, arrangement in zip(("BLUE", "RED"), key):
+			if arrangement not in ARRANGEMENTS:
+				raise ValueError("unknown arrangement %r" % (arrangement,))
+
+			# Each side of the General has one Horse and one Elephant, numbered from the left.
+			row = 9 if player == "BLUE" else 0
+			arranged = {(LETTER_PIECES[letter], k // 2): (row, column)
+			            for k, (letter, column) in enumerate(zip(arrangement, ARRANGEMENT_COLUMNS))}
+			pieces[player] = [(name, identifier, arranged.get((name, identifier), position))
+			                  for name in PIECE_NAMES
+			                  for (owner, _, identifier), position in sorted(PIECE_CLASSES[name]._starting_position.items())
+			                  if owner == player]
+
+		positionHash = 0
+		evaluation = 0
+		for player in pieces:
+			for name, _, position in pieces[player]:
+				positionHash ^= ZOBRIST_KEYS[(player, name)][position]
+				evaluation += PIECE_SQUARE_VALUES[(player, name)][position]
+		_initial_templates[key] = (pieces, positionHash, evaluation)
+	return _initial_templates[key]
+
 
 class InvalidPositionError(Exception):
 	"""Raised when the input position of the board is invalid."""
@@ -842,24 +1746,56 @@ class InvalidPositionError(Exception):
 
 
 # Try me!!!
-# def main():
-# 	"""Game console to activate the game to be played."""
-# 	game = JanggiGame()
-#
-# 	# Repeat as long as the game is not finished
-# 	while game.get_game_state() == "UNFINISHED":
-# 		game.print_board()
-# 		validInput = False
-#
-# 		# Repeat if the user input is invalid
-# 		while not validInput:
-# 			fromSquare = input("Where are you moving from? ")
-# 			toSquare = input("Where are youe7 moving to? ")
-# 			if game.make_move(fromSquare, toSquare):
-# 				validInput = True
-# 			else:
-# 				print("The move is invalid. Try again!")
-# 				print()
-#
-# if __name__ == "__main__":
-#   main()
\ No newline at end of file
+def main(argv=None):
+	"""Game console to activate the game to be played. The engine can play for one player,
+	and ponders while the other player is entering a move."""
+
+	import argparse
+	parser = argparse.ArgumentParser(description="Play Janggi on the terminal.")
+	parser.add_argument("--engine", choices=["BLUE", "RED"], type=str.upper, help="player that the engine plays for")
+	parser.add_argument("--depth", type=int, default=3, help="depth of the search of the engine")
+	parser.add_argument("--no-ponder", action="store_true", help="do not search while the other player is thinking")
+	args = parser.parse_args(argv)
+
+	game = JanggiGame()
+	ponderer = None
+	if args.engine is not None:
+		from JanggiEngine import JanggiEngine, Ponderer
+		ponderer = Ponderer(JanggiEngine(game), args.depth)
+
+	# Repeat as long as the game is not finished
+	while game.get_game_state() == "UNFINISHED":
+		game.print_board()
+
+		if game.get_turn() == args.engine:
+			move, _ = ponderer.get_move(game)
+			if move is None:
+				# The engine has no legal move, so it passes the turn.
+				general = game.get_players()[game.get_turn()][0]
+				move = game.get_position(general), game.get_position(general)
+			fromSquare, toSquare = POSITION_SQUARES[move[0]], POSITION_SQUARES[move[1]]
+			game.make_move(fromSquare, toSquare)
+			print(f"The engine moves from {fromSquare} to {toSquare}.")
+			if not args.no_ponder and game.get_game_state() == "UNFINISHED":
+				ponderer.start(game)
+			continue
+
+		validInput = False
+
+		# Repeat if the user input is invalid
+		while not validInput:
+			fromSquare = input("Where are you moving from? ")
+			toSquare = input("Where are you moving to? ")
+			if game.make_move(fromSquare, toSquare):
+				validInput = True
+			else:
+				print("The move is invalid. Try again!")
+				print()
+
+	if ponderer is not None:
+		ponderer.stop()
+	game.print_board()
+
+
+if __name__ == "__main__":
+	main()
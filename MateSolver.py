@@ -0,0 +1,197 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      A proof-number search that solves mate-in-N problems of Janggi.
+
+from JanggiGame import POSITION_SQUARES
+
+
+# Proof or disproof number of a node that can never be proven or disproven.
+INFINITY = float("inf")
+
+
+class _ProofNode:
+	"""A class that represent a node of the proof tree. At an attacking node the attacker is to move and one
+	checking move has to lead to a checkmate, and at a defending node every evasion of the defender has to."""
+
+	def __init__(self, move, parent, attacking, movesLeft):
+		"""Instantiate the node. Takes the move that leads to the node, the parent node, whether the attacker is
+		to move and the number of moves left to the attacker as parameters."""
+
+		self._move = move
+		self._parent = parent
+		self._attacking = attacking
+		self._movesLeft = movesLeft
+		self._children = None
+		self._proof = 1
+		self._disproof = 1
+
+	def get_move(self):
+		"""Returns the move that leads to the node as a pair of from and to position."""
+		return self._move
+
+	def get_parent(self):
+		"""Returns the parent node, or None for the root."""
+		return self._parent
+
+	def is_attacking(self):
+		"""Returns True if the attacker is to move at the node and False otherwise."""
+		return self._attacking
+
+	def get_moves_left(self):
+		"""Returns the number of moves left to the attacker."""
+		return self._movesLeft
+
+	def get_children(self):
+		"""Returns the list of the children of the node, or None if the node has not been expanded."""
+		return self._children
+
+	def get_proof(self):
+		"""Returns the proof number of the node."""
+		return self._proof
+
+	def get_disproof(self):
+		"""Returns the disproof number of the node."""
+		return self._disproof
+
+	def set_numbers(self, proof, disproof):
+		"""Takes the proof and disproof number of the node as parameters. Returns None."""
+		self._proof = proof
+		self._disproof = disproof
+
+	def expand(self):
+		"""Marks the node as expanded, with no children yet. Returns None."""
+		self._children = []
+
+	def add_child(self, child):
+		"""Takes a child node as parameter and adds it to the children of the expanded node. Returns None."""
+		self._children.append(child)
+
+	def update(self):
+		"""Sets the proof and disproof number of the node from those of its children. Returns None."""
+
+		if self._attacking:
+			self._proof = min((child.get_proof() for child in self._children), default=INFINITY)
+			self._disproof = sum(child.get_disproof() for child in self._children)
+		else:
+			self._proof = sum(child.get_proof() for child in self._children)
+			self._disproof = min((child.get_disproof() for child in self._children), default=INFINITY)
+
+
+class MateSolver:
+	"""A class that represent a solver that proves or disproves a forced checkmate within a number of moves.
+	The proof-number search only considers checking moves of the attacker and evasions of the defender,
+	and always expands the node that proves or disproves the checkmate with the fewest nodes left."""
+
+	def __init__(self, game, max_nodes=100000):
+		"""Instantiate the solver. Takes the game to be solved and the maximum number of nodes
+		of the proof tree as parameters."""
+
+		self._game = game
+		self._max_nodes = max_nodes
+		self._attacker = None
+		self._defender = None
+		self._stats = {"nodes": 0, "iterations": 0}
+
+	def get_game(self):
+		"""Returns the game that is solved."""
+		return self._game
+
+	def get_stats(self):
+		"""Returns the statistics of the last solve as a dictionary."""
+		return dict(self._stats)
+
+	def solve(self, moves, player=None):
+		"""Takes the maximum number of moves of the attacker and the attacking player (the player to move by default)
+		as parameters. Returns True and the mating line as a list of pairs of squares if the attacker can force
+		a checkmate within the number of moves, with the longest defence of the defender.
+		Returns False and an empty list if the attacker cannot, and None and an empty list if the search
+		runs out of nodes before it finds out."""
+
+		self._attacker = (player or self._game.get_turn()).upper()
+		self._defender = self._game.get_opponent(self._attacker)
+		self._stats = {"nodes": 1, "iterations": 0}
+
+		root = _ProofNode(None, None, True, moves)
+		while root.get_proof() and root.get_disproof() and self._stats["nodes"] < self._max_nodes:
+			self._stats["iterations"] += 1
+
+			# Descend to the most proving node, making the moves on the way.
+			node = root
+			madeMoves = []
+			while node.get_children() is not None:
+				if node.is_attacking():
+					node = min(node.get_children(), key=_ProofNode.get_proof)
+				else:
+					node = min(node.get_children(), key=_ProofNode.get_disproof)
+				madeMoves.append((node.get_move(), self._game.try_move(*node.get_move())))
+
+			self._expand(node)
+
+			for (fromPosition, toPosition), captured in reversed(madeMoves):
+				self._game.restore_move(fromPosition, toPosition, captured)
+			while node.get_parent() is not None:
+				node = node.get_parent()
+				node.update()
+
+		if root.get_proof() == 0:
+			return True, self._get_line(root)
+		if root.get_disproof() == 0:
+			return False, []
+		return None, []
+
+	def _legal_moves(self, player):
+		"""Takes the player as parameter and yields every move of the player that does not leave the player's own
+		general in check, except for passing the turn. Each move is made while it is yielded."""
+
+		for fromPosition, toPosition in self._game.generate_moves(player):
+			captured = self._game.try_move(fromPosition, toPosition)
+			if not self._game.is_in_check(player):
+				yield fromPosition, toPosition
+			self._game.restore_move(fromPosition, toPosition, captured)
+
+	def _expand(self, node):
+		"""Takes a leaf node, whose position is on the board, as parameter. Creates its children with
+		the checking moves of the attacker or the evasions of the defender. Returns None."""
+
+		node.expand()
+		if node.is_attacking():
+			for move in self._legal_moves(self._attacker):
+				if not self._game.is_in_check(self._defender):
+					continue
+				child = _ProofNode(move, node, False, node.get_moves_left())
+				if self._game.is_checkmate(self._defender):
+					child.set_numbers(0, INFINITY)
+				elif node.get_moves_left() == 1:
+					child.set_numbers(INFINITY, 0)
+				node.add_child(child)
+		else:
+			# Passing the turn is never an evasion, since the defender is in check.
+			for move in self._legal_moves(self._defender):
+				node.add_child(_ProofNode(move, node, True, node.get_moves_left() - 1))
+
+		self._stats["nodes"] += len(node.get_children())
+		node.update()
+
+	def _get_mate_length(self, node):
+		"""Takes a proven node as parameter and returns the number of plies until the checkmate,
+		with the shortest checkmate of the attacker and the longest defence of the defender."""
+
+		if not node.get_children():
+			return 0
+		if node.is_attacking():
+			return 1 + min(self._get_mate_length(child) for child in node.get_children() if child.get_proof() == 0)
+		return 1 + max(self._get_mate_length(child) for child in node.get_children())
+
+	def _get_line(self, root):
+		"""Takes the proven root node as parameter and returns the mating line as a list of pairs of squares."""
+
+		line = []
+		node = root
+		while node.get_children():
+			if node.is_attacking():
+				node = min((child for child in node.get_children() if child.get_proof() == 0),
+				           key=self._get_mate_length)
+			else:
+				node = max(node.get_children(), key=self._get_mate_length)
+			line.append((POSITION_SQUARES[node.get_move()[0]], POSITION_SQUARES[node.get_move()[1]]))
+		return line
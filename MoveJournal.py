@@ -0,0 +1,245 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Persistence of live Janggi games: every move is appended to a journal, which is synced to disk
+#                   in batches, and the state of all active games is saved in periodic snapshots. After a restart,
+#                   the games are recovered from the latest snapshot and the moves journaled after it.
+
+import json
+import os
+import threading
+import time
+from JanggiGame import JanggiGame
+
+
+# Files in the directory of a journal: the latest snapshot, and the segments of the journal that follow it.
+SNAPSHOT_FILE = "snapshot.json"
+SEGMENT_FILE = "journal-%08d.log"
+SEGMENT_PREFIX = "journal-"
+SEGMENT_SUFFIX = ".log"
+
+# Records of the journal, one per line with tab-separated fields:
+	# N     game id, position in text notation:     a game has started from the position.
+	# M     game id, from square, to square:        a move has been made.
+	# E     game id:                                the game is no longer active.
+NEW_GAME = "N"
+MOVE = "M"
+END_GAME = "E"
+
+
+class MoveJournal:
+	"""A class that represent the journal of the active games of a server. Every record is flushed to the operating
+	system as soon as it is written, so it survives a crash of the process. The journal is synced to disk, so that
+	it also survives a power loss, after every sync_every records, by a background thread at most sync_interval
+	seconds after a record is written, and whenever sync is called. Every snapshot_every moves, a snapshot of all
+	active games is written and a new segment of the journal is started, so that recovery only replays the moves
+	since the snapshot.
+	The moves are replayed as trusted moves, so checkmate is only looked for in the final position of each game."""
+
+	def __init__(self, directory, sync_every=64, sync_interval=0.1, snapshot_every=10000, game_options=None):
+		"""Instantiate the journal. Takes the directory of the journal, the number of records and the number of
+		seconds between two syncs, the number of moves between two snapshots, and a dictionary of the options of
+		JanggiGame used for recovered games as parameters. Recovers the games of an existing journal."""
+
+		self._directory = directory
+		self._sync_every = sync_every
+		self._sync_interval = sync_interval
+		self._snapshot_every = snapshot_every
+		self._game_options = game_options or {}
+		self._games = {}
+		self._unsynced = 0
+		self._last_sync = time.monotonic()
+		self._moves_since_snapshot = 0
+
+		# The background thread and the callers of the journal write, sync and change the games under the lock,
+		# so that a snapshot never contains a move whose record follows it.
+		self._lock = threading.RLock()
+		self._closed = threading.Event()
+
+		os.makedirs(directory, exist_ok=True)
+		self._segment = self._recover()
+		self._file = open(self.get_segment_path(self._segment), "a")
+		self.sync_directory()
+
+		self._thread = threading.Thread(target=self._run, name="MoveJournal", daemon=True)
+		self._thread.start()
+
+	def get_segment_path(self, segment):
+		"""Takes the number of a segment of the journal as parameter and returns the path of its file."""
+		return os.path.join(self._directory, SEGMENT_FILE % segment)
+
+	def get_segments(self):
+		"""Returns the sorted numbers of the segments of the journal in the directory."""
+
+		return sorted(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) for name in os.listdir(self._directory)
+		              if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+
+	def get_games(self):
+		"""Returns the dictionary of the active games by their id."""
+		return self._games
+
+	def _recover(self):
+		"""Loads the latest snapshot, if any, and replays the segments of the journal written after it.
+		Returns the number of the segment that new records are appended to."""
+
+		segment = 0
+		snapshotPath = os.path.join(self._directory, SNAPSHOT_FILE)
+		if os.path.exists(snapshotPath):
+			with open(snapshotPath) as snapshotFile:
+				snapshot = json.load(snapshotFile)
+			segment = snapshot["segment"]
+			for gameId, gameSnapshot in snapshot["games"].items():
+				game = JanggiGame(**self._game_options)
+				game.restore_snapshot(gameSnapshot)
+				self._games[gameId] = game
+
+		# Collect the moves of each game first, so that each game is replayed in one trusted batch.
+		moves = {gameId: [] for gameId in self._games}
+		for number in self.get_segments():
+			if number < segment:
+				continue
+			segment = number
+			path = self.get_segment_path(number)
+			with open(path) as segmentFile:
+				for line in segmentFile:
+
+					# A record cut short by a crash was never synced. It is cut off, so that new records follow
+					# the last complete one.
+					if not line.endswith("\n"):
+						os.truncate(path, os.path.getsize(path) - len(line.encode()))
+						break
+					fields = line.rstrip("\n").split("\t")
+					if fields[0] == NEW_GAME:
+						self._games[fields[1]] = game = JanggiGame(**self._game_options)
+						game.set_position_text(fields[2])
+						moves[fields[1]] = []
+					elif fields[0] == MOVE and fields[1] in moves:
+						moves[fields[1]].append((fields[2], fields[3]))
+					elif fields[0] == END_GAME:
+						self._games.pop(fields[1], None)
+						moves.pop(fields[1], None)
+
+		for gameId, gameMoves in moves.items():
+			self._games[gameId].apply_moves(gameMoves, trusted=True)
+			self._moves_since_snapshot += len(gameMoves)
+		return segment
+
+	def _write(self, *fields):
+		"""Takes the fields of a record as parameters and appends the record to the journal.
+		Syncs the journal if enough records or time have accumulated. Returns None."""
+
+		with self._lock:
+			self._file.write("\t".join(fields) + "\n")
+			self._file.flush()
+			self._unsynced += 1
+			if self._unsynced >= self._sync_every or time.monotonic() - self._last_sync >= self._sync_interval:
+				self.sync()
+
+	def _run(self):
+		"""Runs on the background thread until the journal is closed, and syncs the records that have waited
+		for sync_interval seconds. Returns None."""
+
+		while not self._closed.wait(self._sync_interval):
+			with self._lock:
+				if self._unsynced and not self._closed.is_set():
+					self.sync()
+
+	def start_game(self, gameId, game=None):
+		"""Takes the id of a game, which cannot contain tabs or newlines, and the game (a new JanggiGame by default)
+		as parameters. Journals the start of the game from its current position. Returns the game."""
+
+		if game is None:
+			game = JanggiGame(**self._game_options)
+		with self._lock:
+			self._games[gameId] = game
+			self._write(NEW_GAME, gameId, game.get_position_text())
+		return game
+
+	def make_move(self, gameId, fromSquare, toSquare):
+		"""Takes the id of an active game and the from and to square as parameters. Makes the move in the game and
+		journals it if it is accepted. Returns the result of make_move."""
+
+		with self._lock:
+			if not self._games[gameId].make_move(fromSquare, toSquare):
+				return False
+			self.record_move(gameId, fromSquare, toSquare)
+		return True
+
+	def record_move(self, gameId, fromSquare, toSquare):
+		"""Takes the id of an active game and the from and to square of a move already accepted by make_move as
+		parameters. Journals the move, and writes a snapshot if enough moves have been journaled. A caller that makes
+		the move itself must not let another thread snapshot the journal between the move and this call.
+		Returns None."""
+
+		with self._lock:
+			self._write(MOVE, gameId, fromSquare.upper(), toSquare.upper())
+			self._moves_since_snapshot += 1
+			if self._moves_since_snapshot >= self._snapshot_every:
+				self.snapshot()
+
+	def end_game(self, gameId):
+		"""Takes the id of an active game as parameter. Journals that the game is no longer active and
+		returns the game."""
+
+		with self._lock:
+			self._write(END_GAME, gameId)
+			return self._games.pop(gameId)
+
+	def sync(self):
+		"""Writes the records of the journal to disk. Returns None."""
+
+		with self._lock:
+			self._file.flush()
+			os.fsync(self._file.fileno())
+			self._unsynced = 0
+			self._last_sync = time.monotonic()
+
+	def sync_directory(self):
+		"""Writes the entries of the directory, such as created, renamed and removed files, to disk. Returns None."""
+
+		directory = os.open(self._directory, os.O_RDONLY)
+		try:
+			os.fsync(directory)
+		finally:
+			os.close(directory)
+
+	def snapshot(self):
+		"""Starts a new segment of the journal, writes a snapshot of all active games, and deletes the segments
+		that the snapshot replaces. Returns None."""
+
+		with self._lock:
+			self.sync()
+			self._file.close()
+			self._segment += 1
+			self._file = open(self.get_segment_path(self._segment), "a")
+			self.sync_directory()
+
+			# The snapshot replaces the old one at once, so a crash leaves either snapshot with its segments.
+			# The old segments are only removed once the new snapshot is on disk.
+			snapshot = {"segment": self._segment,
+			            "games": {gameId: game.get_snapshot() for gameId, game in self._games.items()}}
+			snapshotPath = os.path.join(self._directory, SNAPSHOT_FILE)
+			with open(snapshotPath + ".tmp", "w") as snapshotFile:
+				json.dump(snapshot, snapshotFile)
+				snapshotFile.flush()
+				os.fsync(snapshotFile.fileno())
+			os.replace(snapshotPath + ".tmp", snapshotPath)
+			self.sync_directory()
+
+			for number in self.get_segments():
+				if number < self._segment:
+					os.remove(self.get_segment_path(number))
+			self._moves_since_snapshot = 0
+
+	def close(self):
+		"""Stops the background thread, and syncs and closes the journal. Returns None."""
+
+		self._closed.set()
+		self._thread.join()
+		self.sync()
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
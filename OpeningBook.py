@@ -0,0 +1,163 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      An opening book of Janggi moves built from game records and read through mmap.
+
+import mmap
+import struct
+from JanggiGame import JanggiGame, SQUARE_POSITIONS, POSITION_SQUARES
+from TranspositionTable import encode_move, decode_move
+
+
+# File header: magic bytes, version and number of records.
+HEADER = struct.Struct("<4sHxxQ")
+MAGIC = b"JNGB"
+VERSION = 1
+
+# Fixed record: position hash, move, and the number of games, wins and draws of the player making the move.
+RECORD = struct.Struct("<QHIII")
+HASH = struct.Struct("<Q")
+
+# Results that can end a game record
+RESULTS = ("BLUE_WON", "RED_WON", "DRAW", "UNFINISHED")
+
+
+def parse_game_record(line):
+	"""Takes one line of a game record as parameter. A game record lists the moves of a game as pairs of
+	squares joined by a dash, separated by spaces, and may end with the result of the game
+	[e.g. "A7-B7 A4-A5 C7-C6 BLUE_WON"]. Returns the list of moves as pairs of squares and the result,
+	which is None if the record does not end with one."""
+
+	tokens = line.split()
+	result = None
+	if tokens and tokens[-1].upper() in RESULTS:
+		result = tokens.pop().upper()
+
+	moves = []
+	for token in tokens:
+		fromSquare, _, toSquare = token.partition("-")
+		moves.append((fromSquare.upper(), toSquare.upper()))
+	return moves, result
+
+
+def build_opening_book(records, path, max_plies=20, min_games=1):
+	"""Takes an iterable of game records (lines in the format of parse_game_record), the path of the book file,
+	the number of plies of each game to be included and the minimum number of games for a move as parameters.
+	Replays the opening of every game and writes the statistics of each move in each position,
+	sorted by position hash, to the book file. Returns the number of records written."""
+
+	statistics = {}
+	for line in records:
+		moves, result = parse_game_record(line)
+		game = JanggiGame(lazy_game_state=True)
+		for fromSquare, toSquare in moves[:max_plies]:
+			positionHash = game.get_position_hash()
+			player = game.get_turn()
+			if not game.make_move(fromSquare, toSquare):
+				break
+
+			move = encode_move(SQUARE_POSITIONS[fromSquare], SQUARE_POSITIONS[toSquare])
+			games, wins, draws = statistics.get((positionHash, move), (0, 0, 0))
+			statistics[(positionHash, move)] = (games + 1, wins + (result == player + "_WON"), draws + (result == "DRAW"))
+
+	# Sort by position hash, and by the most played moves within the same position.
+	entries = sorted(((positionHash, move) + counts for (positionHash, move), counts in statistics.items()
+	                  if counts[0] >= min_games), key=lambda entry: (entry[0], -entry[2], entry[1]))
+
+	with open(path, "wb") as bookFile:
+		bookFile.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+		for entry in entries:
+			bookFile.write(RECORD.pack(*entry))
+	return len(entries)
+
+
+class OpeningBook:
+	"""A class that represent an opening book file.
+	The records are sorted by position hash, and looked up by binary search through mmap."""
+
+	def __init__(self, path):
+		"""Instantiate the opening book. Takes the path of a file written by build_opening_book as parameter."""
+
+		self._file = open(path, "rb")
+		self._map = None
+		self._size = 0
+
+		# mmap cannot map an empty book, which only has the header.
+		header = self._file.read(HEADER.size)
+		if len(header) != HEADER.size:
+			self._file.close()
+			raise ValueError("Not a valid opening book: " + str(path))
+		magic, version, self._size = HEADER.unpack(header)
+		if magic != MAGIC or version != VERSION:
+			self._file.close()
+			raise ValueError("Not a valid opening book: " + str(path))
+		if self._size:
+			self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+			if len(self._map) != HEADER.size + self._size * RECORD.size:
+				self.close()
+				raise ValueError("Not a valid opening book: " + str(path))
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def __len__(self):
+		return self._size
+
+	def lookup(self, positionHash):
+		"""Takes the hash of a position as parameter. Returns a list of tuples (move, games, wins, draws)
+		for every move played in the position, with the most played move first.
+		Each move is a pair of from and to position."""
+
+		# Binary search for the first record of the position.
+		low, high = 0, self._size
+		while low < high:
+			middle = (low + high) // 2
+			if HASH.unpack_from(self._map, HEADER.size + middle * RECORD.size)[0] < positionHash:
+				low = middle + 1
+			else:
+				high = middle
+
+		entries = []
+		for index in range(low, self._size):
+			storedHash, move, games, wins, draws = RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+			if storedHash != positionHash:
+				break
+			entries.append((decode_move(move), games, wins, draws))
+		return entries
+
+	def get_moves(self, game):
+		"""Takes a game as parameter. Returns a list of tuples (fromSquare, toSquare, games, wins, draws)
+		for every legal move in the book for the current position, with the most played move first."""
+
+		moves = []
+		for (fromPosition, toPosition), games, wins, draws in self.lookup(game.get_position_hash()):
+			gamePiece = game.get_board()[fromPosition]
+			if gamePiece is not None and gamePiece.get_player() == game.get_turn() and \
+					game.is_legal_move(fromPosition, toPosition):
+				moves.append((POSITION_SQUARES[fromPosition], POSITION_SQUARES[toPosition], games, wins, draws))
+		return moves
+
+	def choose_move(self, game, rng=None):
+		"""Takes a game and an optional random number generator (such as random.Random) as parameters.
+		Returns the most played move of the current position as a pair of squares, or a move picked at random
+		in proportion to how often it has been played if a random number generator is given.
+		Returns None if the position is not in the book."""
+
+		moves = self.get_moves(game)
+		if not moves:
+			return None
+		if rng is None:
+			return moves[0][:2]
+		return rng.choices(moves, weights=[games for _, _, games, _, _ in moves])[0][:2]
+
+	def close(self):
+		"""Closes the opening book file. Returns None."""
+
+		if self._map is not None:
+			self._map.close()
+			self._map = None
+		if self._file is not None:
+			self._file.close()
+			self._file = None
@@ -0,0 +1,154 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Opt-in call counters and timers for the hot paths of the Janggi rules.
+
+import json
+from time import perf_counter
+from JanggiGame import JanggiGame, GamePiece, PIECE_CLASSES
+
+
+# Methods of the game that are counted and timed.
+PROFILED_METHODS = ["is_in_check", "is_checkmate", "get_position", "try_move", "restore_move", "convert_position",
+                    "is_legal_move", "generate_moves", "play_move"]
+
+# Methods of every game piece that are counted and timed, per type of game piece.
+PROFILED_PIECE_METHODS = ["legal_moves", "is_legal_move", "capture_moves"]
+
+# The profilers that are enabled, and the methods of the classes that have been replaced while any profiler is.
+_enabled = []
+_replaced = []
+
+
+def _profiled_methods():
+	"""Yields the class, the name of the method and the name of the statistics of every profiled method."""
+
+	for method in PROFILED_METHODS:
+		yield JanggiGame, method, method
+	for pieceClass in PIECE_CLASSES.values():
+		for method in PROFILED_PIECE_METHODS:
+			yield pieceClass, method, pieceClass.__name__ + "." + method
+
+
+def _is_profiled(profiler, instance):
+	"""Takes a profiler and a game or a game piece as parameters. Returns True if the profiler profiles it."""
+
+	game = profiler.get_game()
+	return instance is game or (isinstance(instance, GamePiece) and game.has_game_piece(instance))
+
+
+def _wrap(cls, method, name):
+	"""Takes a class, the name of one of its methods and the name of the statistics as parameters. Replaces the
+	method of the class by one that counts and times the calls on the instances of the enabled profilers.
+	Returns None."""
+
+	function = getattr(cls, method)
+
+	def wrapper(instance, *args, **kwargs):
+		profilers = [profiler for profiler in _enabled if _is_profiled(profiler, instance)]
+		if not profilers:
+			return function(instance, *args, **kwargs)
+		start = perf_counter()
+		try:
+			return function(instance, *args, **kwargs)
+		finally:
+			elapsed = perf_counter() - start
+			for profiler in profilers:
+				profiler.add_call(name, elapsed)
+
+	_replaced.append((cls, method, cls.__dict__.get(method)))
+	setattr(cls, method, wrapper)
+
+
+def _unwrap():
+	"""Restores every method replaced by _wrap. Returns None."""
+
+	for cls, method, function in reversed(_replaced):
+		if function is None:
+			delattr(cls, method)
+		else:
+			setattr(cls, method, function)
+	del _replaced[:]
+
+
+class Profiler:
+	"""A class that represent a profiler of one game. While any profiler is enabled, the profiled methods of
+	JanggiGame and of the game pieces are replaced on their classes by wrappers that count the calls on the
+	profiled game and its game pieces, and add up the time spent in them, including the time spent in nested calls.
+	Copies of the game, such as those searched by the engine, are not counted.
+	While no profiler is enabled, nothing is wrapped and the game runs at full speed."""
+
+	def __init__(self, game, enabled=True):
+		"""Instantiate the profiler. Takes the game to be profiled and whether to start profiling as parameters."""
+
+		self._game = game
+		self._stats = {name: {"calls": 0, "time": 0.0} for _, _, name in _profiled_methods()}
+		if enabled:
+			self.enable()
+
+	def __enter__(self):
+		self.enable()
+		return self
+
+	def __exit__(self, *exc_info):
+		self.disable()
+
+	def get_game(self):
+		"""Returns the game that is profiled."""
+		return self._game
+
+	def add_call(self, name, seconds):
+		"""Takes the name of the statistics of a method and the seconds spent in a call as parameters.
+		Counts the call. Returns None."""
+
+		stats = self._stats[name]
+		stats["calls"] += 1
+		stats["time"] += seconds
+
+	def enable(self):
+		"""Starts profiling the game, including the game pieces that are put on the board later. Returns None."""
+
+		if self in _enabled:
+			return
+		if not _enabled:
+			for cls, method, name in _profiled_methods():
+				_wrap(cls, method, name)
+		_enabled.append(self)
+
+	def disable(self):
+		"""Stops profiling the game, keeping the statistics collected so far. Returns None."""
+
+		if self not in _enabled:
+			return
+		_enabled.remove(self)
+		if not _enabled:
+			_unwrap()
+
+	def is_enabled(self):
+		"""Returns True if the game is being profiled and False otherwise."""
+		return self in _enabled
+
+	def reset(self):
+		"""Clears the statistics collected so far. Returns None."""
+
+		for stats in self._stats.values():
+			stats["calls"] = 0
+			stats["time"] = 0.0
+
+	def get_stats(self):
+		"""Returns a dictionary from the name of each profiled method to a dictionary of the number of calls
+		and the total time spent in seconds."""
+
+		return {name: dict(stats) for name, stats in self._stats.items()}
+
+	def to_json(self, indent=None):
+		"""Takes the indentation of the JSON text as parameter. Returns the statistics as JSON text,
+		together with the hash of the current position and the player to move."""
+
+		return json.dumps({"position": self._game.get_position_hash(), "turn": self._game.get_turn(),
+		                   "stats": self.get_stats()}, indent=indent, sort_keys=True)
+
+	def dump(self, path):
+		"""Takes the path of a file as parameter and writes the statistics to the file as JSON. Returns None."""
+
+		with open(path, "w") as statsFile:
+			statsFile.write(self.to_json(indent=2))
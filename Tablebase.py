@@ -0,0 +1,321 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Endgame tablebases of Janggi computed by retrograde analysis and stored as bit-packed files
+#                   that are read through mmap.
+
+import itertools
+import mmap
+import struct
+from array import array
+from JanggiGame import JanggiGame, PIECE_NAMES
+
+
+# File header: magic bytes, version, number of bits of each entry, number of entries and length of the material.
+HEADER = struct.Struct("<4sHBxQI")
+MAGIC = b"JNGT"
+VERSION = 1
+
+# Results of a position for the player to move. Each entry holds the result in its lowest two bits,
+# and the distance to mate in plies in the remaining bits.
+DRAW = 0
+WIN = 1
+LOSS = 2
+INVALID = 3
+RESULT_NAMES = {DRAW: "DRAW", WIN: "WIN", LOSS: "LOSS"}
+
+# Positions that are still being solved
+_UNKNOWN = 4
+
+PLAYERS = ("BLUE", "RED")
+
+
+def normalize_material(material):
+	"""Takes an iterable of game pieces, given as pairs of the player and the name of the game piece, as parameter.
+	Returns the game pieces as a tuple sorted by player (BLUE first) and in the order that each player holds them.
+	Raises ValueError if each player does not have exactly one General."""
+
+	material = tuple(sorted(((player.upper(), name) for player, name in material),
+	                        key=lambda piece: (PLAYERS.index(piece[0]), PIECE_NAMES.index(piece[1]))))
+	if [player for player, name in material if name == "General"] != list(PLAYERS):
+		raise ValueError("Each player must have exactly one General.")
+	return material
+
+
+def get_domain(player, name):
+	"""Takes the player and the name of a game piece as parameters and returns the list of positions
+	that the game piece can stand on. Generals and Guards never leave their fortress,
+	and Soldiers never move backwards from the row that they start on."""
+
+	if name in ("General", "Guard"):
+		rows = range(7, 10) if player == "BLUE" else range(0, 3)
+		return [(i, j) for i in rows for j in range(3, 6)]
+	if name == "Soldier":
+		rows = range(0, 7) if player == "BLUE" else range(3, 10)
+		return [(i, j) for i in rows for j in range(9)]
+	return [(i, j) for i in range(10) for j in range(9)]
+
+
+class _Indexer:
+	"""A class that maps the positions of the game pieces of a material and the player to move to
+	the index of an entry. The index is a mixed-radix number with one digit for each game piece,
+	the domain of the game piece being its radix, followed by one bit for the player to move."""
+
+	def __init__(self, material):
+		self._domains = [get_domain(player, name) for player, name in material]
+		self._digits = [{position: digit for digit, position in enumerate(domain)} for domain in self._domains]
+		self._multipliers = []
+		size = 2
+		for domain in self._domains:
+			self._multipliers.append(size)
+			size *= len(domain)
+		self._size = size
+
+	def get_size(self):
+		"""Returns the number of entries."""
+		return self._size
+
+	def get_domains(self):
+		"""Returns the list of positions that each game piece can stand on."""
+		return self._domains
+
+	def index(self, positions, player):
+		"""Takes the positions of the game pieces and the player to move as parameters.
+		Returns the index of the entry, or None if a game piece stands outside its domain."""
+
+		index = 1 if player == "RED" else 0
+		for digits, multiplier, position in zip(self._digits, self._multipliers, positions):
+			digit = digits.get(position)
+			if digit is None:
+				return None
+			index += digit * multiplier
+		return index
+
+
+def _is_attacked(board, positions, target):
+	"""Takes the board, the positions of the attacking game pieces and a target position as parameters.
+	Returns True if any of the game pieces can move onto the target position, and False otherwise."""
+
+	return any(board[position].is_legal_move(board, position, target) for position in positions)
+
+
+def _solve(material, solved):
+	"""Takes a normalized material and a dictionary of the results of the materials solved so far as parameters.
+	Solves every material that the material can be reduced to by captures first, then all positions of
+	the material by retrograde analysis. Returns the results and distances to mate as a pair of arrays,
+	and adds them to the dictionary."""
+
+	if material in solved:
+		return solved[material]
+
+	# Captures reduce the material, so the smaller materials are solved first.
+	for captured, (player, name) in enumerate(material):
+		if name != "General":
+			_solve(material[:captured] + material[captured + 1:], solved)
+
+	indexer = _Indexer(material)
+	size = indexer.get_size()
+	results = bytearray([INVALID]) * size
+	distances = array("H", [0]) * size
+	remaining = array("H", [0]) * size
+	predecessors = {}
+	events = {}
+	level = []
+
+	# Only the game pieces of the material can give check, so the board does not need to be searched for them.
+	owners = [player for player, _ in material]
+	generals = {player: material.index((player, "General")) for player in PLAYERS}
+
+	game = JanggiGame(lazy_game_state=True)
+	for positions in itertools.product(*indexer.get_domains()):
+		if len(set(positions)) != len(positions):
+			continue
+		game.set_position(dict(zip(positions, material)))
+		board = game.get_board()
+		pieceIndices = {position: i for i, position in enumerate(positions)}
+		in_check = {player: _is_attacked(board, [position for position, owner in zip(positions, owners) if owner != player],
+		                                 positions[generals[player]]) for player in PLAYERS}
+
+		for player in PLAYERS:
+			# Positions where the player who just moved is left in check cannot be reached.
+			opponent = game.get_opponent(player)
+			if in_check[opponent]:
+				continue
+			index = indexer.index(positions, player)
+			results[index] = _UNKNOWN
+
+			moves = 0
+			for fromPosition, toPosition in game.generate_moves(player):
+				nextPositions = list(positions)
+				nextPositions[pieceIndices[fromPosition]] = toPosition
+				capturedIndex = pieceIndices.get(toPosition)
+				attackers = [position for i, (position, owner) in enumerate(zip(nextPositions, owners))
+				             if owner == opponent and i != capturedIndex]
+
+				captured = game.try_move(fromPosition, toPosition)
+				legal = not _is_attacked(board, attackers, nextPositions[generals[player]])
+				game.restore_move(fromPosition, toPosition, captured)
+				if not legal:
+					continue
+				moves += 1
+
+				if captured is None:
+					predecessors.setdefault(indexer.index(nextPositions, opponent), []).append(index)
+					continue
+
+				# A capture leads to a position of a smaller material that is already solved.
+				del nextPositions[capturedIndex]
+				subMaterial = material[:capturedIndex] + material[capturedIndex + 1:]
+				subResults, subDistances = solved[subMaterial]
+				subIndex = _Indexer(subMaterial).index(nextPositions, opponent)
+				if subResults[subIndex] != DRAW:
+					events.setdefault(subDistances[subIndex], []).append((index, subResults[subIndex]))
+
+			# Passing the turn is only allowed when not in check.
+			if not in_check[player]:
+				moves += 1
+				predecessors.setdefault(indexer.index(positions, opponent), []).append(index)
+
+			remaining[index] = moves
+			if moves == 0:
+				results[index] = LOSS
+				level.append(index)
+
+	# Resolve the positions in order of their distance to mate. A position is won as soon as one of its moves
+	# leads to a lost position, and lost once all of its moves lead to won positions.
+	distance = 0
+	while level or events:
+		nextLevel = []
+		solvedMoves = [(predecessor, results[index]) for index in level for predecessor in predecessors.get(index, ())]
+		for index, result in itertools.chain(events.pop(distance, ()), solvedMoves):
+			if results[index] != _UNKNOWN:
+				continue
+			if result == LOSS:
+				results[index] = WIN
+				distances[index] = distance + 1
+				nextLevel.append(index)
+			else:
+				remaining[index] -= 1
+				if remaining[index] == 0:
+					results[index] = LOSS
+					distances[index] = distance + 1
+					nextLevel.append(index)
+		level = nextLevel
+		distance += 1
+
+	for index in range(size):
+		if results[index] == _UNKNOWN:
+			results[index] = DRAW
+
+	solved[material] = (results, distances)
+	return solved[material]
+
+
+def generate_tablebase(material, path):
+	"""Takes an iterable of game pieces, given as pairs of the player and the name of the game piece
+	[e.g. [("BLUE", "General"), ("BLUE", "Chariot"), ("RED", "General"), ("RED", "Guard")]], and the path of
+	the tablebase file as parameters. Solves all positions of the material and writes the result and
+	distance to mate of every position to the file, each entry packed into as few bits as the longest
+	distance needs. Returns a dictionary of the number of positions won, lost and drawn by the player to move."""
+
+	material = normalize_material(material)
+	results, distances = _solve(material, {})
+
+	distanceBits = max(max(distances, default=0).bit_length(), 1)
+	entryBits = distanceBits + 2
+	data = bytearray((len(results) * entryBits + 7) // 8)
+	counts = {name: 0 for name in RESULT_NAMES.values()}
+	for index, (result, distance) in enumerate(zip(results, distances)):
+		if result != INVALID:
+			counts[RESULT_NAMES[result]] += 1
+		bit = index * entryBits
+		entry = (result | distance << 2) << (bit & 7)
+		byte = bit >> 3
+		while entry:
+			data[byte] |= entry & 0xFF
+			entry >>= 8
+			byte += 1
+
+	description = ",".join(player + " " + name for player, name in material).encode("ascii")
+	with open(path, "wb") as tablebaseFile:
+		tablebaseFile.write(HEADER.pack(MAGIC, VERSION, entryBits, len(results), len(description)))
+		tablebaseFile.write(description)
+		tablebaseFile.write(data)
+	return counts
+
+
+class Tablebase:
+	"""A class that represent a tablebase file written by generate_tablebase.
+	The entries are read through mmap, so that a tablebase is only loaded as far as it is probed."""
+
+	def __init__(self, path):
+		"""Instantiate the tablebase. Takes the path of a file written by generate_tablebase as parameter."""
+
+		self._file = open(path, "rb")
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		if len(self._map) < HEADER.size:
+			self.close()
+			raise ValueError("Not a valid tablebase: " + str(path))
+		magic, version, self._entryBits, self._size, length = HEADER.unpack_from(self._map, 0)
+		self._offset = HEADER.size + length
+		if magic != MAGIC or version != VERSION or \
+				len(self._map) != self._offset + (self._size * self._entryBits + 7) // 8:
+			self.close()
+			raise ValueError("Not a valid tablebase: " + str(path))
+
+		description = self._map[HEADER.size:self._offset].decode("ascii")
+		self._material = tuple(tuple(piece.split(" ")) for piece in description.split(","))
+		self._indexer = _Indexer(self._material)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def __len__(self):
+		return self._size
+
+	def get_material(self):
+		"""Returns the game pieces of the tablebase as a tuple of pairs of the player and the name of the game piece."""
+		return self._material
+
+	def probe_index(self, index):
+		"""Takes the index of an entry as parameter. Returns the result for the player to move,
+		either "WIN", "LOSS" or "DRAW", and the distance to mate in plies as a pair.
+		Returns None if the entry is not a reachable position."""
+
+		bit = index * self._entryBits
+		byte = bit >> 3
+		count = ((bit & 7) + self._entryBits + 7) >> 3
+		entry = (int.from_bytes(self._map[self._offset + byte:self._offset + byte + count], "little") >> (bit & 7)) & \
+			((1 << self._entryBits) - 1)
+		if entry & 3 == INVALID:
+			return None
+		return RESULT_NAMES[entry & 3], entry >> 2
+
+	def probe(self, game):
+		"""Takes a game as parameter. Returns the result for the player to move, either "WIN", "LOSS" or "DRAW",
+		and the distance to mate in plies as a pair. Returns None if the game pieces on the board are not those
+		of the tablebase."""
+
+		pieces = sorted(((gamePiece.get_player(), gamePiece.get_name(), position)
+		                 for position, gamePiece in game.get_board().items() if gamePiece is not None),
+		                key=lambda piece: (PLAYERS.index(piece[0]), PIECE_NAMES.index(piece[1])))
+		if tuple((player, name) for player, name, _ in pieces) != self._material:
+			return None
+
+		index = self._indexer.index([position for _, _, position in pieces], game.get_turn())
+		if index is None:
+			return None
+		return self.probe_index(index)
+
+	def close(self):
+		"""Closes the tablebase file. Returns None."""
+
+		if self._map is not None:
+			self._map.close()
+			self._map = None
+		if self._file is not None:
+			self._file.close()
+			self._file = None
@@ -0,0 +1,67 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      A terminal renderer of a Janggi game that only redraws the cells that have changed.
+
+import sys
+from JanggiGame import ROW_LABEL_WIDTH, CELL_WIDTH
+
+
+# ANSI escape codes that clear the screen, clear the screen below the cursor, and move the cursor.
+CLEAR_SCREEN = "\033[2J\033[H"
+CLEAR_BELOW = "\033[J"
+MOVE_CURSOR = "\033[{};{}H"
+
+# Lines and columns of the terminal (counted from 1) where the cells of the board are printed.
+# Three lines of labels come before the first row, and each row but the last is followed by two spacer lines.
+FIRST_ROW_LINE = 4
+LINES_PER_ROW = 3
+FIRST_CELL_COLUMN = ROW_LABEL_WIDTH + 1
+
+
+class TerminalRenderer:
+	"""A class that represent a renderer of a game on an ANSI terminal. The first frame is the full board as printed
+	by print_board. Every later frame moves the cursor to the cells that have changed since the previous frame and
+	redraws only those, followed by the game status."""
+
+	def __init__(self, game, stream=None):
+		"""Instantiate the renderer. Takes the game to be drawn and the stream to draw on (standard output
+		by default) as parameters."""
+
+		self._game = game
+		self._stream = stream
+		self._cells = None
+
+	def get_game(self):
+		"""Returns the game that is drawn."""
+		return self._game
+
+	def invalidate(self):
+		"""Makes the next frame redraw the full board, such as after the terminal has been cleared. Returns None."""
+		self._cells = None
+
+	def render(self):
+		"""Returns the next frame as a string, which is either the full board or the changes since the previous frame."""
+
+		cells = {position: self._game.render_cell(position) for position in self._game.get_board()}
+		if self._cells is None:
+			self._cells = cells
+			return CLEAR_SCREEN + self._game.render_board()
+
+		frame = []
+		for (i, j), cell in cells.items():
+			if cell != self._cells[(i, j)]:
+				frame.append(MOVE_CURSOR.format(FIRST_ROW_LINE + i * LINES_PER_ROW, FIRST_CELL_COLUMN + j * CELL_WIDTH))
+				frame.append(cell)
+		self._cells = cells
+
+		# The game status is printed right after the last row.
+		statusLine = FIRST_ROW_LINE + (self._game.get_rows() - 1) * LINES_PER_ROW + 1
+		frame.append(MOVE_CURSOR.format(statusLine, 1) + CLEAR_BELOW + self._game.render_status())
+		return "".join(frame)
+
+	def draw(self):
+		"""Writes the next frame to the stream in one write. Returns None."""
+
+		stream = self._stream if self._stream is not None else sys.stdout
+		stream.write(self.render())
+		stream.flush()
@@ -0,0 +1,249 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Matches between two engine configurations played in parallel, with Elo statistics and
+#                   sequential probability ratio test (SPRT) early stopping.
+
+import argparse
+import json
+import math
+import multiprocessing
+import threading
+import time
+from JanggiGame import JanggiGame, POSITION_SQUARES
+from JanggiEngine import JanggiEngine
+from OpeningBook import parse_game_record
+
+
+# Number of moves that the remaining time on the clock is shared between.
+MOVES_TO_GO = 30
+
+# Default configuration of an engine: the depth of the search and the options of JanggiEngine.
+DEFAULT_CONFIG = {"depth": 3, "table_size_mb": 4}
+
+
+def expected_score(elo):
+	"""Takes an Elo difference as parameter and returns the expected score of the stronger player."""
+	return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_to_elo(score):
+	"""Takes a score between 0 and 1 as parameter and returns the Elo difference that it corresponds to.
+	Returns infinity for a score of 1 and negative infinity for a score of 0."""
+
+	if score <= 0:
+		return -math.inf
+	if score >= 1:
+		return math.inf
+	return -400 * math.log10(1 / score - 1)
+
+
+def get_score_stats(wins, draws, losses):
+	"""Takes the number of wins, draws and losses as parameters. Returns the mean score and
+	the variance of the score of a single game."""
+
+	games = wins + draws + losses
+	score = (wins + draws / 2) / games
+	variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+	return score, variance
+
+
+def elo_interval(wins, draws, losses, z=1.96):
+	"""Takes the number of wins, draws and losses, and the number of standard deviations of the error bars
+	(1.96 for 95%) as parameters. Returns the Elo difference and its lower and upper bound."""
+
+	games = wins + draws + losses
+	if games == 0:
+		return 0.0, -math.inf, math.inf
+	score, variance = get_score_stats(wins, draws, losses)
+	error = z * math.sqrt(variance / games)
+	return score_to_elo(score), score_to_elo(score - error), score_to_elo(score + error)
+
+
+def sprt_bounds(alpha=0.05, beta=0.05):
+	"""Takes the probabilities of a false positive and of a false negative as parameters.
+	Returns the lower and upper bound of the log-likelihood ratio."""
+	return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+	"""Takes the number of wins, draws and losses, and the Elo differences of the null and the alternative
+	hypothesis as parameters. Returns the log-likelihood ratio of the alternative against the null hypothesis,
+	with the score of a game approximated by a normal distribution.
+	Returns zero until at least one game has been won and one has been lost."""
+
+	games = wins + draws + losses
+	if wins == 0 or losses == 0:
+		return 0.0
+	score, variance = get_score_stats(wins, draws, losses)
+	score0, score1 = expected_score(elo0), expected_score(elo1)
+	return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+
+def sprt_decision(wins, draws, losses, elo0, elo1, alpha=0.05, beta=0.05):
+	"""Takes the number of wins, draws and losses, the Elo differences of both hypotheses and the probabilities
+	of a false positive and of a false negative as parameters. Returns "H1" if the alternative hypothesis is
+	accepted, "H0" if the null hypothesis is accepted, and None if more games are needed."""
+
+	lower, upper = sprt_bounds(alpha, beta)
+	llr = sprt_llr(wins, draws, losses, elo0, elo1)
+	if llr >= upper:
+		return "H1"
+	if llr <= lower:
+		return "H0"
+	return None
+
+
+def choose_move(engine, game, depth, seconds=None):
+	"""Takes an engine, the game, the depth of the search and the number of seconds for the move (None for
+	no limit) as parameters. Returns the move of the engine as a pair of squares. If the search is stopped
+	before it finds a move, the first legal move is returned instead. Returns None if the player has no legal move."""
+
+	stopEvent = None
+	timer = None
+	if seconds is not None:
+		stopEvent = threading.Event()
+		timer = threading.Timer(max(seconds, 0), stopEvent.set)
+		timer.start()
+	try:
+		move = engine.choose_move(depth, stop_event=stopEvent)
+	finally:
+		if timer is not None:
+			timer.cancel()
+
+	if move is None:
+		moves = [move for move in game.generate_moves(game.get_turn()) if game.is_legal_move(*move)]
+		if not moves:
+			return None
+		move = POSITION_SQUARES[moves[0][0]], POSITION_SQUARES[moves[0][1]]
+	return move
+
+
+def play_game(configs, opening=(), time_control=None, max_plies=200, repetition_limit=3):
+	"""Takes a dictionary of the configuration of the engine of each player, the opening moves as pairs of
+	squares, the time control as a pair of the seconds on each clock and the increment per move (None for
+	a fixed depth only), the number of plies after which the game is a draw, and the number of repetitions of
+	a position that draw the game as parameters. Returns the game state at the end and the moves played.
+	The opening is only played up to its first illegal move."""
+
+	game = JanggiGame(repetition_limit=repetition_limit)
+	applied = game.apply_moves(opening)
+	moves = list(opening[:applied])
+
+	engines = {}
+	depths = {}
+	for player, config in configs.items():
+		options = dict(DEFAULT_CONFIG, **config)
+		depths[player] = options.pop("depth")
+		engines[player] = JanggiEngine(game, **options)
+
+	clocks = None
+	if time_control is not None:
+		clocks = {player: time_control[0] for player in configs}
+
+	while game.get_game_state() == "UNFINISHED" and len(moves) < max_plies:
+		player = game.get_turn()
+		seconds = None
+		if clocks is not None:
+			seconds = clocks[player] / MOVES_TO_GO + time_control[1]
+
+		start = time.perf_counter()
+		move = choose_move(engines[player], game, depths[player], seconds)
+		if clocks is not None:
+			clocks[player] += time_control[1] - (time.perf_counter() - start)
+			if clocks[player] < 0:
+				return ("RED_WON" if player == "BLUE" else "BLUE_WON"), moves
+
+		# A player without a legal move passes the turn.
+		if move is None:
+			square = POSITION_SQUARES[game.get_position(game.get_players()[player][0])]
+			move = square, square
+		game.make_move(*move)
+		moves.append(move)
+
+	state = game.get_game_state()
+	return ("DRAW" if state == "UNFINISHED" else state), moves
+
+
+def _play_match_game(job):
+	"""Takes a tuple of the number of the game, the configurations of engine A and B, the opening, whether
+	engine A plays Blue, and the keyword arguments of play_game as parameter. Plays the game in a worker process.
+	Returns the number of the game, the score of engine A (1, 0.5 or 0) and the record of the game."""
+
+	number, configA, configB, opening, aPlaysBlue, options = job
+	configs = {"BLUE": configA, "RED": configB} if aPlaysBlue else {"BLUE": configB, "RED": configA}
+	state, moves = play_game(configs, opening, **options)
+	if state == "DRAW":
+		score = 0.5
+	else:
+		score = 1.0 if (state == "BLUE_WON") == aPlaysBlue else 0.0
+	record = " ".join(fromSquare + "-" + toSquare for fromSquare, toSquare in moves) + " " + state
+	return number, score, record
+
+
+def run_match(configA, configB, games=100, openings=None, time_control=None, max_plies=200, processes=None,
+              sprt=None, callback=None):
+	"""Takes the configurations of engine A and B (dictionaries of the depth and the options of JanggiEngine),
+	the number of games, a list of openings (lists of pairs of squares, or game records), the time control,
+	the number of plies after which a game is a draw, the number of worker processes, the SPRT parameters
+	as a dictionary of elo0, elo1, alpha and beta (None to play all games), and a function that is called with
+	the result so far after every game as parameters.
+	Each opening is played twice, with engine A playing each color once. Returns a dictionary of the number of
+	wins, draws and losses of engine A, the Elo difference and its 95% bounds, the SPRT decision and the
+	records of the games in the order they were scheduled."""
+
+	openings = [parse_game_record(opening)[0] if isinstance(opening, str) else list(opening)
+	            for opening in (openings or [[]])]
+	options = {"time_control": time_control, "max_plies": max_plies}
+	jobs = [(i, configA, configB, openings[(i // 2) % len(openings)], i % 2 == 0, options) for i in range(games)]
+
+	result = {"wins": 0, "draws": 0, "losses": 0, "sprt": None, "records": [None] * games}
+	with multiprocessing.Pool(processes) as pool:
+		for number, score, record in pool.imap_unordered(_play_match_game, jobs):
+			result["wins" if score == 1 else "draws" if score == 0.5 else "losses"] += 1
+			result["records"][number] = record
+			result["elo"], result["elo_lower"], result["elo_upper"] = \
+				elo_interval(result["wins"], result["draws"], result["losses"])
+			if sprt is not None:
+				result["sprt"] = sprt_decision(result["wins"], result["draws"], result["losses"], **sprt)
+			if callback is not None:
+				callback(dict(result))
+			if result["sprt"] is not None:
+				pool.terminate()
+				break
+
+	result["records"] = [record for record in result["records"] if record is not None]
+	return result
+
+
+def main(argv=None):
+	"""Plays a match between two engine configurations given as JSON and prints the result after every game."""
+
+	parser = argparse.ArgumentParser(description="Play a match between two Janggi engine configurations.")
+	parser.add_argument("--engine-a", default="{}", help='JSON configuration of engine A, such as {"depth": 3}')
+	parser.add_argument("--engine-b", default="{}", help="JSON configuration of engine B")
+	parser.add_argument("--games", type=int, default=100, help="number of games")
+	parser.add_argument("--openings", help="file of opening records, one per line")
+	parser.add_argument("--time", type=float, nargs=2, metavar=("SECONDS", "INCREMENT"), help="time control")
+	parser.add_argument("--max-plies", type=int, default=200, help="number of plies after which a game is drawn")
+	parser.add_argument("--processes", type=int, help="number of worker processes")
+	parser.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"), help="stop early by SPRT")
+	args = parser.parse_args(argv)
+
+	openings = None
+	if args.openings:
+		with open(args.openings) as openingFile:
+			openings = [line for line in openingFile if line.strip()]
+	sprt = {"elo0": args.sprt[0], "elo1": args.sprt[1]} if args.sprt else None
+
+	def report(result):
+		games = result["wins"] + result["draws"] + result["losses"]
+		print("Games: %d  W: %d  D: %d  L: %d  Elo: %.1f [%.1f, %.1f]%s" % (
+			games, result["wins"], result["draws"], result["losses"], result["elo"], result["elo_lower"],
+			result["elo_upper"], "  SPRT: " + result["sprt"] if result["sprt"] else ""), flush=True)
+
+	run_match(json.loads(args.engine_a), json.loads(args.engine_b), args.games, openings,
+	          tuple(args.time) if args.time else None, args.max_plies, args.processes, sprt, report)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,145 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Exports game records as training data for a neural network: the feature planes of every
+#                   position, the move played from it and the outcome of the game, written in chunks to NumPy
+#                   .npy files that are opened as memory maps.
+#                   Example: "python TrainingData.py games.txt data/"
+
+import argparse
+import os
+import numpy
+from JanggiGame import JanggiGame, PIECE_NAMES, SQUARE_POSITIONS
+from OpeningBook import parse_game_record
+from TranspositionTable import encode_move
+
+
+# Feature planes of a position: one plane for each type of game piece of Blue, in the order of PIECE_NAMES,
+# then the same for Red, and a plane of ones if it is Blue's turn and zeros if it is Red's.
+PIECE_PLANES = {(player, name): k * len(PIECE_NAMES) + index
+                for k, player in enumerate(("BLUE", "RED")) for index, name in enumerate(PIECE_NAMES)}
+TURN_PLANE = 2 * len(PIECE_NAMES)
+PLANES = TURN_PLANE + 1
+ROWS = 10
+COLUMNS = 9
+
+# Outcome of a game for the player to move: 1 if the player won, 0 for a draw and -1 if the player lost.
+# Records of unfinished games have no outcome and are not exported.
+OUTCOMES = {"BLUE_WON": {"BLUE": 1, "RED": -1}, "RED_WON": {"BLUE": -1, "RED": 1}, "DRAW": {"BLUE": 0, "RED": 0}}
+
+# Files written by export_training_data: the feature planes (N, 15, 10, 9) as uint8, the moves packed by
+# encode_move (N,) as int16, and the outcomes (N,) as int8.
+FEATURES_FILE = "features.npy"
+MOVES_FILE = "moves.npy"
+OUTCOMES_FILE = "outcomes.npy"
+
+# Number of positions that are encoded before they are copied to the files.
+CHUNK_SIZE = 4096
+
+
+def encode_position(game, planes):
+	"""Takes a game and an array of zeros of shape (PLANES, ROWS, COLUMNS) as parameters, and sets the feature
+	planes of the position of the game in the array. Returns None."""
+
+	indices, rows, columns = [], [], []
+	for (i, j), gamePiece in game.get_board().items():
+		if gamePiece is not None:
+			indices.append(PIECE_PLANES[(gamePiece.get_player(), gamePiece.get_name())])
+			rows.append(i)
+			columns.append(j)
+	planes[indices, rows, columns] = 1
+	if game.get_turn() == "BLUE":
+		planes[TURN_PLANE] = 1
+
+
+def count_positions(records):
+	"""Takes an iterable of game records as parameter and returns the number of positions that
+	export_training_data writes for them."""
+
+	count = 0
+	for line in records:
+		moves, result = parse_game_record(line)
+		if result in OUTCOMES:
+			count += len(moves)
+	return count
+
+
+def export_training_data(records, directory, chunk_size=CHUNK_SIZE):
+	"""Takes a sequence of game records (lines in the format of parse_game_record, such as the records of
+	Tournament.run_match), the directory of the files and the number of positions in a chunk as parameters.
+	The records are read twice: once to size the files, and once to replay the games.
+	Writes the feature planes, the move and the outcome of every position before a move of a finished game.
+	Raises ValueError if a record has a move that cannot be made. Returns the number of positions written."""
+
+	total = count_positions(records)
+	os.makedirs(directory, exist_ok=True)
+	features = numpy.lib.format.open_memmap(os.path.join(directory, FEATURES_FILE), mode="w+", dtype=numpy.uint8,
+	                                        shape=(total, PLANES, ROWS, COLUMNS))
+	moves = numpy.lib.format.open_memmap(os.path.join(directory, MOVES_FILE), mode="w+", dtype=numpy.int16,
+	                                     shape=(total,))
+	outcomes = numpy.lib.format.open_memmap(os.path.join(directory, OUTCOMES_FILE), mode="w+", dtype=numpy.int8,
+	                                        shape=(total,))
+
+	# Positions are encoded into the chunk buffers, which are copied to the files once they are full.
+	chunkFeatures = numpy.zeros((chunk_size, PLANES, ROWS, COLUMNS), dtype=numpy.uint8)
+	chunkMoves = numpy.zeros(chunk_size, dtype=numpy.int16)
+	chunkOutcomes = numpy.zeros(chunk_size, dtype=numpy.int8)
+	written = 0
+	filled = 0
+
+	for number, line in enumerate(records, 1):
+		gameMoves, result = parse_game_record(line)
+		if result not in OUTCOMES:
+			continue
+
+		game = JanggiGame(lazy_game_state=True)
+		for fromSquare, toSquare in gameMoves:
+			player = game.get_turn()
+			encode_position(game, chunkFeatures[filled])
+			if not game.make_move(fromSquare, toSquare):
+				raise ValueError("record %d has an illegal move %s-%s" % (number, fromSquare, toSquare))
+			chunkMoves[filled] = encode_move(SQUARE_POSITIONS[fromSquare], SQUARE_POSITIONS[toSquare])
+			chunkOutcomes[filled] = OUTCOMES[result][player]
+			filled += 1
+
+			if filled == chunk_size:
+				features[written:written + filled] = chunkFeatures
+				moves[written:written + filled] = chunkMoves
+				outcomes[written:written + filled] = chunkOutcomes
+				written += filled
+				filled = 0
+				chunkFeatures[:] = 0
+
+	features[written:written + filled] = chunkFeatures[:filled]
+	moves[written:written + filled] = chunkMoves[:filled]
+	outcomes[written:written + filled] = chunkOutcomes[:filled]
+	written += filled
+
+	for array in (features, moves, outcomes):
+		array.flush()
+	return written
+
+
+def load_training_data(directory):
+	"""Takes the directory of the files written by export_training_data as parameter. Returns the feature
+	planes, the moves and the outcomes as read-only memory maps."""
+
+	return tuple(numpy.load(os.path.join(directory, name), mmap_mode="r")
+	             for name in (FEATURES_FILE, MOVES_FILE, OUTCOMES_FILE))
+
+
+def main(argv=None):
+	"""Exports the game records in a file as training data."""
+
+	parser = argparse.ArgumentParser(description="Export Janggi game records as training data.")
+	parser.add_argument("records", help="file of game records, one per line")
+	parser.add_argument("directory", help="directory of the .npy files")
+	parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="number of positions per chunk")
+	args = parser.parse_args(argv)
+
+	with open(args.records) as recordFile:
+		records = [line for line in recordFile if line.strip()]
+	print("Positions written:", export_training_data(records, args.directory, args.chunk_size))
+
+
+if __name__ == "__main__":
+	main()
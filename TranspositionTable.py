@@ -0,0 +1,161 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      A bounded-memory transposition table for searching Janggi positions.
+
+from array import array
+
+
+# Types of bounds that can be stored with a score. A bound of 0 marks an empty slot.
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+# Encoded value for the lack of a best move.
+NO_MOVE = 0xFFFF
+
+# Bytes taken by one entry: hash (8), score (4), best move (2), depth (1) and bound (1).
+ENTRY_SIZE = 16
+
+
+def encode_move(fromPosition, toPosition):
+	"""Takes the from and to position of a move as parameters and returns the move packed into one integer."""
+	return (fromPosition[0] * 9 + fromPosition[1]) * 90 + toPosition[0] * 9 + toPosition[1]
+
+
+def decode_move(move):
+	"""Takes a move packed by encode_move as parameter and returns the from and to position of the move.
+	Returns None if there is no move."""
+
+	if move == NO_MOVE:
+		return None
+	fromSquare, toSquare = divmod(move, 90)
+	return divmod(fromSquare, 9), divmod(toSquare, 9)
+
+
+class TranspositionTable:
+	"""A class that represent a transposition table of fixed size.
+	Each entry holds the hash, depth, score, bound type and best move of a searched position.
+	The entries are packed into preallocated arrays instead of a dictionary of objects."""
+
+	def __init__(self, size_mb=16, policy="two_tier"):
+		"""Instantiate the transposition table. Takes the size of the table in MB and the replacement policy
+		as parameters. The policy can be:
+			"depth":    keep the entry that was searched to the greater depth.
+			"always":   always replace the existing entry.
+			"two_tier": each bucket has one depth-preferred slot and one always-replace slot."""
+
+		if policy not in ("depth", "always", "two_tier"):
+			raise ValueError("Unknown replacement policy: " + str(policy))
+
+		# Number of slots in each bucket
+		self._policy = policy
+		self._bucket_size = 2 if policy == "two_tier" else 1
+
+		# The number of buckets is the largest power of two that fits into the size of the table.
+		buckets = max(1, size_mb * 1024 * 1024 // (ENTRY_SIZE * self._bucket_size))
+		self._buckets = 1 << (buckets.bit_length() - 1)
+		self._mask = self._buckets - 1
+		entries = self._buckets * self._bucket_size
+
+		# Preallocate all entries
+		self._hashes = array('Q', bytes(8 * entries))
+		self._scores = array('i', bytes(4 * entries))
+		self._moves = array('H', [NO_MOVE]) * entries
+		self._depths = array('b', bytes(entries))
+		self._bounds = array('B', bytes(entries))
+
+		self._stats = {}
+		self.reset_stats()
+
+	def get_entries(self):
+		"""Returns the number of entries that the table can hold."""
+		return len(self._hashes)
+
+	def get_size(self):
+		"""Returns the number of bytes used by the entries of the table."""
+		return self.get_entries() * ENTRY_SIZE
+
+	def get_policy(self):
+		"""Returns the replacement policy of the table."""
+		return self._policy
+
+	def get_stats(self):
+		"""Returns a dictionary with the number of probes, hits, collisions, stores and replacements.
+		A collision is a probe that finds its slots taken by other positions.
+		A replacement is a store that overwrites the entry of another position."""
+		return dict(self._stats)
+
+	def reset_stats(self):
+		"""Resets all the counters of the table. Returns None."""
+		self._stats = {"probes": 0, "hits": 0, "collisions": 0, "stores": 0, "replacements": 0}
+
+	def clear(self):
+		"""Removes all entries from the table. Returns None."""
+
+		entries = self.get_entries()
+		self._hashes = array('Q', bytes(8 * entries))
+		self._scores = array('i', bytes(4 * entries))
+		self._moves = array('H', [NO_MOVE]) * entries
+		self._depths = array('b', bytes(entries))
+		self._bounds = array('B', bytes(entries))
+
+	def probe(self, positionHash):
+		"""Takes the hash of a position as parameter.
+		Returns a tuple (depth, score, bound, best move) if the position is found. Returns None otherwise.
+		The best move is given as a pair of from and to position, or None."""
+
+		self._stats["probes"] += 1
+		start = (positionHash & self._mask) * self._bucket_size
+		occupied = False
+		for index in range(start, start + self._bucket_size):
+			if self._bounds[index] == 0:
+				continue
+			if self._hashes[index] == positionHash:
+				self._stats["hits"] += 1
+				return self._depths[index], self._scores[index], self._bounds[index], decode_move(self._moves[index])
+			occupied = True
+
+		if occupied:
+			self._stats["collisions"] += 1
+		return None
+
+	def store(self, positionHash, depth, score, bound, move=None):
+		"""Takes the hash of a position, the depth searched, the score, the type of bound and the best move
+		(a pair of from and to position, or None) as parameters and stores the entry according to
+		the replacement policy. Returns True if the entry has been stored and False otherwise."""
+
+		start = (positionHash & self._mask) * self._bucket_size
+		index = start
+
+		if self._policy == "two_tier":
+
+			# Update the entry of the same position wherever it is.
+			if self._bounds[start + 1] != 0 and self._hashes[start + 1] == positionHash:
+				index = start + 1
+
+			# Otherwise, take the depth-preferred slot if it is not searched deeper, or the always-replace slot.
+			elif not (self._bounds[start] == 0 or self._hashes[start] == positionHash or depth >= self._depths[start]):
+				index = start + 1
+
+		elif self._policy == "depth":
+			if self._bounds[start] != 0 and self._hashes[start] != positionHash and depth < self._depths[start]:
+				return False
+
+		# Keep the best move of the same position if no new move is given.
+		if move is not None:
+			packedMove = encode_move(*move)
+		elif self._bounds[index] != 0 and self._hashes[index] == positionHash:
+			packedMove = self._moves[index]
+		else:
+			packedMove = NO_MOVE
+
+		self._stats["stores"] += 1
+		if self._bounds[index] != 0 and self._hashes[index] != positionHash:
+			self._stats["replacements"] += 1
+
+		self._hashes[index] = positionHash
+		self._depths[index] = max(-128, min(127, depth))
+		self._scores[index] = score
+		self._bounds[index] = bound
+		self._moves[index] = packedMove
+		return True
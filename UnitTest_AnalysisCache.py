@@ -0,0 +1,112 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the analysis cache.
+
+import os
+import tempfile
+import unittest
+from AnalysisCache import *
+from JanggiGame import JanggiGame
+
+
+class TestAnalysisCache(unittest.TestCase):
+	"""Testing the AnalysisCache class"""
+
+	def setUp(self):
+		"""Create a temporary directory for the cache files."""
+		self._directory = tempfile.TemporaryDirectory()
+		self._path = os.path.join(self._directory.name, "analysis.cache")
+
+	def tearDown(self):
+		"""Remove the temporary directory."""
+		self._directory.cleanup()
+
+	def test_init(self):
+		"""Testing the instantiation of the cache."""
+
+		with AnalysisCache(self._path, 1000) as cache:
+			self.assertEqual(cache.get_capacity(), 1000)
+		self.assertEqual(os.path.getsize(self._path), HEADER.size + 1000 * RECORD.size)
+
+		# An existing file keeps its own capacity.
+		with AnalysisCache(self._path, 5) as cache:
+			self.assertEqual(cache.get_capacity(), 1000)
+
+		with self.assertRaises(ValueError):
+			AnalysisCache(os.path.join(self._directory.name, "empty.cache"), 0)
+
+		with self.assertRaises(FileNotFoundError):
+			AnalysisCache(os.path.join(self._directory.name, "missing.cache"), readonly=True)
+
+		with open(self._path, "r+b") as cacheFile:
+			cacheFile.write(b"XXXX")
+		with self.assertRaises(ValueError):
+			AnalysisCache(self._path)
+
+	def test_lookup_store(self):
+		"""Testing the lookup and store method, and reading the cache again after it is closed."""
+
+		with AnalysisCache(self._path, 16) as cache:
+			self.assertIsNone(cache.lookup(42))
+			self.assertTrue(cache.store(42, ((6, 0), (5, 0)), -35, 4, False, False))
+			self.assertTrue(cache.store(42 + 16, None, 0, STATUS_ONLY, True, True))
+
+			# A shallower search does not replace a deeper one.
+			self.assertFalse(cache.store(42, ((6, 2), (5, 2)), 10, 3, False, False))
+
+		with AnalysisCache(self._path, readonly=True) as cache:
+			self.assertEqual(cache.lookup(42), {"move": ((6, 0), (5, 0)), "score": -35, "depth": 4,
+			                                    "in_check": False, "checkmate": False})
+			self.assertEqual(cache.lookup(42 + 16)["checkmate"], True)
+			self.assertIsNone(cache.lookup(43))
+			with self.assertRaises(PermissionError):
+				cache.store(43, None, 0, 0, False, False)
+
+	def test_replacement(self):
+		"""Testing that the shallowest record is replaced once all probed records are taken."""
+
+		with AnalysisCache(self._path, MAX_PROBES) as cache:
+			for i in range(MAX_PROBES):
+				self.assertTrue(cache.store(i, None, i, 10 - i, False, False))
+			self.assertTrue(cache.store(100, None, 100, 5, False, False))
+			self.assertIsNone(cache.lookup(MAX_PROBES - 1))
+			self.assertEqual(cache.lookup(100)["score"], 100)
+			self.assertEqual(cache.lookup(0)["score"], 0)
+
+	def test_torn_record(self):
+		"""Testing that a record whose checksum does not match, such as one torn by two writers, is treated
+		as missing and can be written again."""
+
+		with AnalysisCache(self._path, 16) as cache:
+			self.assertTrue(cache.store(42, ((6, 0), (5, 0)), -35, 4, False, False))
+			self.assertTrue(cache.store(43, ((6, 2), (5, 2)), 12, 4, False, False))
+
+		# Overwrite the score of the first record only, as a concurrent writer could.
+		offset = HEADER.size + (42 % 16) * RECORD.size
+		with open(self._path, "r+b") as cacheFile:
+			cacheFile.seek(offset + 10)
+			cacheFile.write(b"\x07\x00\x00\x00")
+
+		with AnalysisCache(self._path) as cache:
+			self.assertIsNone(cache.lookup(42))
+			self.assertEqual(cache.lookup(43)["score"], 12)
+			self.assertTrue(cache.store(42, ((6, 0), (5, 0)), 7, 1, False, False))
+			self.assertEqual(cache.lookup(42)["score"], 7)
+
+	def test_get_status(self):
+		"""Testing the get_status method."""
+
+		game = JanggiGame()
+		with AnalysisCache(self._path, 1024) as cache:
+			self.assertEqual(cache.get_status(game), (False, False))
+			self.assertIsNotNone(cache.lookup(game.get_position_hash()))
+
+		# Stored status is read back without evaluating the game.
+		with AnalysisCache(self._path, readonly=True) as cache:
+			record = cache.lookup(game.get_position_hash())
+			self.assertEqual((record["move"], record["score"], record["depth"]), (None, None, STATUS_ONLY))
+			self.assertEqual(cache.get_status(game), (False, False))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,63 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the position analysis tool.
+
+import io
+import unittest
+from AnalyzePositions import *
+from JanggiGame import JanggiGame
+from UnitTest_JanggiEngine import MATE_IN_ONE
+
+
+class TestAnalyzePositions(unittest.TestCase):
+	"""Testing the position formats and the analysis of positions"""
+
+	def setUp(self):
+		"""Positions at the start of the game, before and after the mating move, and an invalid one."""
+
+		game = JanggiGame()
+		self._start = game.get_position_text()
+		game.apply_moves(MATE_IN_ONE)
+		self._before_mate = game.get_position_text()
+		game.make_move("B8", "F8")
+		self._mate = game.get_position_text()
+		self._records = [(1, self._start), (2, self._before_mate), (4, self._mate), (5, "9/9 b")]
+
+	def test_binary_records(self):
+		"""Testing that binary records hold the same positions as the text notation."""
+
+		game = JanggiGame()
+		game.apply_moves(MATE_IN_ONE)
+		data = pack_position(game)
+		self.assertEqual(len(data), RECORD_SIZE)
+
+		other = JanggiGame()
+		other.set_position(*unpack_position(data))
+		self.assertEqual(other.get_position_text(), game.get_position_text())
+
+		records = list(read_binary_records(io.BytesIO(data + pack_position(JanggiGame()) + data[:3])))
+		self.assertEqual([number for number, _ in records], [1, 2, 3])
+		with self.assertRaises(InvalidPositionError):
+			unpack_position(records[2][1])
+
+	def test_analyze_records(self):
+		"""Testing the analysis of positions in this process and in worker processes."""
+
+		lines = list(analyze_records(self._records, processes=0))
+		self.assertEqual(lines, ["1\tBLUE\t0\t0\t0\t31\n", "2\tBLUE\t0\t0\t0\t42\n", "4\tRED\t0\t1\t1\t0\n",
+		                         "5\tINVALID\n"])
+
+		# Worker processes write the same lines in the same order, however small the batches.
+		self.assertEqual(list(analyze_records(self._records, processes=2, batch_size=1, in_flight=2)), lines)
+
+		# A search adds the score of the player to move.
+		lines = list(analyze_records(self._records[1:2], depth=1, processes=0))
+		self.assertEqual(len(lines[0].split("\t")), 7)
+
+		lines = list(analyze_records(read_text_records(io.StringIO(self._start + "\n\n" + self._mate + "\n")),
+		                             processes=0))
+		self.assertEqual([line.split("\t")[0] for line in lines], ["1", "3"])
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,63 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the batch evaluation of positions. Skipped if NumPy is not installed.
+
+import unittest
+from JanggiGame import JanggiGame
+from UnitTest_JanggiEngine import MATE_IN_ONE
+
+try:
+	import numpy
+	from BatchEvaluation import *
+except ImportError:
+	numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestBatchEvaluation(unittest.TestCase):
+	"""Testing the evaluation of a batch of positions"""
+
+	def setUp(self):
+		"""A batch of the starting position, the position before the mate, and a Chariot in an open position."""
+
+		self._games = [JanggiGame(), JanggiGame(), JanggiGame()]
+		self._games[1].apply_moves(MATE_IN_ONE)
+		self._games[2].set_position({(8, 4): ("BLUE", "General"), (1, 4): ("RED", "General"),
+		                             (5, 0): ("BLUE", "Chariot"), (0, 3): ("RED", "Guard")})
+		self._boards = pack_boards(self._games)
+
+	def test_pack_boards(self):
+		"""Testing the piece codes of a packed batch."""
+
+		self.assertEqual(self._boards.shape, (3, 10, 9))
+		self.assertEqual(self._boards.dtype, numpy.int8)
+		self.assertEqual(self._boards[0, 8, 4], PIECE_CODES["General"])
+		self.assertEqual(self._boards[0, 0, 0], -PIECE_CODES["Chariot"])
+		self.assertEqual(int((self._boards[0] != 0).sum()), 32)
+
+	def test_evaluate_batch(self):
+		"""Testing that each part of the evaluation matches the evaluation of each game."""
+
+		evaluation = evaluate_batch(self._boards)
+		for k, game in enumerate(self._games):
+			self.assertEqual(evaluation["material"][k] + evaluation["piece_square"][k], game.compute_evaluation())
+		self.assertEqual((evaluation["material"][0], evaluation["material"][2]), (0, 1000))
+
+		# The starting position is symmetric.
+		self.assertEqual(evaluation["palace_safety"][0], 0)
+		self.assertEqual(evaluation["mobility"][0], 0)
+
+		# The Chariot can move to 5 empty positions up, 4 down and 8 to the side; the Red Guard is in its palace.
+		self.assertEqual(evaluation["mobility"][2], 17 * MOBILITY_WEIGHT)
+		self.assertEqual(evaluation["palace_safety"][2], -GUARD_BONUS)
+		self.assertEqual(evaluation["total"][2], sum(evaluation[part][2] for part in
+		                                             ("material", "piece_square", "palace_safety", "mobility")))
+
+		with self.assertRaises(ValueError):
+			evaluate_batch(numpy.zeros((2, 9, 10), dtype=numpy.int8))
+		with self.assertRaises(ValueError):
+			evaluate_batch(numpy.full((1, 10, 9), 8, dtype=numpy.int8))
+
+
+if __name__ == "__main__":
+	unittest.main()
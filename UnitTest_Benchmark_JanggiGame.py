@@ -0,0 +1,69 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the benchmarks of the Janggi rules and their regression gate.
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from Benchmark_JanggiGame import *
+
+
+class TestBenchmark(unittest.TestCase):
+	"""Testing the benchmarks and the comparison against a baseline"""
+
+	def setUp(self):
+		"""Create a temporary directory for the baseline file."""
+		self._directory = tempfile.TemporaryDirectory()
+		self._path = os.path.join(self._directory.name, "baseline.json")
+
+	def tearDown(self):
+		"""Remove the temporary directory."""
+		self._directory.cleanup()
+
+	def test_compare(self):
+		"""Testing that only the benchmarks slower than the baseline by more than the threshold are reported."""
+
+		baseline = {"is_in_check.quiet": 2e-6, "make_move.game1": 1e-3, "print_board": 5e-5}
+		results = {"is_in_check.quiet": 3e-6, "make_move.game1": 1.1e-3, "print_board": 4e-5, "JanggiGame": 1.0}
+
+		self.assertEqual(compare(results, baseline), [("is_in_check.quiet", 2e-6, 3e-6, 1.5)])
+		self.assertEqual(compare(results, baseline, threshold=0.05),
+		                 [("is_in_check.quiet", 2e-6, 3e-6, 1.5), ("make_move.game1", 1e-3, 1.1e-3, 1.1)])
+		self.assertEqual(compare(results, baseline, threshold=0.6), [])
+		self.assertEqual(compare(results, {}), [])
+
+	def test_baseline(self):
+		"""Testing that a saved baseline is loaded back with the same results."""
+
+		results = {"General.legal_moves": 1.25e-6, "make_move.game2": 3.5e-3}
+		save_baseline(results, self._path)
+		self.assertEqual(load_baseline(self._path), results)
+
+	def test_main(self):
+		"""Testing that main stores a baseline, and returns 1 only if a benchmark has regressed past the threshold."""
+
+		output = io.StringIO()
+		with mock.patch("Benchmark_JanggiGame.run_benchmarks", return_value={"print_board": 1e-5}), \
+				contextlib.redirect_stdout(output):
+			self.assertEqual(main(["--baseline", self._path, "--save"]), 0)
+		self.assertEqual(load_baseline(self._path), {"print_board": 1e-5})
+
+		with mock.patch("Benchmark_JanggiGame.run_benchmarks", return_value={"print_board": 1.5e-5}), \
+				contextlib.redirect_stdout(output):
+			self.assertEqual(main(["--baseline", self._path]), 1)
+			self.assertEqual(main(["--baseline", self._path, "--threshold", "0.6"]), 0)
+		self.assertIn("REGRESSION print_board", output.getvalue())
+
+	def test_run_benchmarks(self):
+		"""Testing that the named benchmarks are run and timed."""
+
+		results = run_benchmarks(["JanggiGame", "is_checkmate.mate"], repeat=1, duration=0.001)
+		self.assertEqual(sorted(results), ["JanggiGame", "is_checkmate.mate"])
+		self.assertTrue(all(time > 0 for time in results.values()))
+
+
+if __name__ == "__main__":
+	unittest.main()
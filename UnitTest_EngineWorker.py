@@ -0,0 +1,62 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the engine worker thread.
+
+import queue
+import unittest
+from EngineWorker import *
+from JanggiGame import JanggiGame
+from UnitTest_JanggiEngine import MATE_IN_ONE
+
+
+class TestEngineWorker(unittest.TestCase):
+	"""Testing the EngineWorker class"""
+
+	def setUp(self):
+		"""Start a worker that posts its callbacks to a queue, which stands in for the Tk mainloop."""
+		self._posted = queue.Queue()
+		self._worker = EngineWorker(self._posted.put, depth=2)
+
+	def tearDown(self):
+		"""Stop the worker thread."""
+		self._worker.close()
+
+	def run_posted(self):
+		"""Runs the next callback posted by the worker."""
+		self._posted.get(timeout=30)()
+
+	def test_jobs(self):
+		"""Testing that searches, legal moves and game status are called back with their results."""
+
+		game = JanggiGame(lazy_game_state=True)
+		game.apply_moves(MATE_IN_ONE)
+		results = []
+		self._worker.submit_search(game, results.append)
+		self._worker.submit_legal_moves(game, (6, 0), results.append)
+		self._worker.submit_status(game, results.append)
+		for _ in range(3):
+			self.run_posted()
+
+		self.assertEqual(results[0][0], ("B8", "F8"))
+		self.assertEqual(sorted(results[1]), [(5, 0), (6, 1)])
+		self.assertEqual(results[2], ("UNFINISHED", False))
+
+		# The game played by the user interface has not been touched.
+		self.assertTrue(game.make_move("B8", "F8"))
+		self._worker.submit_status(game, results.append)
+		self.run_posted()
+		self.assertEqual(results[3], ("BLUE_WON", True))
+
+	def test_cancel(self):
+		"""Testing that cancelled jobs never call back, and a running search is stopped."""
+
+		results = []
+		self._worker.submit_search(JanggiGame(), results.append, depth=20)
+		self._worker.cancel()
+		self._worker.submit_status(JanggiGame(), results.append)
+		self.run_posted()
+		self.assertEqual(results, [("UNFINISHED", False)])
+
+
+if __name__ == "__main__":
+	unittest.main()
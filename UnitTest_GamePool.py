@@ -0,0 +1,46 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the pool of reusable games.
+
+import unittest
+from GamePool import *
+
+
+class TestGamePool(unittest.TestCase):
+	"""Testing the GamePool class"""
+
+	def test_acquire_release(self):
+		"""Testing that released games are reset and reused, up to the size of the pool."""
+
+		pool = GamePool(size=1, lazy_game_state=True)
+		game = pool.acquire()
+		self.assertTrue(game.make_move("A7", "A6"))
+		pool.release(game)
+		self.assertEqual(len(pool), 1)
+
+		# Games from elsewhere, which may have other options, and games already released are refused.
+		with self.assertRaises(ValueError):
+			pool.release(JanggiGame())
+		with self.assertRaises(ValueError):
+			pool.release(game)
+
+		reused = pool.acquire(red_arrangement="HEHE")
+		self.assertIs(reused, game)
+		self.assertEqual(reused.get_turn(), "BLUE")
+		self.assertEqual(reused.get_position_text(), JanggiGame(red_arrangement="HEHE").get_position_text())
+		self.assertEqual(reused.get_game_state(), "UNFINISHED")
+		self.assertEqual(pool.get_stats(), {"created": 1, "reused": 1})
+
+	def test_game(self):
+		"""Testing that a game acquired for a with block is released at its end."""
+
+		pool = GamePool()
+		with pool.game() as game:
+			self.assertEqual(len(pool), 0)
+		self.assertEqual(len(pool), 1)
+		with pool.game() as other:
+			self.assertIs(other, game)
+
+
+if __name__ == "__main__":
+	unittest.main()
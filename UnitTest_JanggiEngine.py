@@ -0,0 +1,205 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the Janggi engine.
+
+import threading
+import time
+import unittest
+from JanggiEngine import *
+from JanggiGame import JanggiGame, POSITION_SQUARES
+
+
+# Moves of a game after which Blue checkmates Red by moving the Cannon from B8 to F8.
+MATE_IN_ONE = [("I7", "I6"), ("I4", "H4"), ("D10", "D9"), ("I1", "I6"), ("I10", "I6"), ("B1", "D4"),
+               ("D9", "D8"), ("H1", "I3"), ("I6", "G6"), ("E2", "F3"), ("H10", "I8"), ("D4", "B1"),
+               ("E7", "F7"), ("A1", "A2"), ("G6", "G4"), ("H3", "H5"), ("G4", "E4"), ("H5", "H2")]
+
+
+def move_pieces(game, moves):
+	"""Takes a game and a list of pairs of from and to position as parameters.
+	Moves the game pieces directly on the board and recomputes the hash and the evaluation. Returns None."""
+
+	for fromPosition, toPosition in moves:
+		game._board[toPosition] = game._board[fromPosition]
+		game._board[fromPosition] = None
+	game._hash = game.compute_hash()
+	game._evaluation = game.compute_evaluation()
+
+
+class TestJanggiEngine(unittest.TestCase):
+	"""Testing the JanggiEngine class"""
+
+	def test_search(self):
+		"""Testing that the search leaves the game unchanged and returns a legal move."""
+
+		game = JanggiGame()
+		engine = JanggiEngine(game, table_size_mb=1)
+		positionHash = game.get_position_hash()
+
+		move, score = engine.search(2)
+		self.assertEqual(game.get_position_hash(), positionHash)
+		self.assertEqual(game.evaluate(), 0)
+		self.assertTrue(game.is_legal_move(*move))
+		self.assertGreater(engine.get_stats()["nodes"], 0)
+		self.assertGreater(engine.get_table().get_stats()["stores"], 0)
+
+		fromSquare, toSquare = engine.choose_move(2)
+		self.assertTrue(game.make_move(fromSquare, toSquare))
+
+		# A search stopped before its first move has no move to choose.
+		stopEvent = threading.Event()
+		stopEvent.set()
+		self.assertIsNone(engine.choose_move(2, stop_event=stopEvent))
+
+	def test_checkmate(self):
+		"""Testing that the search finds a checkmate in one move."""
+
+		game = JanggiGame()
+		self.assertEqual(game.apply_moves(MATE_IN_ONE), len(MATE_IN_ONE))
+
+		engine = JanggiEngine(game, table_size_mb=1)
+		move, score = engine.search(1)
+		self.assertEqual(move, ((7, 1), (7, 5)))
+		self.assertEqual(score, MATE_SCORE - 1)
+
+		# A position where the opponent has been left in check is scored as won.
+		game = JanggiGame()
+		move_pieces(game, [((7, 1), (4, 4))])
+		self.assertEqual(JanggiEngine(game, table_size_mb=1).search(2)[1], MATE_SCORE)
+		self.assertEqual(game.get_players()["RED"][0].get_name(), "General")
+
+	def test_quiescence(self):
+		"""Testing that the quiescence search sees the recapture of a defended game piece."""
+
+		# Blue Chariot 1 at (4, 4) can take the Red Soldier at (3, 4), which is defended by Red Chariot 1.
+		game = JanggiGame()
+		move_pieces(game, [((9, 0), (4, 4)), ((0, 0), (2, 4))])
+
+		engine = JanggiEngine(game, table_size_mb=1, quiescence=False)
+		self.assertEqual(engine.search(1)[0], ((4, 4), (3, 4)))
+		self.assertEqual(engine.get_stats()["quiescence_nodes"], 0)
+
+		engine = JanggiEngine(game, table_size_mb=1)
+		move, score = engine.search(1)
+		self.assertNotEqual(move, ((4, 4), (3, 4)))
+		self.assertLess(score, 100)
+		self.assertGreater(engine.get_stats()["quiescence_nodes"], 0)
+		self.assertEqual(game.compute_evaluation(), game._evaluation)
+
+
+	def test_selective_search(self):
+		"""Testing null-move pruning, late move reductions, principal variation search and aspiration windows."""
+
+		game = JanggiGame()
+		game.apply_moves([("C7", "C6"), ("C4", "C5")])
+
+		plain = JanggiEngine(game, table_size_mb=1, null_move=False, late_move_reductions=False,
+		                     principal_variation=False, aspiration_window=None)
+		plainMove, plainScore = plain.search(3)
+
+		engine = JanggiEngine(game, table_size_mb=1)
+		move, score = engine.search(3)
+		self.assertEqual(move, plainMove)
+		self.assertEqual(score, plainScore)
+
+		stats = engine.get_stats()
+		self.assertGreater(stats["late_move_reductions"], 0)
+		self.assertLess(stats["nodes"] + stats["quiescence_nodes"],
+		                plain.get_stats()["nodes"] + plain.get_stats()["quiescence_nodes"])
+
+		# Nodes saved by each technique
+		savings = engine.measure_savings(3)
+		self.assertEqual(set(savings), set(SELECTIVE_TECHNIQUES))
+		self.assertGreater(savings["late_move_reductions"], 0)
+		savings = JanggiEngine(game, table_size_mb=1, null_move=False).measure_savings(2)
+		self.assertNotIn("null_move", savings)
+
+		# The checkmate is still found.
+		game = JanggiGame()
+		game.apply_moves(MATE_IN_ONE)
+		self.assertEqual(JanggiEngine(game, table_size_mb=1).search(3), (((7, 1), (7, 5)), MATE_SCORE - 1))
+
+
+	def test_stop(self):
+		"""Testing that a search stops once its stop event is set, and leaves the game as it was."""
+
+		game = JanggiGame()
+		positionHash = game.get_position_hash()
+		engine = JanggiEngine(game)
+
+		stopEvent = threading.Event()
+		stopEvent.set()
+		self.assertEqual(engine.search(3, stop_event=stopEvent), (None, 0))
+
+		# A search stopped during a deep iteration returns the move of the last completed iteration.
+		stopEvent = threading.Event()
+		threading.Timer(0.2, stopEvent.set).start()
+		start = time.time()
+		move, score = engine.search(20, stop_event=stopEvent)
+		self.assertLess(time.time() - start, 5)
+		self.assertIsNotNone(move)
+		self.assertEqual(game.get_position_hash(), positionHash)
+		self.assertEqual(game._evaluation, game.compute_evaluation())
+
+		engine.set_game(JanggiGame())
+		self.assertIsNotNone(engine.search(1)[0])
+
+	def test_ponder(self):
+		"""Testing that pondering returns the pondered result when the opponent plays the predicted move,
+		and searches again otherwise."""
+
+		game = JanggiGame()
+		engine = JanggiEngine(game)
+		ponderer = Ponderer(engine, 3)
+		move, _ = ponderer.get_move(game)
+		self.assertTrue(game.make_move(POSITION_SQUARES[move[0]], POSITION_SQUARES[move[1]]))
+		self.assertEqual(ponderer.get_stats(), {"hits": 0, "misses": 1})
+
+		positionHash = game.get_position_hash()
+		ponderer.start(game)
+		self.assertEqual(game.get_position_hash(), positionHash)
+		prediction = ponderer.get_prediction()
+		self.assertIsNotNone(prediction)
+		self.assertTrue(game.make_move(*prediction))
+		move, score = ponderer.get_move(game)
+		self.assertFalse(ponderer.is_pondering())
+		self.assertEqual(ponderer.get_stats(), {"hits": 1, "misses": 1})
+		self.assertEqual(engine.get_game(), game)
+		self.assertTrue(game.is_legal_move(*move))
+
+		# The opponent plays another move, so the game is searched again.
+		self.assertTrue(game.make_move(POSITION_SQUARES[move[0]], POSITION_SQUARES[move[1]]))
+		ponderer.start(game)
+		fromSquare, toSquare = next((POSITION_SQUARES[fromPosition], POSITION_SQUARES[toPosition])
+		                            for fromPosition, toPosition in game.generate_moves(game.get_turn())
+		                            if (POSITION_SQUARES[fromPosition], POSITION_SQUARES[toPosition]) != ponderer.get_prediction()
+		                            and game.is_legal_move(fromPosition, toPosition))
+		self.assertTrue(game.make_move(fromSquare, toSquare))
+		move, score = ponderer.get_move(game)
+		self.assertEqual(ponderer.get_stats(), {"hits": 1, "misses": 2})
+		self.assertTrue(game.is_legal_move(*move))
+
+		ponderer.start(game)
+		ponderer.stop()
+		self.assertFalse(ponderer.is_pondering())
+
+	def test_ponder_move_time(self):
+		"""Testing that a pondering search that has not finished when the opponent plays the predicted move
+		is stopped after the move time, and its deepest completed iteration is used without a new search."""
+
+		game = JanggiGame()
+		engine = JanggiEngine(game)
+		move, _ = engine.search(3)
+		self.assertTrue(game.make_move(POSITION_SQUARES[move[0]], POSITION_SQUARES[move[1]]))
+
+		ponderer = Ponderer(engine, 50, time_limit=None, move_time=0.5)
+		ponderer.start(game)
+		self.assertTrue(game.make_move(*ponderer.get_prediction()))
+		start = time.perf_counter()
+		move, _ = ponderer.get_move(game)
+		self.assertLess(time.perf_counter() - start, 10)
+		self.assertEqual(ponderer.get_stats(), {"hits": 1, "misses": 0})
+		self.assertTrue(game.is_legal_move(*move))
+
+if __name__ == "__main__":
+	unittest.main()
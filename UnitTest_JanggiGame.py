@@ -2,6 +2,8 @@
 # Date:             03/09/2021
 # Description:      Unit tests for the Janggi class and for all game pieces.
 
+import contextlib
+import io
 import unittest
 from JanggiGame import *
 
@@ -60,6 +62,111 @@ class TestJanggiGame(unittest.TestCase):
 		self.assertEqual(test_blue_player, correct_player)
 		self.assertEqual(test_red_player, correct_player)
 
+	def test_reset(self):
+		"""Testing the reset method and the arrangements of the Horses and Elephants."""
+
+		game = JanggiGame()
+		gamePieces = {player: list(game.get_players()[player]) for player in game.get_players()}
+		game.apply_moves([("I7", "I6"), ("I4", "H4"), ("D10", "D9"), ("I1", "I6"), ("I10", "I6")])
+		game.reset()
+		self.assertEqual(game.get_position_text(), JanggiGame().get_position_text())
+		self.assertEqual(game.get_players(), gamePieces)
+		self.assertEqual(game._hash, game.compute_hash())
+		self.assertEqual(game._evaluation, game.compute_evaluation())
+		self.assertTrue(game.make_move("A7", "A6"))
+
+		game.reset("HEEH", "EHHE")
+		self.assertEqual(game.get_position_text(), "reha1aher/4k4/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/4K4/RHEA1AEHR b")
+		self.assertEqual(game._hash, game.compute_hash())
+		self.assertEqual(game._evaluation, game.compute_evaluation())
+		self.assertEqual(game.get_board()[(9, 7)].get_name(), "Horse")
+		self.assertEqual(game.get_board()[(9, 7)].get_identifier(), 1)
+		self.assertEqual(game.get_board()[(9, 7)].get_starting_position(), (9, 7))
+		self.assertEqual(game.get_board()[(9, 1)].get_starting_position(), (9, 1))
+		self.assertEqual(game.get_arrangements(), ("HEEH", "EHHE"))
+		self.assertEqual(JanggiGame(blue_arrangement="HEEH", red_arrangement="EHHE").get_position_text(),
+		                 game.get_position_text())
+
+		with self.assertRaises(ValueError):
+			game.reset("HHEE")
+
+	def test_set_position(self):
+		"""Testing the set_position method."""
+
+		game = JanggiGame()
+		game.set_position({(8, 4): ("BLUE", "General"), (1, 4): ("RED", "General"), (0, 3): ("RED", "Guard"),
+		                   (5, 0): ("BLUE", "Chariot"), (5, 8): ("BLUE", "Chariot")}, "RED")
+		self.assertEqual(game.get_turn(), "RED")
+		self.assertEqual([gamePiece.get_name() for gamePiece in game.get_players()["BLUE"]],
+		                 ["General", "Chariot", "Chariot"])
+		self.assertEqual([gamePiece.get_identifier() for gamePiece in game.get_players()["BLUE"]], [0, 0, 1])
+		self.assertEqual([gamePiece.get_name() for gamePiece in game.get_players()["RED"]], ["General", "Guard"])
+		self.assertEqual(sum(1 for gamePiece in game.get_board().values() if gamePiece is not None), 5)
+		self.assertEqual(game._hash, game.compute_hash())
+		self.assertEqual(game._evaluation, game.compute_evaluation())
+		self.assertTrue(game.make_move("E2", "E3"))
+		self.assertTrue(game.make_move("A6", "A3"))
+
+		with self.assertRaises(InvalidPositionError):
+			game.set_position({(8, 4): ("BLUE", "General")})
+		with self.assertRaises(InvalidPositionError):
+			game.set_position({(8, 4): ("BLUE", "General"), (1, 4): ("RED", "General"), (10, 0): ("RED", "Soldier")})
+
+	def test_snapshot(self):
+		"""Testing the get_snapshot and restore_snapshot methods."""
+
+		game = JanggiGame(repetition_limit=3)
+		game.apply_moves([("A10", "A9"), ("A1", "A2"), ("A9", "A10"), ("A2", "A1")])
+		snapshot = game.get_snapshot()
+
+		restored = JanggiGame(repetition_limit=3)
+		restored.restore_snapshot(snapshot)
+		self.assertEqual(restored.get_snapshot(), snapshot)
+		self.assertEqual(restored.get_position_hash(), game.get_position_hash())
+		for restoredGame in (game, restored):
+			restoredGame.apply_moves([("A10", "A9"), ("A1", "A2"), ("A9", "A10"), ("A2", "A1")])
+			self.assertEqual(restoredGame.get_game_state(), "DRAW")
+
+	def test_position_text(self):
+		"""Testing the get_position_text and set_position_text methods."""
+
+		game = JanggiGame()
+		self.assertEqual(game.get_position_text(), "reha1aehr/4k4/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/4K4/REHA1AEHR b")
+
+		game.set_position_text("3a5/4k4/9/9/9/R7R/9/9/4K4/9 r")
+		self.assertEqual(game.get_turn(), "RED")
+		self.assertEqual(game.get_board()[(0, 3)].get_name(), "Guard")
+		self.assertEqual(game.get_board()[(5, 8)].get_player(), "BLUE")
+		self.assertEqual(game.get_position_text(), "3a5/4k4/9/9/9/R7R/9/9/4K4/9 r")
+
+		for text in ("4k4/9/9/9/9/9/9/9/4K4/9", "4k4/9/9/9/9/9/9/9/4K4/9 x", "4k4/9/9/9/9/9/9/9/4K4 b",
+		             "4k5/9/9/9/9/9/9/9/4K4/9 b", "4k4/9/9/9/9/9/9/9/4X4/9 b", "9/9/9/9/9/9/9/9/4K4/9 b"):
+			with self.assertRaises(InvalidPositionError):
+				game.set_position_text(text)
+
+	def test_render_board(self):
+		"""Testing the render_board method, and that print_board prints the same frame."""
+
+		game = JanggiGame()
+		frame = game.render_board()
+		self.assertEqual(frame.count("\n"), 36)
+		self.assertIn(PIECE_CELLS[("BLUE", "General")], frame)
+		self.assertTrue(frame.endswith("It is now BLUE's turn!\n\n\n"))
+		self.assertEqual(game.render_cell((0, 0)), PIECE_CELLS[("RED", "Chariot")])
+		self.assertEqual(game.render_cell((1, 0)), EMPTY_CELLS[(1, 0)])
+
+		output = io.StringIO()
+		with contextlib.redirect_stdout(output):
+			game.print_board()
+		self.assertEqual(output.getvalue(), frame)
+
+		# print_name prints the same cell as the board.
+		output = io.StringIO()
+		with contextlib.redirect_stdout(output):
+			cell = game.get_board()[(0, 0)].print_name()
+		self.assertEqual(cell, PIECE_CELLS[("RED", "Chariot")])
+		self.assertEqual(output.getvalue(), cell)
+
 	def test_get_rows(self):
 		"""Testing the get_rows method"""
 
@@ -165,6 +272,58 @@ class TestJanggiGame(unittest.TestCase):
 		after_attempt = (game.get_board(), set(game.get_players()))
 		self.assertEqual(before_attempt, after_attempt)
 
+	def test_is_legal_move(self):
+		"""Testing the is_legal_move method."""
+
+		game = JanggiGame()
+
+		# The geometry check of every game piece must agree with its legal moves.
+		for position, gamePiece in game.get_board().items():
+			if gamePiece is None:
+				continue
+			legalMoves = gamePiece.legal_moves(game.get_board(), position)
+			for target in game.get_board():
+				self.assertEqual(gamePiece.is_legal_move(game.get_board(), position, target), target in legalMoves)
+
+		# Empty squares and off-board squares
+		self.assertFalse(game.is_legal_move((4, 4), (5, 4)))
+		self.assertFalse(game.is_legal_move((6, 0), (6, -1)))
+
+		# Passing, blocked and unblocked moves
+		self.assertTrue(game.is_legal_move((8, 4), (8, 4)))
+		self.assertTrue(game.is_legal_move((9, 2), (7, 3)))
+		self.assertFalse(game.is_legal_move((9, 1), (7, 4)))
+		self.assertFalse(game.is_legal_move((7, 1), (4, 1)))
+
+		# Moving Blue Chariot 2 to H2 puts Red in check, so Red can neither pass nor stay in check.
+		game._board[(1, 7)] = game._board[(9, 8)]
+		game._board[(9, 8)] = None
+		self.assertFalse(game.is_legal_move((1, 4), (1, 4)))
+		self.assertFalse(game.is_legal_move((1, 4), (1, 3)))
+		self.assertTrue(game.is_legal_move((1, 4), (0, 4)))
+		self.assertEqual(game.get_board()[(1, 4)].get_name(), "General")
+
+	def test_generate_moves(self):
+		"""Testing the generate_moves and generate_captures method."""
+
+		game = JanggiGame()
+		for player in ["BLUE", "RED"]:
+			moves = game.generate_moves(player)
+			self.assertEqual(len(moves), len(set(moves)))
+			for fromPosition, toPosition in moves:
+				self.assertNotEqual(fromPosition, toPosition)
+				self.assertEqual(game.get_board()[fromPosition].get_player(), player)
+				self.assertIn(toPosition, game.get_board()[fromPosition].legal_moves(game.get_board(), fromPosition))
+			self.assertEqual(game.generate_captures(player), [])
+
+		# Move Blue Cannon 1 to (4, 4) and Blue Horse 2 to (2, 5)
+		game._board[(4, 4)] = game._board[(7, 1)]
+		game._board[(7, 1)] = None
+		game._board[(2, 5)] = game._board[(9, 7)]
+		game._board[(9, 7)] = None
+		self.assertEqual(set(game.generate_captures("BLUE")), {((4, 4), (1, 4)), ((2, 5), (0, 6))})
+		self.assertEqual(set(game.generate_captures("RED")), {((3, 4), (4, 4)), ((1, 4), (2, 5))})
+
 	def test_is_in_check(self):
 		"""Testing the is_in_check method."""
 
@@ -293,6 +452,191 @@ class TestJanggiGame(unittest.TestCase):
 		self.assertEqual(game.get_game_state(), "BLUE_WON")
 
 
+	def test_apply_moves(self):
+		"""Testing the apply_moves method."""
+
+		moves = [("A7", "B7"), ("a4", "a5"), ("B7", "B6"), ("A1", "A4"), ("C7", "D7"), ("A4", "A4")]
+
+		# Replaying the moves must give the same game as making them one at a time.
+		for trusted in [False, True]:
+			game = JanggiGame()
+			expected = JanggiGame()
+			for fromSquare, toSquare in moves:
+				self.assertTrue(expected.make_move(fromSquare, toSquare))
+
+			self.assertEqual(game.apply_moves(moves, trusted), len(moves))
+			self.assertEqual(game.get_turn(), expected.get_turn())
+			self.assertEqual(game.get_game_state(), "UNFINISHED")
+			for position in game.get_board():
+				self.assertIs(type(game.get_board()[position]), type(expected.get_board()[position]))
+
+		# An untrusted replay stops at the first illegal move.
+		game = JanggiGame()
+		self.assertEqual(game.apply_moves([("A7", "B7"), ("B3", "B6"), ("A4", "A5")]), 1)
+		self.assertEqual(game.get_turn(), "RED")
+		self.assertEqual(game.apply_moves([("A4", "A5"), ("A7", "J7")]), 1)
+
+		# The game ends once the opponent has been checkmated.
+		for trusted, moves in [(False, [("D2", "F3"), ("E2", "E1")]), (True, [("D2", "F3")])]:
+			game = JanggiGame()
+			game._board[(0, 4)] = game._board[(1, 4)]
+			game._board[(1, 4)] = None
+			game._board[(1, 7)] = game._board[(9, 8)]
+			game._board[(9, 8)] = None
+			game._board[(1, 3)] = game._board[(9, 7)]
+			game._board[(9, 7)] = None
+			game._board[(5, 4)] = game._board[(7, 1)]
+			game._board[(7, 1)] = None
+			self.assertEqual(game.apply_moves(moves, trusted), 1)
+			self.assertEqual(game.get_game_state(), "BLUE_WON")
+			self.assertEqual(game.get_turn(), "RED")
+
+
+	def test_lazy_game_state(self):
+		"""Testing the make_move method with the game state evaluated lazily."""
+
+		game = JanggiGame(lazy_game_state=True)
+		self.assertTrue(game.make_move("A7", "B7"))
+		self.assertEqual(game.get_game_state(), "UNFINISHED")
+
+		# The checkmate is only determined once the game state is read.
+		game = JanggiGame(lazy_game_state=True)
+		game._board[(0, 4)] = game._board[(1, 4)]
+		game._board[(1, 4)] = None
+		game._board[(1, 7)] = game._board[(9, 8)]
+		game._board[(9, 8)] = None
+		game._board[(1, 3)] = game._board[(9, 7)]
+		game._board[(9, 7)] = None
+		game._board[(5, 4)] = game._board[(7, 1)]
+		game._board[(7, 1)] = None
+		self.assertTrue(game.make_move("D2", "F3"))
+		self.assertEqual(game._status, "UNFINISHED")
+
+		# No move can be made by a player who has been checkmated.
+		self.assertFalse(game.make_move("E1", "E1"))
+		self.assertFalse(game.make_move("E1", "D1"))
+		self.assertEqual(game.get_game_state(), "BLUE_WON")
+		self.assertEqual(game._status, "BLUE_WON")
+		self.assertFalse(game.make_move("A4", "A5"))
+
+
+	def test_position_hash(self):
+		"""Testing the compute_hash and get_position_hash method."""
+
+		game = JanggiGame()
+		self.assertEqual(game._hash, game.compute_hash())
+		self.assertNotEqual(game.get_position_hash("BLUE"), game.get_position_hash("RED"))
+
+		# The hash is updated incrementally by try_move and restore_move
+		startingHash = game.get_position_hash()
+		captured = game.try_move((7, 1), (0, 1))
+		self.assertIsNotNone(captured)
+		self.assertEqual(game._hash, game.compute_hash())
+		game.restore_move((7, 1), (0, 1), captured)
+		self.assertEqual(game.get_position_hash(), startingHash)
+
+		for fromSquare, toSquare in [("A7", "B7"), ("A4", "A5"), ("B7", "B6"), ("A1", "A4"), ("C7", "D7")]:
+			self.assertTrue(game.make_move(fromSquare, toSquare))
+			self.assertEqual(game._hash, game.compute_hash())
+
+	def test_see(self):
+		"""Testing the see and static_exchange method."""
+
+		game = JanggiGame()
+		self.assertEqual(game.static_exchange((3, 4)), 0)
+		self.assertEqual(game.static_exchange((6, 4)), 0)
+
+		# Move Red Horse 2 to (1, 6), which blocks Red Elephant 2 from (3, 4).
+		game._board[(1, 6)] = game._board[(0, 7)]
+		game._board[(0, 7)] = None
+
+		# Move Blue Chariot 1 to (5, 4) and Red Chariot 1 to (2, 4), behind the Red Soldier at (3, 4).
+		game._board[(5, 4)] = game._board[(9, 0)]
+		game._board[(9, 0)] = None
+		game._board[(2, 4)] = game._board[(0, 0)]
+		game._board[(0, 0)] = None
+		self.assertEqual(game.see((5, 4), (3, 4)), PIECE_VALUES["Soldier"] - PIECE_VALUES["Chariot"])
+		self.assertEqual(game.static_exchange((3, 4), "BLUE"), 0)
+		self.assertEqual(game.see((5, 4), (4, 4)), -PIECE_VALUES["Chariot"])
+
+		# Move Blue Cannon 1 to (7, 4). The Cannon has two screens until the Blue Chariot captures.
+		game._board[(7, 4)] = game._board[(7, 1)]
+		game._board[(7, 1)] = None
+		self.assertFalse(game.get_board()[(7, 4)].is_legal_move(game.get_board(), (7, 4), (3, 4)))
+		self.assertEqual(game.see((5, 4), (3, 4)), PIECE_VALUES["Soldier"])
+		self.assertEqual(game.static_exchange((3, 4), "BLUE"), PIECE_VALUES["Soldier"])
+
+		# The exchange is made on a copy of the board.
+		self.assertEqual(game.get_board()[(3, 4)].get_name(), "Soldier")
+		self.assertEqual(game.get_board()[(5, 4)].get_name(), "Chariot")
+		self.assertEqual(game.get_board()[(2, 4)].get_name(), "Chariot")
+
+	def test_evaluate(self):
+		"""Testing the compute_evaluation and evaluate method."""
+
+		# The starting position is symmetric.
+		game = JanggiGame()
+		self.assertEqual(game.compute_evaluation(), 0)
+		self.assertEqual(game.evaluate(), 0)
+
+		# The evaluation is updated incrementally by try_move and restore_move
+		captured = game.try_move((7, 1), (0, 1))
+		self.assertEqual(game._evaluation, game.compute_evaluation())
+		self.assertGreater(game.evaluate("BLUE"), PIECE_VALUES["Elephant"] - 50)
+		self.assertEqual(game.evaluate("RED"), -game.evaluate("BLUE"))
+		game.restore_move((7, 1), (0, 1), captured)
+		self.assertEqual(game.evaluate(), 0)
+
+		for fromSquare, toSquare in [("C7", "C6"), ("A4", "A5"), ("C6", "C5"), ("A5", "A6"), ("C5", "C4")]:
+			self.assertTrue(game.make_move(fromSquare, toSquare))
+			self.assertEqual(game._evaluation, game.compute_evaluation())
+
+	def test_repetition(self):
+		"""Testing the repetition and the perpetual check rules."""
+
+		# Without a repetition limit, the game goes on.
+		game = JanggiGame()
+		for _ in range(3):
+			self.assertTrue(game.make_move("E9", "E9"))
+			self.assertTrue(game.make_move("E2", "E2"))
+		self.assertEqual(game.get_game_state(), "UNFINISHED")
+
+		# The starting position occurs for the third time after both players pass twice.
+		game = JanggiGame(repetition_limit=3)
+		for _ in range(2):
+			self.assertTrue(game.make_move("E9", "E9"))
+			self.assertTrue(game.make_move("E2", "E2"))
+		self.assertEqual(game.get_game_state(), "DRAW")
+		self.assertFalse(game.make_move("E9", "E9"))
+
+		# Leave only both generals and Blue Chariot 1 at (5, 4) checking the Red General.
+		for repetitionLimit, perpetualCheckLimit, state in [(3, None, "DRAW"), (3, 3, "RED_WON")]:
+			game = JanggiGame(repetition_limit=repetitionLimit, perpetual_check_limit=perpetualCheckLimit)
+			chariot = game._board[(9, 0)]
+			for position in game._board:
+				if game._board[position] is not None and game._board[position].get_name() != "General":
+					game._board[position] = None
+			game._board[(5, 4)] = chariot
+			game._players["BLUE"] = [game._players["BLUE"][0], chariot]
+			game._players["RED"] = [game._players["RED"][0]]
+			game._turn = "RED"
+			game._hash = game.compute_hash()
+			game._position_counts = {game.get_position_hash(): 1}
+
+			# Blue keeps checking the Red General, who keeps escaping, until the position repeats a third time.
+			moves = [("E2", "D2"), ("E6", "D6"), ("D2", "E2"), ("D6", "E6")] * 2
+			for fromSquare, toSquare in moves[:-1]:
+				self.assertTrue(game.make_move(fromSquare, toSquare))
+				self.assertEqual(game.get_game_state(), "UNFINISHED")
+			self.assertTrue(game.make_move("D6", "E6"))
+			self.assertTrue(game.is_in_check("RED"))
+			self.assertEqual(game.get_game_state(), state)
+
+		# Perpetual check is only judged when a position repeats, so it needs a repetition limit.
+		with self.assertRaises(ValueError):
+			JanggiGame(perpetual_check_limit=3)
+
+
 class TestGeneral(unittest.TestCase):
 	"""Testing the General class."""
 
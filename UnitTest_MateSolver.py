@@ -0,0 +1,59 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the mate-in-N solver.
+
+import unittest
+from MateSolver import *
+from JanggiGame import JanggiGame
+from UnitTest_JanggiEngine import MATE_IN_ONE
+
+
+# Two Chariots against a lone General, which Blue checkmates in two moves.
+MATE_IN_TWO = {(9, 4): ("BLUE", "General"), (5, 0): ("BLUE", "Chariot"), (6, 8): ("BLUE", "Chariot"),
+               (0, 4): ("RED", "General")}
+
+
+class TestMateSolver(unittest.TestCase):
+	"""Testing the MateSolver class"""
+
+	def test_mate_in_one(self):
+		"""Testing that the solver finds a checkmate in one move."""
+
+		game = JanggiGame()
+		game.apply_moves(MATE_IN_ONE)
+		solver = MateSolver(game)
+		self.assertEqual(solver.solve(1), (True, [("B8", "F8")]))
+		self.assertEqual(solver.get_stats()["iterations"], 1)
+
+	def test_mate_in_two(self):
+		"""Testing that the solver proves a checkmate in two moves, and returns a line that ends in checkmate."""
+
+		game = JanggiGame()
+		game.set_position(MATE_IN_TWO)
+		solver = MateSolver(game)
+		self.assertEqual(solver.solve(1), (False, []))
+
+		positionHash = game.get_position_hash()
+		proven, line = solver.solve(2)
+		self.assertTrue(proven)
+		self.assertEqual(len(line), 3)
+
+		# The game is left as it was.
+		self.assertEqual(game.get_position_hash(), positionHash)
+
+		for fromSquare, toSquare in line:
+			self.assertTrue(game.make_move(fromSquare, toSquare))
+		self.assertEqual(game.get_game_state(), "BLUE_WON")
+
+	def test_no_mate(self):
+		"""Testing that the solver disproves a checkmate, or gives up when it runs out of nodes."""
+
+		self.assertEqual(MateSolver(JanggiGame()).solve(3), (False, []))
+
+		game = JanggiGame()
+		game.set_position(MATE_IN_TWO)
+		self.assertEqual(MateSolver(game, max_nodes=10).solve(2), (None, []))
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,132 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the move journal and the recovery of games.
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from MoveJournal import *
+from UnitTest_JanggiEngine import MATE_IN_ONE
+
+
+class TestMoveJournal(unittest.TestCase):
+	"""Testing the MoveJournal class"""
+
+	def setUp(self):
+		"""Create a temporary directory for the journal."""
+		self._directory = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		"""Remove the temporary directory."""
+		self._directory.cleanup()
+
+	def test_recover_journal(self):
+		"""Testing that the games are recovered from the journal alone, without a check for checkmate
+		after each historical move."""
+
+		with MoveJournal(self._directory.name, sync_every=4) as journal:
+			journal.start_game("a")
+			journal.start_game("b", JanggiGame(red_arrangement="HEHE"))
+			journal.start_game("c")
+			for fromSquare, toSquare in MATE_IN_ONE:
+				self.assertTrue(journal.make_move("a", fromSquare, toSquare))
+			self.assertFalse(journal.make_move("b", "A7", "A5"))
+			self.assertTrue(journal.make_move("b", "A7", "A6"))
+			journal.end_game("c")
+			expected = {gameId: game.get_snapshot() for gameId, game in journal.get_games().items()}
+
+		with mock.patch.object(JanggiGame, "is_checkmate", return_value=False) as isCheckmate:
+			with MoveJournal(self._directory.name) as recovered:
+				self.assertEqual(sorted(recovered.get_games()), ["a", "b"])
+				self.assertEqual({gameId: game.get_snapshot() for gameId, game in recovered.get_games().items()},
+				                 expected)
+
+			# Only the final position of each game is checked for checkmate.
+			self.assertEqual(isCheckmate.call_count, 2)
+
+		# A record cut short by a crash is dropped.
+		with open(os.path.join(self._directory.name, SEGMENT_FILE % 0), "a") as segmentFile:
+			segmentFile.write("M\ta\tB8")
+		with MoveJournal(self._directory.name) as recovered:
+			self.assertTrue(recovered.make_move("a", "B8", "F8"))
+			self.assertEqual(recovered.get_games()["a"].get_game_state(), "BLUE_WON")
+		with MoveJournal(self._directory.name) as recovered:
+			self.assertEqual(recovered.get_games()["a"].get_game_state(), "BLUE_WON")
+
+	def test_crash(self):
+		"""Testing that accepted moves survive a crash of the process before the journal is synced, and that the
+		background thread syncs them once the interval has passed."""
+
+		script = ("import os, sys\n"
+		          "from MoveJournal import MoveJournal\n"
+		          "journal = MoveJournal(sys.argv[1], sync_every=1000, sync_interval=1000)\n"
+		          "journal.start_game('a')\n"
+		          "journal.make_move('a', 'A7', 'A6')\n"
+		          "journal.make_move('a', 'A4', 'A5')\n"
+		          "os._exit(0)\n")
+		subprocess.run([sys.executable, "-c", script, self._directory.name], check=True,
+		               cwd=os.path.dirname(os.path.abspath(__file__)))
+		with MoveJournal(self._directory.name, sync_every=1000, sync_interval=0.01) as recovered:
+			game = recovered.get_games()["a"]
+			self.assertEqual(game.get_turn(), "BLUE")
+			self.assertEqual(game.get_board()[(4, 0)].get_name(), "Soldier")
+
+			recovered.make_move("a", "A6", "B6")
+			for _ in range(100):
+				if recovered._unsynced == 0:
+					break
+				time.sleep(0.01)
+			self.assertEqual(recovered._unsynced, 0)
+
+	def test_snapshot(self):
+		"""Testing that a snapshot replaces the older segments, and recovery replays only the moves after it."""
+
+		with MoveJournal(self._directory.name, snapshot_every=10) as journal:
+			journal.start_game("a")
+			for fromSquare, toSquare in MATE_IN_ONE[:12]:
+				journal.make_move("a", fromSquare, toSquare)
+			self.assertEqual(journal.get_segments(), [1])
+			expected = journal.get_games()["a"].get_snapshot()
+
+		with mock.patch.object(JanggiGame, "apply_moves", autospec=True,
+		                       side_effect=JanggiGame.apply_moves) as applyMoves:
+			with MoveJournal(self._directory.name) as recovered:
+				self.assertEqual(recovered.get_games()["a"].get_snapshot(), expected)
+			self.assertEqual(applyMoves.call_args[0][1], MATE_IN_ONE[10:12])
+			self.assertEqual(applyMoves.call_args[1], {"trusted": True})
+
+	def test_threads(self):
+		"""Testing that games played on several threads while snapshots are written are recovered exactly."""
+
+		cycle = [("A10", "A9"), ("A1", "A2"), ("A9", "A10"), ("A2", "A1")]
+		with MoveJournal(self._directory.name, snapshot_every=7) as journal:
+
+			# Each thread also starts and ends a game, which changes the active games during the snapshots.
+			def play(gameId):
+				journal.start_game(gameId)
+				for number, (fromSquare, toSquare) in enumerate(cycle * 10):
+					self.assertTrue(journal.make_move(gameId, fromSquare, toSquare))
+					if number % 10 == 0:
+						journal.start_game(gameId + "-short")
+					elif number % 10 == 5:
+						journal.end_game(gameId + "-short")
+
+			threads = [threading.Thread(target=play, args=(str(number),)) for number in range(4)]
+			for thread in threads:
+				thread.start()
+			for thread in threads:
+				thread.join()
+			expected = {gameId: game.get_snapshot() for gameId, game in journal.get_games().items()}
+
+		with MoveJournal(self._directory.name) as recovered:
+			self.assertEqual({gameId: game.get_snapshot() for gameId, game in recovered.get_games().items()},
+			                 expected)
+
+
+if __name__ == "__main__":
+	unittest.main()
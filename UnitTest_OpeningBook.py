@@ -0,0 +1,79 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the opening book.
+
+import os
+import random
+import tempfile
+import unittest
+from OpeningBook import *
+
+
+# Game records in the format of parse_game_record
+RECORDS = ["A7-B7 A4-A5 B7-B6 BLUE_WON",
+           "A7-B7 A4-A5 C7-C6 RED_WON",
+           "A7-B7 I4-H4 DRAW",
+           "C7-C6 A4-A5",
+           "I7-H7 A4-A4 B3-B6 I4-H4"]
+
+
+class TestOpeningBook(unittest.TestCase):
+	"""Testing the opening book"""
+
+	def setUp(self):
+		"""Build an opening book in a temporary directory."""
+		self._directory = tempfile.TemporaryDirectory()
+		self._path = os.path.join(self._directory.name, "openings.book")
+
+	def tearDown(self):
+		"""Remove the temporary directory."""
+		self._directory.cleanup()
+
+	def test_parse_game_record(self):
+		"""Testing the parse_game_record function."""
+
+		self.assertEqual(parse_game_record("a7-b7 A4-A5 blue_won\n"), ([("A7", "B7"), ("A4", "A5")], "BLUE_WON"))
+		self.assertEqual(parse_game_record("E9-E9"), ([("E9", "E9")], None))
+		self.assertEqual(parse_game_record(""), ([], None))
+
+	def test_build_lookup(self):
+		"""Testing the build_opening_book function and the lookup method."""
+
+		# The illegal move B3-B6 ends the last record.
+		self.assertEqual(build_opening_book(RECORDS, self._path), 9)
+		self.assertEqual(os.path.getsize(self._path), HEADER.size + 9 * RECORD.size)
+
+		game = JanggiGame()
+		with OpeningBook(self._path) as book:
+			self.assertEqual(len(book), 9)
+			self.assertEqual(book.lookup(game.get_position_hash()),
+			                 [(((6, 0), (6, 1)), 3, 1, 1), (((6, 2), (5, 2)), 1, 0, 0), (((6, 8), (6, 7)), 1, 0, 0)])
+			self.assertEqual(book.get_moves(game)[0], ("A7", "B7", 3, 1, 1))
+			self.assertEqual(book.choose_move(game), ("A7", "B7"))
+
+			game.make_move("A7", "B7")
+			self.assertEqual(book.get_moves(game), [("A4", "A5", 2, 1, 0), ("I4", "H4", 1, 0, 1)])
+			self.assertIn(book.choose_move(game, random.Random(1)), [("A4", "A5"), ("I4", "H4")])
+
+			# Positions out of the book
+			game.make_move("I4", "H4")
+			game.make_move("A10", "A9")
+			self.assertEqual(book.get_moves(game), [])
+			self.assertIsNone(book.choose_move(game))
+
+	def test_min_games(self):
+		"""Testing that moves played too rarely are left out of the book, and an empty book."""
+
+		self.assertEqual(build_opening_book(RECORDS, self._path, min_games=2), 2)
+		self.assertEqual(build_opening_book(RECORDS, self._path, max_plies=0), 0)
+		with OpeningBook(self._path) as book:
+			self.assertEqual(book.lookup(JanggiGame().get_position_hash()), [])
+
+		with open(self._path, "wb") as bookFile:
+			bookFile.write(b"JNGC")
+		with self.assertRaises(ValueError):
+			OpeningBook(self._path)
+
+
+if __name__ == "__main__":
+	unittest.main()
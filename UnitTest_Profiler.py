@@ -0,0 +1,94 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the profiler of the Janggi rules.
+
+import copy
+import json
+import os
+import tempfile
+import unittest
+from Profiler import *
+from JanggiGame import JanggiGame
+
+
+class TestProfiler(unittest.TestCase):
+	"""Testing the Profiler class"""
+
+	def test_stats(self):
+		"""Testing that the profiled methods are counted while the profiler is enabled."""
+
+		game = JanggiGame()
+		profiler = Profiler(game)
+		self.assertTrue(profiler.is_enabled())
+		self.assertTrue(game.make_move("A7", "B7"))
+		game.generate_moves("RED")
+
+		stats = profiler.get_stats()
+		self.assertEqual(stats["convert_position"]["calls"], 2)
+		self.assertGreater(stats["is_in_check"]["calls"], 0)
+		self.assertEqual(stats["Soldier.legal_moves"]["calls"], 5)
+		self.assertGreaterEqual(stats["is_checkmate"]["time"], 0.0)
+		self.assertEqual(set(PROFILED_METHODS) - set(stats), set())
+		self.assertEqual(stats["generate_moves"]["calls"], 1)
+		self.assertIn("Chariot.is_legal_move", stats)
+
+		# The legality checks of the engine are counted on the game and on the game pieces.
+		chariotCalls = stats["Chariot.is_legal_move"]["calls"]
+		self.assertTrue(game.is_legal_move((0, 0), (1, 0)))
+		self.assertEqual(profiler.get_stats()["is_legal_move"]["calls"], 1)
+		self.assertGreater(profiler.get_stats()["Chariot.is_legal_move"]["calls"], chariotCalls)
+		stats = profiler.get_stats()
+
+		# Nothing is counted while the profiler is disabled.
+		profiler.disable()
+		self.assertFalse(profiler.is_enabled())
+		self.assertNotIn("is_in_check", vars(game))
+		self.assertTrue(game.make_move("A4", "B4"))
+		self.assertEqual(profiler.get_stats(), stats)
+
+		profiler.reset()
+		self.assertEqual(profiler.get_stats()["convert_position"], {"calls": 0, "time": 0.0})
+
+		with profiler:
+			self.assertTrue(game.make_move("C7", "C6"))
+		self.assertEqual(profiler.get_stats()["convert_position"]["calls"], 2)
+		self.assertFalse(profiler.is_enabled())
+
+	def test_copy(self):
+		"""Testing that a copy of a profiled game plays on its own board and is not counted, and that game pieces
+		put on the board after the profiler is enabled are counted."""
+
+		game = JanggiGame()
+		with Profiler(game) as profiler:
+			gameCopy = copy.deepcopy(game)
+			self.assertTrue(gameCopy.make_move("A7", "A6"))
+			self.assertEqual(game.get_turn(), "BLUE")
+			self.assertEqual(game.get_position_text(), JanggiGame().get_position_text())
+			self.assertNotEqual(gameCopy.get_position_text(), game.get_position_text())
+			self.assertEqual(profiler.get_stats()["convert_position"]["calls"], 0)
+
+			game.set_position({(8, 4): ("BLUE", "General"), (1, 4): ("RED", "General"), (5, 0): ("BLUE", "Chariot")})
+			self.assertTrue(game.make_move("A6", "A2"))
+			self.assertGreater(profiler.get_stats()["Chariot.is_legal_move"]["calls"], 0)
+		self.assertNotEqual(JanggiGame.is_legal_move.__name__, "wrapper")
+
+	def test_dump(self):
+		"""Testing the to_json and dump method."""
+
+		game = JanggiGame()
+		profiler = Profiler(game)
+		game.is_in_check("BLUE")
+
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, "stats.json")
+			profiler.dump(path)
+			with open(path) as statsFile:
+				dumped = json.load(statsFile)
+		self.assertEqual(dumped["turn"], "BLUE")
+		self.assertEqual(dumped["position"], game.get_position_hash())
+		self.assertEqual(dumped["stats"]["is_in_check"]["calls"], 1)
+		self.assertEqual(json.loads(profiler.to_json())["stats"]["is_in_check"]["calls"], 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
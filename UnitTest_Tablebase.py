@@ -0,0 +1,88 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the endgame tablebases.
+
+import os
+import tempfile
+import unittest
+from Tablebase import *
+from JanggiGame import JanggiGame
+
+
+class TestTablebase(unittest.TestCase):
+	"""Testing the tablebase generator and the Tablebase class"""
+
+	def setUp(self):
+		"""Create a temporary directory for the tablebase files."""
+		self._directory = tempfile.TemporaryDirectory()
+		self._path = os.path.join(self._directory.name, "endgame.tb")
+
+	def tearDown(self):
+		"""Remove the temporary directory."""
+		self._directory.cleanup()
+
+	def test_normalize_material(self):
+		"""Testing the normalize_material function."""
+
+		self.assertEqual(normalize_material([("red", "Guard"), ("BLUE", "Chariot"), ("RED", "General"),
+		                                     ("BLUE", "General")]),
+		                 (("BLUE", "General"), ("BLUE", "Chariot"), ("RED", "General"), ("RED", "Guard")))
+		with self.assertRaises(ValueError):
+			normalize_material([("BLUE", "General"), ("BLUE", "Chariot")])
+
+	def test_get_domain(self):
+		"""Testing the get_domain function."""
+
+		self.assertEqual(len(get_domain("RED", "Guard")), 9)
+		self.assertIn((8, 4), get_domain("BLUE", "General"))
+		self.assertNotIn((8, 4), get_domain("RED", "General"))
+		self.assertNotIn((7, 0), get_domain("BLUE", "Soldier"))
+		self.assertEqual(len(get_domain("BLUE", "Chariot")), 90)
+
+	def test_generate_probe(self):
+		"""Testing the generate_tablebase function and probing the tablebase file.
+		A lone Chariot cannot checkmate a General in its fortress, so every position is drawn."""
+
+		counts = generate_tablebase([("BLUE", "General"), ("BLUE", "Chariot"), ("RED", "General")], self._path)
+		self.assertEqual(counts, {"DRAW": 12825, "WIN": 0, "LOSS": 0})
+
+		with Tablebase(self._path) as tablebase:
+			self.assertEqual(tablebase.get_material(), (("BLUE", "General"), ("BLUE", "Chariot"), ("RED", "General")))
+			self.assertEqual(len(tablebase), 9 * 90 * 9 * 2)
+
+			game = JanggiGame()
+			self.assertIsNone(tablebase.probe(game))
+
+			game.set_position({(8, 4): ("BLUE", "General"), (5, 4): ("BLUE", "Chariot"), (0, 3): ("RED", "General")})
+			self.assertEqual(tablebase.probe(game), ("DRAW", 0))
+
+			# The Red General is in check with Blue to move, which cannot happen.
+			game.set_position({(8, 4): ("BLUE", "General"), (5, 3): ("BLUE", "Chariot"), (0, 3): ("RED", "General")})
+			self.assertIsNone(tablebase.probe(game))
+
+		with open(self._path, "r+b") as tablebaseFile:
+			tablebaseFile.write(b"XXXX")
+		with self.assertRaises(ValueError):
+			Tablebase(self._path)
+
+	def test_generate_wins(self):
+		"""Testing the generate_tablebase function on material that is won and lost in some positions:
+		a Chariot against a Guard. Probing a checkmate in one move, and the checkmate after it."""
+
+		material = [("BLUE", "General"), ("BLUE", "Chariot"), ("RED", "General"), ("RED", "Guard")]
+		counts = generate_tablebase(material, self._path)
+		self.assertEqual(counts, {"DRAW": 102219, "WIN": 588, "LOSS": 72})
+
+		with Tablebase(self._path) as tablebase:
+			game = JanggiGame()
+			game.set_position({(8, 4): ("BLUE", "General"), (2, 0): ("BLUE", "Chariot"), (0, 3): ("RED", "General"),
+			                   (0, 4): ("RED", "Guard")})
+			self.assertEqual(tablebase.probe(game), ("WIN", 1))
+
+			self.assertTrue(game.make_move("A3", "D3"))
+			self.assertEqual(game.get_game_state(), "BLUE_WON")
+			self.assertEqual(tablebase.probe(game), ("LOSS", 0))
+
+
+if __name__ == "__main__":
+	unittest.main()
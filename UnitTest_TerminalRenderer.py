@@ -0,0 +1,44 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the differential terminal renderer.
+
+import io
+import re
+import unittest
+from TerminalRenderer import *
+from JanggiGame import JanggiGame
+
+
+class TestTerminalRenderer(unittest.TestCase):
+	"""Testing the TerminalRenderer class"""
+
+	def test_render(self):
+		"""Testing that the first frame is the full board and later frames only redraw the changed cells."""
+
+		game = JanggiGame()
+		renderer = TerminalRenderer(game)
+		self.assertEqual(renderer.render(), CLEAR_SCREEN + game.render_board())
+
+		# Nothing but the status is redrawn if nothing has changed.
+		self.assertEqual(renderer.render(), MOVE_CURSOR.format(32, 1) + CLEAR_BELOW + game.render_status())
+
+		self.assertTrue(game.make_move("A7", "B7"))
+		frame = renderer.render()
+		self.assertEqual(len(re.findall("\033\\[\\d+;\\d+H", frame)), 3)
+		self.assertTrue(frame.startswith(MOVE_CURSOR.format(4 + 6 * 3, 6) + game.render_cell((6, 0))))
+		self.assertIn(MOVE_CURSOR.format(4 + 6 * 3, 6 + 13) + game.render_cell((6, 1)), frame)
+
+		renderer.invalidate()
+		self.assertTrue(renderer.render().startswith(CLEAR_SCREEN))
+
+	def test_draw(self):
+		"""Testing that the draw method writes the frame to the stream."""
+
+		stream = io.StringIO()
+		game = JanggiGame()
+		TerminalRenderer(game, stream).draw()
+		self.assertEqual(stream.getvalue(), CLEAR_SCREEN + game.render_board())
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,73 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the tournament runner.
+
+import math
+import unittest
+from Tournament import *
+
+
+class TestTournament(unittest.TestCase):
+	"""Testing the match statistics and the match runner"""
+
+	def test_elo(self):
+		"""Testing the Elo difference and its error bars."""
+
+		self.assertAlmostEqual(score_to_elo(0.5), 0)
+		self.assertAlmostEqual(score_to_elo(expected_score(100)), 100)
+		self.assertEqual(score_to_elo(1), math.inf)
+
+		elo, lower, upper = elo_interval(60, 20, 20)
+		self.assertAlmostEqual(elo, score_to_elo(0.7))
+		self.assertLess(lower, elo)
+		self.assertGreater(upper, elo)
+
+		# More games give narrower error bars.
+		_, moreLower, moreUpper = elo_interval(600, 200, 200)
+		self.assertLess(moreUpper - moreLower, upper - lower)
+
+	def test_sprt(self):
+		"""Testing the SPRT log-likelihood ratio and decision."""
+
+		self.assertEqual(sprt_llr(10, 5, 0, 0, 10), 0)
+		self.assertGreater(sprt_llr(60, 20, 20, 0, 10), 0)
+		self.assertLess(sprt_llr(20, 20, 60, 0, 10), 0)
+		self.assertIsNone(sprt_decision(6, 2, 2, 0, 10))
+		self.assertEqual(sprt_decision(600, 200, 200, 0, 10), "H1")
+		self.assertEqual(sprt_decision(200, 200, 600, 0, 10), "H0")
+
+	def test_play_game(self):
+		"""Testing that a game is played to its end or drawn after the maximum number of plies."""
+
+		state, moves = play_game({"BLUE": {"depth": 1}, "RED": {"depth": 1}}, [("A7", "A6")], max_plies=6)
+		self.assertEqual(state, "DRAW")
+		self.assertEqual(len(moves), 6)
+		self.assertEqual(moves[0], ("A7", "A6"))
+
+		# The opening is cut at its first illegal move, so the record can be replayed.
+		state, moves = play_game({"BLUE": {"depth": 1}, "RED": {"depth": 1}}, [("A7", "A6"), ("A4", "A6")],
+		                         max_plies=2)
+		self.assertEqual(len(moves), 2)
+		self.assertEqual(moves[0], ("A7", "A6"))
+		self.assertNotEqual(moves[1], ("A4", "A6"))
+		self.assertEqual(JanggiGame().apply_moves(moves), 2)
+
+		# A player who runs out of time loses.
+		state, moves = play_game({"BLUE": {"depth": 1}, "RED": {"depth": 1}}, time_control=(-1, 0))
+		self.assertEqual((state, moves), ("RED_WON", []))
+
+	def test_run_match(self):
+		"""Testing that a match alternates colors and reports the result of every game."""
+
+		results = []
+		result = run_match({"depth": 1}, {"depth": 1}, games=2, openings=["A7-A6"], max_plies=4, processes=2,
+		                   callback=results.append)
+		self.assertEqual((result["wins"], result["draws"], result["losses"]), (0, 2, 0))
+		self.assertEqual(len(results), 2)
+		self.assertEqual(len(result["records"]), 2)
+		self.assertTrue(all(record.startswith("A7-A6 ") and record.endswith(" DRAW") for record in result["records"]))
+		self.assertAlmostEqual(result["elo"], 0)
+
+
+if __name__ == "__main__":
+	unittest.main()
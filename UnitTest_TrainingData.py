@@ -0,0 +1,75 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the training data exporter. Skipped if NumPy is not installed.
+
+import os
+import tempfile
+import unittest
+from JanggiGame import JanggiGame
+from UnitTest_JanggiEngine import MATE_IN_ONE
+
+try:
+	import numpy
+	from TrainingData import *
+except ImportError:
+	numpy = None
+
+
+# A game won by Blue with the move B8-F8, a game without a result, and a drawn game of two moves.
+RECORDS = [" ".join(fromSquare + "-" + toSquare for fromSquare, toSquare in MATE_IN_ONE) + " B8-F8 BLUE_WON",
+           "A7-A6 A4-A5",
+           "A7-A6 A4-A5 DRAW"]
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestTrainingData(unittest.TestCase):
+	"""Testing the feature planes and the exported files"""
+
+	def setUp(self):
+		"""Create a temporary directory for the files."""
+		self._directory = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		"""Remove the temporary directory."""
+		self._directory.cleanup()
+
+	def test_encode_position(self):
+		"""Testing the feature planes of the starting position."""
+
+		planes = numpy.zeros((PLANES, ROWS, COLUMNS), dtype=numpy.uint8)
+		encode_position(JanggiGame(), planes)
+		self.assertEqual(planes[:TURN_PLANE].sum(), 32)
+		self.assertEqual(planes[PIECE_PLANES[("BLUE", "General")], 8, 4], 1)
+		self.assertEqual(planes[PIECE_PLANES[("RED", "Chariot")], 0, 0], 1)
+		self.assertEqual(planes[PIECE_PLANES[("RED", "Soldier")]].sum(), 5)
+		self.assertTrue((planes[TURN_PLANE] == 1).all())
+
+	def test_export_training_data(self):
+		"""Testing that every position of the finished games is written, in chunks, with its move and outcome."""
+
+		directory = os.path.join(self._directory.name, "data")
+		self.assertEqual(count_positions(RECORDS), 21)
+		self.assertEqual(export_training_data(RECORDS, directory, chunk_size=4), 21)
+
+		features, moves, outcomes = load_training_data(directory)
+		self.assertEqual(features.shape, (21, PLANES, ROWS, COLUMNS))
+		self.assertEqual(features.dtype, numpy.uint8)
+		self.assertEqual(features[:, :TURN_PLANE].sum(axis=(1, 2, 3))[0], 32)
+		self.assertEqual(list(features[:19, TURN_PLANE, 0, 0]), [1, 0] * 9 + [1])
+		self.assertEqual(encode_move((6, 0), (5, 0)), moves[19])
+		self.assertEqual(list(outcomes[:4]), [1, -1, 1, -1])
+		self.assertEqual(list(outcomes[19:]), [0, 0])
+
+		# The last position before the mate is the same as the one encoded directly.
+		game = JanggiGame()
+		game.apply_moves(MATE_IN_ONE)
+		planes = numpy.zeros((PLANES, ROWS, COLUMNS), dtype=numpy.uint8)
+		encode_position(game, planes)
+		self.assertTrue((features[18] == planes).all())
+
+		with self.assertRaises(ValueError):
+			export_training_data(["A7-A6 A7-A6 DRAW"], directory)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,93 @@
+# Author:           Chi Hang Leung
+# Date:             03/09/2021
+# Description:      Unit tests for the transposition table.
+
+import unittest
+from TranspositionTable import *
+
+
+class TestTranspositionTable(unittest.TestCase):
+	"""Testing the TranspositionTable class"""
+
+	def test_init(self):
+		"""Testing the instantiation of the table."""
+
+		table = TranspositionTable(1)
+		self.assertEqual(table.get_entries(), 1024 * 1024 // ENTRY_SIZE)
+		self.assertLessEqual(table.get_size(), 1024 * 1024)
+		self.assertEqual(table.get_policy(), "two_tier")
+
+		table = TranspositionTable(3, "depth")
+		self.assertLessEqual(table.get_size(), 3 * 1024 * 1024)
+
+		with self.assertRaises(ValueError):
+			TranspositionTable(1, "never")
+
+	def test_encode_move(self):
+		"""Testing the encode_move and decode_move functions."""
+
+		self.assertEqual(decode_move(encode_move((0, 0), (9, 8))), ((0, 0), (9, 8)))
+		self.assertEqual(decode_move(encode_move((9, 8), (9, 8))), ((9, 8), (9, 8)))
+		self.assertLess(encode_move((9, 8), (9, 8)), NO_MOVE)
+		self.assertIsNone(decode_move(NO_MOVE))
+
+	def test_probe_store(self):
+		"""Testing the probe and store method."""
+
+		table = TranspositionTable(1)
+		self.assertIsNone(table.probe(12345))
+
+		self.assertTrue(table.store(12345, 3, -150, EXACT, ((6, 0), (5, 0))))
+		self.assertEqual(table.probe(12345), (3, -150, EXACT, ((6, 0), (5, 0))))
+
+		# The best move is kept if the position is stored again without one.
+		self.assertTrue(table.store(12345, 4, 20, LOWER_BOUND))
+		self.assertEqual(table.probe(12345), (4, 20, LOWER_BOUND, ((6, 0), (5, 0))))
+
+		table.clear()
+		self.assertIsNone(table.probe(12345))
+
+		stats = table.get_stats()
+		self.assertEqual(stats["probes"], 4)
+		self.assertEqual(stats["hits"], 2)
+		self.assertEqual(stats["stores"], 2)
+		self.assertEqual(stats["replacements"], 0)
+
+	def test_replacement_policies(self):
+		"""Testing the depth-preferred, always-replace and two-tier replacement policies."""
+
+		# Both hashes fall into the same bucket of any table.
+		first = 1 << 40
+		second = 2 << 40
+
+		table = TranspositionTable(1, "depth")
+		table.store(first, 5, 10, EXACT)
+		self.assertFalse(table.store(second, 4, 20, EXACT))
+		self.assertIsNone(table.probe(second))
+		self.assertTrue(table.store(second, 5, 20, EXACT))
+		self.assertIsNone(table.probe(first))
+		self.assertEqual(table.get_stats()["collisions"], 2)
+		self.assertEqual(table.get_stats()["replacements"], 1)
+
+		table = TranspositionTable(1, "always")
+		table.store(first, 5, 10, EXACT)
+		self.assertTrue(table.store(second, 1, 20, EXACT))
+		self.assertIsNone(table.probe(first))
+		self.assertEqual(table.probe(second), (1, 20, EXACT, None))
+
+		# The shallow entry goes to the always-replace slot, keeping the deep entry.
+		table = TranspositionTable(1, "two_tier")
+		third = 3 << 40
+		table.store(first, 5, 10, EXACT)
+		table.store(second, 1, 20, UPPER_BOUND)
+		self.assertEqual(table.probe(first), (5, 10, EXACT, None))
+		self.assertEqual(table.probe(second), (1, 20, UPPER_BOUND, None))
+		table.store(third, 2, 30, EXACT)
+		self.assertEqual(table.probe(first), (5, 10, EXACT, None))
+		self.assertIsNone(table.probe(second))
+		self.assertEqual(table.probe(third), (2, 30, EXACT, None))
+		self.assertEqual(table.get_stats()["replacements"], 1)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -1,23 +1,293 @@
+import copy
+import functools
 from tkinter import *
-from PIL import ImageTk, Image
+from PIL import ImageTk, Image, ImageDraw, ImageFont
 from JanggiGame import *
+from EngineWorker import EngineWorker
 
 
-root = Tk()
-root.title("Janggi")
+BOARD_IMAGE = "images/janggi_board.png"
 
-status_frame = LabelFrame(root)
+# Positions of the intersections on the board image, as fractions of the width and height of the image:
+# the first column and row, and the distance between two columns and two rows.
+GRID_LEFT = 52 / 916
+GRID_TOP = 42 / 900
+GRID_COLUMN = 102 / 916
+GRID_ROW = 90.4 / 900
 
-status_frame.grid(row=0, column=0)
+# Diameter of a game piece, as a fraction of the distance between two columns.
+PIECE_SIZE = 0.9
 
-status_label = Label(status_frame, text="Game Status:")
-status_label.grid(row=0, column=0)
+# Colors and labels of the game pieces
+PIECE_COLORS = {"BLUE": ((40, 70, 170, 255), (225, 235, 255, 255)), "RED": ((170, 30, 30, 255), (255, 230, 230, 255))}
+PIECE_LABELS = {"General": "GEN", "Guard": "GRD", "Horse": "HRS", "Elephant": "ELE",
+                "Chariot": "CHA", "Cannon": "CAN", "Soldier": "SOL"}
 
-board_frame = LabelFrame(root)
-board_frame.grid(row=1, column=0)
 
-background_image = ImageTk.PhotoImage(Image.open("images/janggi_board.png"))
-background_label = Label(image=background_image)
-background_label.grid(row=1, column=0)
+class SpriteCache:
+	"""A class that represent the images of the board and the game pieces. The board image is decoded once,
+	and the images are scaled or drawn once for each window size and kept until the size changes."""
 
-root.mainloop()
+	def __init__(self, path=BOARD_IMAGE):
+		self._board_image = Image.open(path).convert("RGBA")
+		self._size = None
+		self._photos = {}
+
+	def get_board_size(self):
+		"""Returns the width and height of the board image."""
+		return self._board_image.size
+
+	def _use_size(self, size):
+		"""Takes the size of the board as parameter and drops the images of any other size. Returns None."""
+
+		if size != self._size:
+			self._size = size
+			self._photos = {}
+
+	def get_board(self, size):
+		"""Takes the width and height of the board as parameter and returns the scaled board image."""
+
+		self._use_size(size)
+		if "board" not in self._photos:
+			self._photos["board"] = ImageTk.PhotoImage(self._board_image.resize(size, Image.LANCZOS))
+		return self._photos["board"]
+
+	def get_piece(self, size, player, name):
+		"""Takes the width and height of the board, the player and the name of a game piece as parameters and
+		returns the image of the game piece."""
+
+		self._use_size(size)
+		key = (player, name)
+		if key not in self._photos:
+			diameter = max(int(size[0] * GRID_COLUMN * PIECE_SIZE), 8)
+			border, fill = PIECE_COLORS[player]
+			image = Image.new("RGBA", (diameter, diameter))
+			draw = ImageDraw.Draw(image)
+			draw.ellipse((0, 0, diameter - 1, diameter - 1), fill=fill, outline=border, width=max(diameter // 15, 1))
+			font = ImageFont.load_default()
+			label = PIECE_LABELS[name]
+			left, top, right, bottom = draw.textbbox((0, 0), label, font=font)
+			draw.text(((diameter - right - left) / 2, (diameter - bottom - top) / 2), label, fill=border, font=font)
+			self._photos[key] = ImageTk.PhotoImage(image)
+		return self._photos[key]
+
+
+class JanggiGUI:
+	"""A class that represent a playable Janggi board drawn on a canvas. Clicking on a game piece selects it
+	and marks the positions it can move to, and clicking on another position moves it there.
+	After a move, only the positions that have changed are redrawn. The engine moves, the legal moves and
+	the game status are computed by a worker thread, so that the window never waits for them."""
+
+	def __init__(self, root, game=None, engine_player=None, depth=3):
+		self._root = root
+		self._game = game if game is not None else JanggiGame(lazy_game_state=True)
+		# A copy of the game before the first move, with its position, arrangements and options, to replay from.
+		self._start = copy.deepcopy(self._game)
+		self._history = []
+		self._engine_player = engine_player
+		self._worker = EngineWorker(lambda callback: root.after(0, callback), depth)
+		self._sprites = SpriteCache()
+		self._size = self._sprites.get_board_size()
+		self._pieces = {}
+		self._targets = []
+		self._selected = None
+		self._state = "UNFINISHED"
+		self._thinking = False
+
+		controls = Frame(root)
+		controls.pack(fill=X)
+		self._status_label = Label(controls, text="", anchor=W)
+		self._status_label.pack(side=LEFT, fill=X, expand=True)
+		Button(controls, text="Undo", command=self.undo).pack(side=RIGHT)
+		self._canvas = Canvas(root, width=self._size[0], height=self._size[1], highlightthickness=0)
+		self._canvas.pack(fill=BOTH, expand=True)
+
+		self._board_item = self._canvas.create_image(0, 0, anchor=NW)
+		self._highlight_item = self._canvas.create_oval(0, 0, 0, 0, outline="yellow", width=3, state=HIDDEN)
+		self._canvas.bind("<Configure>", self.on_resize)
+		self._canvas.bind("<Button-1>", self.on_click)
+		root.protocol("WM_DELETE_WINDOW", self.close)
+		self.redraw()
+		self.start_turn()
+
+	def get_game(self):
+		"""Returns the game that is played."""
+		return self._game
+
+	def get_center(self, position):
+		"""Takes a position as parameter and returns the coordinates of its intersection on the canvas."""
+
+		i, j = position
+		return self._size[0] * (GRID_LEFT + j * GRID_COLUMN), self._size[1] * (GRID_TOP + i * GRID_ROW)
+
+	def get_position(self, x, y):
+		"""Takes coordinates on the canvas as parameters and returns the nearest position, or None if there is none."""
+
+		i = round((y / self._size[1] - GRID_TOP) / GRID_ROW)
+		j = round((x / self._size[0] - GRID_LEFT) / GRID_COLUMN)
+		if 0 <= i < self._game.get_rows() and 0 <= j < self._game.get_columns():
+			return i, j
+		return None
+
+	def redraw(self):
+		"""Redraws the board and all game pieces. Returns None."""
+
+		self._canvas.itemconfig(self._board_item, image=self._sprites.get_board(self._size))
+		self.redraw_positions(self._game.get_board())
+		self.update_highlight()
+
+	def redraw_positions(self, positions):
+		"""Takes an iterable of positions as parameter and redraws the game pieces on them. Returns None."""
+
+		for position in positions:
+			if position in self._pieces:
+				self._canvas.delete(self._pieces.pop(position))
+			gamePiece = self._game.get_board()[position]
+			if gamePiece is not None:
+				image = self._sprites.get_piece(self._size, gamePiece.get_player(), gamePiece.get_name())
+				self._pieces[position] = self._canvas.create_image(*self.get_center(position), image=image)
+		self._canvas.tag_raise(self._highlight_item)
+
+	def update_highlight(self):
+		"""Circles the selected game piece, if any, and clears the marks of the positions it can move to.
+		Returns None."""
+
+		for item in self._targets:
+			self._canvas.delete(item)
+		self._targets = []
+		if self._selected is None:
+			self._canvas.itemconfig(self._highlight_item, state=HIDDEN)
+			return
+		x, y = self.get_center(self._selected)
+		radius = self._size[0] * GRID_COLUMN * PIECE_SIZE / 2
+		self._canvas.coords(self._highlight_item, x - radius, y - radius, x + radius, y + radius)
+		self._canvas.itemconfig(self._highlight_item, state=NORMAL)
+
+	def show_targets(self, position, positions):
+		"""Takes the position of a game piece and the positions that it can move to as parameters, and marks them
+		if the game piece is still selected. Returns None."""
+
+		if position != self._selected:
+			return
+		radius = self._size[0] * GRID_COLUMN / 8
+		for position in positions:
+			x, y = self.get_center(position)
+			self._targets.append(self._canvas.create_oval(x - radius, y - radius, x + radius, y + radius,
+			                                              fill="yellow", outline=""))
+
+	def show_status(self, status):
+		"""Takes a pair of the game state and whether the player to move is in check as parameter.
+		Shows the game state, the player's turn and if the player is in check. Returns None."""
+
+		self._state, inCheck = status
+		text = "Game state: " + self._state
+		if self._state == "UNFINISHED":
+			turn = self._game.get_turn()
+			text += "    Turn: " + turn
+			if inCheck:
+				text += "    " + turn.capitalize() + " is in check!"
+			if self._thinking:
+				text += "    Thinking..."
+		self._status_label.config(text=text)
+
+	def start_turn(self):
+		"""Cancels the work of the previous turn, and asks the worker for the game status and,
+		if it is the turn of the engine, for its move. Returns None."""
+
+		self._worker.cancel()
+		self._thinking = self._game.get_turn() == self._engine_player
+		self._worker.submit_status(self._game, self.show_status)
+		if self._thinking:
+			self._worker.submit_search(self._game, self.on_engine_move)
+
+	def play(self, fromPosition, toPosition):
+		"""Takes the from and to position as parameters and makes the move. Redraws the positions that have
+		changed and starts the next turn if the move is legal. Returns True if the move is legal."""
+
+		fromSquare, toSquare = POSITION_SQUARES[fromPosition], POSITION_SQUARES[toPosition]
+		if not self._game.make_move(fromSquare, toSquare):
+			return False
+		self._history.append((fromSquare, toSquare))
+		self.redraw_positions((fromPosition, toPosition))
+		self.start_turn()
+		return True
+
+	def undo(self):
+		"""Takes back the last move, and the move of the engine before it, if any. The game is replayed from a copy
+		of the game it started from, with the recorded moves not checked again. Returns None."""
+
+		if not self._history:
+			return
+		self._history.pop()
+		turn = self._start.get_turn()
+		if len(self._history) % 2 == 1:
+			turn = "RED" if turn == "BLUE" else "BLUE"
+		if self._history and turn == self._engine_player:
+			self._history.pop()
+
+		self._game = copy.deepcopy(self._start)
+		self._game.apply_moves(self._history, trusted=True)
+		self._selected = None
+		self.redraw()
+		self.start_turn()
+
+	def on_engine_move(self, result):
+		"""Takes a pair of the move of the engine, as a pair of squares, and its score as parameter.
+		Makes the move, or passes the turn if the engine has no move. Returns None."""
+
+		move, _ = result
+		self._thinking = False
+		if move is None:
+			position = self._game.get_position(self._game.get_players()[self._game.get_turn()][0])
+			self.play(position, position)
+		else:
+			self.play(SQUARE_POSITIONS[move[0]], SQUARE_POSITIONS[move[1]])
+
+	def close(self):
+		"""Stops the worker thread and closes the window. Returns None."""
+
+		self._worker.close()
+		self._root.destroy()
+
+	def on_resize(self, event):
+		"""Scales the board to fit the canvas, keeping its proportions, and redraws everything. Returns None."""
+
+		width, height = self._sprites.get_board_size()
+		scale = min(event.width / width, event.height / height)
+		size = (max(int(width * scale), 1), max(int(height * scale), 1))
+		if size != self._size:
+			self._size = size
+			self.redraw()
+
+	def on_click(self, event):
+		"""Selects the clicked game piece of the player to move, or moves the selected game piece to the clicked
+		position. Clicking the selected game piece again clears the selection. Returns None."""
+
+		position = self.get_position(event.x, event.y)
+		if position is None or self._thinking or self._state != "UNFINISHED":
+			return
+
+		gamePiece = self._game.get_board()[position]
+		if position == self._selected:
+			self._selected = None
+		elif gamePiece is not None and gamePiece.get_player() == self._game.get_turn():
+			self._selected = position
+		elif self._selected is not None:
+			fromPosition = self._selected
+			self._selected = None
+			self.play(fromPosition, position)
+		self.update_highlight()
+		if self._selected is not None:
+			self._worker.submit_legal_moves(self._game, self._selected,
+			                                functools.partial(self.show_targets, self._selected))
+
+
+def main():
+	root = Tk()
+	root.title("Janggi")
+	JanggiGUI(root, engine_player="RED")
+	root.mainloop()
+
+
+if __name__ == "__main__":
+	main()